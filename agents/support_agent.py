@@ -1,117 +1,28 @@
-
 import os
 import json
 import time
-import shutil
-import multiprocessing
+from functools import lru_cache
 
 from dotenv import load_dotenv
-from langchain_core.documents import Document
-from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings
-from crewai import Agent
-from crewai.tools import tool
-
-from tools.kb_tools import rerank_results
-from utils.helpers import compute_all_file_hashes, hashes_changed
-from utils.document_loaders import (
-    load_common_issues,
-    load_theme_notes,
-    load_theme_meta,
-    load_kb_articles,
-    load_theme_docs,
-    load_closed_tickets,
-    load_backstory
-)
+
+from tools.kb_tools import rerank_results, dedupe_chunks, search_kb_raw as _search_kb_raw
+from utils.knowledge_base import get_knowledge_base
+from utils.reply_format import render_reply
 
 start = time.time()
 load_dotenv()
 
 # Configuration
 DATA_FOLDER = "data"
-EMBED_PATH = os.path.join(DATA_FOLDER, "faiss_store")
-HASH_PATH = os.path.join(EMBED_PATH, "doc_hash.json")
-USE_VECTORSTORE = True
-MAX_WORKERS = max(1, multiprocessing.cpu_count() - 1)
-
-### Load all documents
-print("📦 Loading knowledge base documents...")
-
-theme_notes = load_theme_notes()
-theme_meta_docs = load_theme_meta()
-articles = load_kb_articles()
-theme_docs = load_theme_docs()
-tickets = load_closed_tickets()
-common_issues = load_common_issues()
-backstory_text = load_backstory()
-
-all_docs = theme_meta_docs + theme_notes + common_issues + articles + theme_docs + tickets
-
-print(f"✅ Loaded {len(all_docs)} documents total.")
-
-### Vectorstore setup
-if USE_VECTORSTORE:
-    embedding = OpenAIEmbeddings()
-    current_hashes = compute_all_file_hashes(DATA_FOLDER)
-
-    if os.path.exists(EMBED_PATH) and os.path.exists(HASH_PATH):
-        with open(HASH_PATH, "r") as f:
-            stored_hashes = json.load(f)
-        if not hashes_changed(stored_hashes, current_hashes):
-            print("📦 Loading existing FAISS index (documents unchanged)...")
-            vectorstore = FAISS.load_local(EMBED_PATH, embedding)
-        else:
-            print("🗑️ Document files changed. Rebuilding FAISS index...")
-            shutil.rmtree(EMBED_PATH)
-            vectorstore = FAISS.from_documents(all_docs, embedding)
-            vectorstore.save_local(EMBED_PATH)
-            with open(HASH_PATH, "w") as f:
-                json.dump(current_hashes, f)
-    else:
-        print("⚠️ No existing FAISS index or hashes found. Creating new index...")
-        if os.path.exists(EMBED_PATH):
-            shutil.rmtree(EMBED_PATH)
-        vectorstore = FAISS.from_documents(all_docs, embedding)
-        vectorstore.save_local(EMBED_PATH)
-        with open(HASH_PATH, "w") as f:
-            json.dump(current_hashes, f)
-    retriever = vectorstore.as_retriever()
-else:
-    retriever = None
-    print("🚫 Vectorstore skipped. Retrieval disabled.")
-
-def search_kb_raw(query: str):
-    """Raw search function that returns structured string data from the KB"""
-    if not retriever:
-        return {
-            "source": "error",
-            "title": "Retrieval Error",
-            "content": "Retrieval is disabled. Vectorstore not loaded."
-        }
-
-    results = rerank_results(retriever.invoke(query))
 
-    if not results:
-        return {
-            "source": "none",
-            "title": "No Results",
-            "content": "No relevant results found in the knowledge base."
-        }
-
-    # Return structured data for common issues with a special prefix
-    common_issues = [doc for doc in results if doc.metadata.get("issue_type") == "common_issue"]
-    if common_issues:
-        return {
-            "source": "common_issue",
-            "title": common_issues[0].metadata.get("title", "Common Issue"),
-            "content": f"STRICT_RESPONSE: {common_issues[0].metadata.get('expected_response')}",
-            "is_strict": True
-        }
+# The knowledge base, the tools and the agent are all built on first use,
+# so importing this module never loads a corpus, hashes data/ or touches FAISS.
 
-### Tools
+def search_kb_raw(query: str, kb=None):
+    """Raw search function that returns structured string data from the KB"""
+    return _search_kb_raw(query, kb=kb or get_knowledge_base())
 
-@tool("GetThemeBuilder")
-def get_theme_builder(slug: str):
+def theme_builder_info(slug: str):
     """Return the page builder used by a given theme slug."""
     try:
         with open(os.path.join(DATA_FOLDER, "theme_info.json"), encoding="utf-8") as f:
@@ -123,25 +34,37 @@ def get_theme_builder(slug: str):
             return f"No info found for theme '{slug}'."
     except Exception as e:
         return f"Error retrieving theme info: {e}"
-    
 
-@tool("SearchKnowledgeBase")
-def search_kb(query: str):
+def search_kb_text(query: str, kb=None, analysis=None):
     """
-    Search the common issues, WolfThemes documentation, KB articles, and past tickets for the given query string.
-    If a common issue is found, return ONLY the expected_response field as a STRICT_RESPONSE that must be used verbatim.
+    Search the knowledge base and format the results for the agent.
+    If a common issue is found, return ONLY its expected_response as a STRICT_RESPONSE.
+    A query that is exactly the text (or one part) of the ticket's `analysis` reuses its hits.
     """
+    kb = kb or get_knowledge_base()
 
-    if not retriever:
+    if not kb.use_vectorstore:
         return "Retrieval is disabled. Vectorstore not loaded."
 
-    results = rerank_results(retriever.invoke(query))
+    if analysis is not None and analysis.hits and _is_ticket_text(query, analysis):
+        return format_kb_text(analysis.hits)
+    return format_kb_text(kb.search(query))
+
+def _is_ticket_text(query, analysis):
+    from utils.query_cache import normalize_query
+
+    normalized = normalize_query(query)
+    return any(normalized == normalize_query(text) for text in (analysis.text, *analysis.parts))
+
+def format_kb_text(hits):
+    """Format (document, score) hits as the SearchKnowledgeBase tool output."""
+    results = dedupe_chunks(rerank_results(hits))
 
     if not results:
         return "No relevant results found in the knowledge base."
 
     # Return ONLY expected_response for common issues with a special prefix
-    common_issues = [doc for doc in results if doc.metadata.get("issue_type") == "common_issue"]
+    common_issues = [doc for doc, _ in results if doc.metadata.get("issue_type") == "common_issue"]
     if common_issues:
         return f"STRICT_RESPONSE: {common_issues[0].metadata.get('expected_response')}"
 
@@ -149,19 +72,37 @@ def search_kb(query: str):
     return "\n\n".join([
         f"📄 {doc.metadata.get('title')} ({doc.metadata.get('source', '')})"
         f"\n🔗 {doc.metadata.get('url', '')}"
-        f"\n{doc.page_content[:300]}..."
-        for doc in results[:3]
+        f"\n{doc.page_content}"
+        for doc, _ in results[:3]
     ]) or "No relevant results found."
 
+### Tools
+
+def build_support_tools(kb=None, analysis=None):
+    """
+    Create the agent tools, bound to `kb` or to the shared knowledge base when None.
+    Pass the ticket's TicketAnalysis to build per-ticket tools that reuse its hits.
+    """
+    from crewai.tools import tool
+
+    @tool("GetThemeBuilder")
+    def get_theme_builder(slug: str):
+        """Return the page builder used by a given theme slug."""
+        return theme_builder_info(slug)
+
+    @tool("SearchKnowledgeBase")
+    def search_kb(query: str):
+        """
+        Search the common issues, WolfThemes documentation, KB articles, and past tickets for the given query string.
+        If a common issue is found, return ONLY the expected_response field as a STRICT_RESPONSE that must be used verbatim.
+        """
+        return search_kb_text(query, kb=kb, analysis=analysis)
+
+    return search_kb, get_theme_builder
+
 ### Agent
-support_agent = Agent(
-    role="WordPress Theme Support Expert",
-    goal="Use the knowledge base to resolve customer tickets efficiently",
-    backstory = backstory_text,
-    tools=[search_kb, get_theme_builder],
-    allow_delegation=False,
-    verbose=True,
-    instructions="""
+
+SUPPORT_AGENT_INSTRUCTIONS = """
 Your job is to answer a customer support ticket.
 
 You MUST follow these steps precisely:
@@ -173,16 +114,44 @@ You MUST follow these steps precisely:
 4. Always add a greeting at the beginning and a professional closing at the end.
 
 Format your reply as:
-Hi there,
-
-{RESPONSE CONTENT}
-
-I hope this helps!
-
-Best regards,
-Support Team
-"""
-)
+""" + render_reply("{RESPONSE CONTENT}") + "\n"
+
+def build_support_agent(kb=None):
+    """Create the support agent. Pass `kb` to inject a specific KnowledgeBase into its tools."""
+    from crewai import Agent
+    from utils.document_loaders import load_backstory
+
+    search_kb, get_theme_builder = build_support_tools(kb)
+    return Agent(
+        role="WordPress Theme Support Expert",
+        goal="Use the knowledge base to resolve customer tickets efficiently",
+        backstory = load_backstory(),
+        tools=[search_kb, get_theme_builder],
+        allow_delegation=False,
+        verbose=True,
+        instructions=SUPPORT_AGENT_INSTRUCTIONS
+    )
+
+@lru_cache(maxsize=1)
+def _default_tools():
+    return build_support_tools()
+
+@lru_cache(maxsize=1)
+def _default_agent():
+    return build_support_agent()
+
+def __getattr__(name):
+    # Keep `from agents.support_agent import support_agent, search_kb, ...` working
+    # while deferring the crewai import and agent construction to first access.
+    if name == "support_agent":
+        return _default_agent()
+    if name == "search_kb":
+        return _default_tools()[0]
+    if name == "get_theme_builder":
+        return _default_tools()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == "__main__":
+    get_knowledge_base().indexes
+    _default_agent()
     print(f"✅ Agent initialized in {time.time() - start:.2f} seconds.")
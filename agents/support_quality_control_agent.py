@@ -7,7 +7,15 @@ def review_response_quality(reply: str, ticket: str, source_doc: str, guidelines
     Reviews a support reply based on internal guidelines and whether it properly uses the provided source.
     Flags hallucinations or violations of support rules.
     """
+    from utils.pre_review import pre_review
+    from utils.strict_reply import STRICT_PREFIX
+
+    source = source_doc or ""
+    checks = pre_review(reply, {"is_strict": source.startswith(STRICT_PREFIX), "content": source}, sources=[source])
     return f"""
+    ## Automated Checks (grounding {checks.grounding:.2f}):
+    {checks.review}
+
     ## Quality Review:
 
     ### 1. Hierarchy Compliance:
@@ -36,21 +44,25 @@ def review_response_quality(reply: str, ticket: str, source_doc: str, guidelines
     {guidelines[:250]}...
     """
 
-support_quality_control_agent = Agent(
-    role="Support Quality Reviewer",
-    goal="Ensure every response is compliant with guidelines and free of hallucinated advice",
-    backstory="You're an expert in support QA. Your job is to strictly enforce internal support rules and tone.",
-    tools=[review_response_quality],
-    verbose=True,
-    allow_delegation=False,
-    instructions="""
-    1. NEVER approve a response that includes steps not present in the source.
-    2. If a common issue match is found, the reply must reuse the `expected_response` exactly.
-    3. Do not allow generic web advice or plugin suggestions not in our ecosystem.
-    4. Your review should clearly mention if:
-       - A hallucination was found
-       - A source mismatch occurred
-       - Tone or formatting was off
-    5. Finish with a markdown bullet point list of any required corrections.
-    """
-)
+def build_support_quality_control_agent():
+    """Create a quality reviewer agent, e.g. one per worker thread of a batch run."""
+    return Agent(
+        role="Support Quality Reviewer",
+        goal="Ensure every response is compliant with guidelines and free of hallucinated advice",
+        backstory="You're an expert in support QA. Your job is to strictly enforce internal support rules and tone.",
+        tools=[review_response_quality],
+        verbose=True,
+        allow_delegation=False,
+        instructions="""
+        1. NEVER approve a response that includes steps not present in the source.
+        2. If a common issue match is found, the reply must reuse the `expected_response` exactly.
+        3. Do not allow generic web advice or plugin suggestions not in our ecosystem.
+        4. Your review should clearly mention if:
+           - A hallucination was found
+           - A source mismatch occurred
+           - Tone or formatting was off
+        5. Finish with a markdown bullet point list of any required corrections.
+        """
+    )
+
+support_quality_control_agent = build_support_quality_control_agent()
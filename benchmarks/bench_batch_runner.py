@@ -0,0 +1,101 @@
+"""
+Batch runner throughput and idempotency with an emulated crew: every ticket
+costs `--latency` seconds (the reply and review LLM calls), and one ticket
+fails on its first attempt.
+
+    python benchmarks/bench_batch_runner.py [--tickets 50] [--latency 0.5] [--workers 8]
+
+Runs sequentially (the old one-ticket flow), with the worker pool, again with
+nothing changed, and after new customer comments on 3 tickets.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crews.batch_runner import run_batch
+from utils.result_store import ResultStore
+from utils.ticket_utils import load_tickets
+
+
+def make_tickets(count):
+    base = load_tickets()
+    return [{**base[i % len(base)], "ticket_id": str(5_000_000 + i), "needs_response": "1" if i % 10 else "0"}
+            for i in range(count)]
+
+
+def add_comment(ticket, text):
+    comment = {**ticket["ticket_comments"][0], "comment_id": f"{ticket['ticket_id']}-new", "comment": text,
+               "time_stamp": "2030-01-01 00:00:00", "user_type": "user"}
+    return {**ticket, "ticket_comments": [comment] + ticket["ticket_comments"]}
+
+
+class EmulatedCrew:
+    def __init__(self, latency, failing_ticket):
+        self.latency = latency
+        self.failing_ticket = failing_ticket
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, ticket):
+        with self._lock:
+            self.calls += 1
+            fail = ticket["ticket_id"] == self.failing_ticket
+            self.failing_ticket = None if fail else self.failing_ticket
+        time.sleep(self.latency)
+        if fail:
+            raise TimeoutError("emulated LLM timeout")
+        return {"category": "emulated", "reply": f"Hi there, reply to {ticket['ticket_id']}", "review": "Approved ✅"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    tickets = make_tickets(args.tickets)
+    needing = [t for t in tickets if t["needs_response"] == "1"]
+    rows = []
+    with tempfile.TemporaryDirectory() as folder:
+        def run(label, batch, store, workers):
+            crew.calls = 0
+            start = time.perf_counter()
+            counts = run_batch(batch, store, process=crew, workers=workers, warm_up=None)
+            rows.append((label, time.perf_counter() - start, crew.calls, counts["done"], counts["failed"],
+                         counts["unchanged"]))
+            return counts
+
+        crew = EmulatedCrew(args.latency, None)
+        run("sequential (1 worker)", tickets, ResultStore(os.path.join(folder, "sequential.sqlite")), 1)
+
+        store = ResultStore(os.path.join(folder, "results.sqlite"))
+        crew = EmulatedCrew(args.latency, needing[0]["ticket_id"])
+        counts = run(f"{args.workers} workers", tickets, store, args.workers)
+        assert counts["failed"] == 1 and counts["done"] == len(needing) - 1
+        counts = run("re-run, 1 retried", tickets, store, args.workers)
+        assert counts["done"] == 1 and counts["unchanged"] == len(needing) - 1
+        counts = run("re-run, unchanged", tickets, store, args.workers)
+        assert crew.calls == 0
+        updated = {t["ticket_id"] for t in needing[1:4]}
+        tickets = [add_comment(t, "<p>Still not working.</p>") if t["ticket_id"] in updated else t for t in tickets]
+        counts = run("3 threads got replies", tickets, store, args.workers)
+        assert counts["done"] == 3
+        assert store.latest(needing[1]["ticket_id"])["status"] == "done"
+        store.close()
+
+    print(f"📊 {args.tickets} open tickets ({len(needing)} need a response), "
+          f"{args.latency:.1f} s emulated crew latency")
+    print("| run                    | time (s) | crew calls | done | failed | unchanged |")
+    print("|------------------------|---------:|-----------:|-----:|-------:|----------:|")
+    for label, elapsed, calls, done, failed, unchanged in rows:
+        print(f"| {label:22} | {elapsed:8.2f} | {calls:10} | {done:4} | {failed:6} | {unchanged:9} |")
+
+
+if __name__ == "__main__":
+    main()
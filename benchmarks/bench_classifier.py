@@ -0,0 +1,123 @@
+"""
+Compare the old per-part classifier loop (one embedding request and one FAISS
+query per ticket part) with classify_tickets (one embedding batch, one matrix
+multiply). Uses an offline embedder that sleeps like an API round trip.
+
+    python benchmarks/bench_classifier.py [--parts 200] [--latency 0.05]
+
+With --calibrate, uses the real embeddings and index to suggest
+COMMON_ISSUE_THRESHOLD from common_issues.json: each customer_message should
+match its own issue (positives) and not the others (negatives).
+"""
+import os
+import re
+import sys
+import json
+import time
+import math
+import hashlib
+import argparse
+import tempfile
+import contextlib
+import io
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_community.vectorstores import FAISS
+
+import utils.ticket_classifier as classifier
+from utils.document_loaders import load_common_issues
+from utils.knowledge_base import KnowledgeBase, get_knowledge_base
+
+
+class SlowHashEmbeddings(Embeddings):
+    """Deterministic bag-of-words vectors, with `latency` seconds per request."""
+    model = "bench-hash"
+
+    def __init__(self, latency=0.05, dim=256):
+        self.latency = latency
+        self.dim = dim
+        self.requests = 0
+
+    def _vector(self, text):
+        v = [0.0] * self.dim
+        for word in re.findall(r"[a-z0-9]+", text.lower()):
+            v[int(hashlib.md5(word.encode()).hexdigest(), 16) % self.dim] += 1.0
+        norm = math.sqrt(sum(x * x for x in v)) or 1.0
+        return [x / norm for x in v]
+
+    def embed_documents(self, texts):
+        self.requests += 1
+        time.sleep(self.latency)
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def benchmark(parts_count, latency):
+    embedding = SlowHashEmbeddings(latency)
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        kb = KnowledgeBase(embed_path=os.path.join(tmp, "faiss_store"), embedding=embedding)
+        kb._documents = list(load_common_issues())  # only the common_issue partition is needed
+        kb.indexes
+        store = FAISS.from_documents(list(load_common_issues()), embedding)
+
+    messages = [issue.metadata["title"] for issue in load_common_issues()]
+    parts = [f"{messages[i % len(messages)]} (part {i})" for i in range(parts_count)]
+
+    embedding.requests = 0
+    t = time.perf_counter()
+    for part in parts:
+        store.similarity_search_with_score(part, k=1)
+    loop_time, loop_requests = time.perf_counter() - t, embedding.requests
+
+    embedding.requests = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        classifier.common_issue_matrix(kb)
+        t = time.perf_counter()
+        classifier.classify_tickets(parts, kb=kb)
+    batch_time, batch_requests = time.perf_counter() - t, embedding.requests
+
+    print(f"{parts_count} ticket parts, {latency * 1000:.0f} ms per embedding request")
+    print(f"per-part loop:     {loop_time:7.3f} s  ({loop_requests} embedding requests)")
+    print(f"classify_tickets:  {batch_time:7.3f} s  ({batch_requests} embedding request)")
+
+
+def calibrate():
+    kb = get_knowledge_base()
+    matrix, docs = classifier.common_issue_matrix(kb)
+    with open(os.path.join("data", "common_issues.json"), encoding="utf-8") as f:
+        issues = json.load(f)
+    titles = [doc.metadata["title"] for doc in docs]
+    vectors = np.asarray(kb.embedding.embed_documents([i["customer_message"] for i in issues]), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    sims = vectors @ matrix.T
+
+    positives, negatives = [], []
+    for row, issue in zip(sims, issues):
+        own = titles.index(issue["title"]) if issue["title"] in titles else None
+        for j, score in enumerate(row):
+            (positives if j == own else negatives).append(float(score))
+    low_pos, high_neg = np.percentile(positives, 5), np.percentile(negatives, 95)
+    print(f"positives: min {min(positives):.3f}  p5 {low_pos:.3f}  median {np.median(positives):.3f}")
+    print(f"negatives: p95 {high_neg:.3f}  max {max(negatives):.3f}")
+    print(f"suggested COMMON_ISSUE_THRESHOLD ≈ {(low_pos + high_neg) / 2:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--parts", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--calibrate", action="store_true")
+    args = parser.parse_args()
+    if args.calibrate:
+        calibrate()
+    else:
+        benchmark(args.parts, args.latency)
+
+
+if __name__ == "__main__":
+    main()
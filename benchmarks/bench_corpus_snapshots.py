@@ -0,0 +1,57 @@
+"""
+Time to rebuild every knowledge base document (chunk) from the corpus files
+(cold, snapshots rebuilt) and from the per-corpus snapshots (warm), and check
+that both give the same Documents.
+
+    python benchmarks/bench_corpus_snapshots.py [--repeat 3]
+
+Runs on a temporary copy of data/ so the real snapshots are left alone.
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.document_loaders as loaders
+from utils.knowledge_base import KnowledgeBase
+
+
+def load_all():
+    start = time.perf_counter()
+    documents = [(doc.page_content, doc.metadata) for doc in KnowledgeBase(use_vectorstore=False).iter_documents()]
+    return documents, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        data = os.path.join(folder, "data")
+        shutil.copytree("data", data, ignore=shutil.ignore_patterns("cache", "faiss_store"))
+        loaders.DATA_FOLDER = data
+        snapshots = os.path.join(data, loaders.SNAPSHOT_FOLDER)
+
+        cold = warm = float("inf")
+        for _ in range(args.repeat):
+            shutil.rmtree(snapshots, ignore_errors=True)
+            reference, elapsed = load_all()
+            cold = min(cold, elapsed)
+            documents, elapsed = load_all()
+            warm = min(warm, elapsed)
+            if documents != reference:
+                sys.exit("❌ Documents read from the snapshots differ from the freshly built ones.")
+
+        size = sum(os.path.getsize(os.path.join(snapshots, name)) for name in os.listdir(snapshots))
+        print(f"📊 {len(reference)} documents (chunks), snapshots {size / 1e6:.1f} MB")
+        print(f"   cold (parse, clean, chunk): {cold * 1e3:8.1f} ms")
+        print(f"   warm (snapshots):           {warm * 1e3:8.1f} ms  ({cold / warm:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Pipelined reply/review stages against the sequential per-ticket crew, with an
+emulated LLM: a reply costs `--reply-latency` seconds and a review
+`--review-latency` seconds, and the peak number of concurrent calls per stage
+is tracked to show the per-stage limits hold.
+
+    python benchmarks/bench_crew_pipeline.py [--tickets 40] [--reply-latency 0.6] [--review-latency 0.4]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crews.batch_runner import run_batch, run_pipelined_batch
+from utils.result_store import ResultStore
+from utils.ticket_utils import load_tickets
+
+
+class EmulatedStage:
+    def __init__(self, latency):
+        self.latency = latency
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def call(self):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.latency)
+        with self._lock:
+            self.active -= 1
+
+
+class EmulatedLLM:
+    def __init__(self, reply_latency, review_latency):
+        self.replies = EmulatedStage(reply_latency)
+        self.reviews = EmulatedStage(review_latency)
+
+    def reply(self, ticket):
+        self.replies.call()
+        return {"reply": f"Hi there, reply to {ticket['ticket_id']}"}
+
+    def review(self, ticket, draft):
+        self.reviews.call()
+        return {"category": "emulated", "reply": draft["reply"], "review": "Approved ✅"}
+
+    def process(self, ticket):
+        return self.review(ticket, self.reply(ticket))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=40)
+    parser.add_argument("--reply-latency", type=float, default=0.6)
+    parser.add_argument("--review-latency", type=float, default=0.4)
+    args = parser.parse_args()
+
+    base = load_tickets()
+    tickets = [{**base[i % len(base)], "ticket_id": str(6_000_000 + i), "needs_response": "1"}
+               for i in range(args.tickets)]
+    rows = []
+    with tempfile.TemporaryDirectory() as folder:
+        def store(name):
+            return ResultStore(os.path.join(folder, f"{name}.sqlite"))
+
+        llm = EmulatedLLM(args.reply_latency, args.review_latency)
+        start = time.perf_counter()
+        counts = run_batch(tickets, store("sequential"), process=llm.process, workers=1, warm_up=None)
+        rows.append(("sequential crew", time.perf_counter() - start, counts["done"], llm, None))
+
+        for reply_workers, review_workers in ((1, 1), (3, 2), (6, 4)):
+            llm = EmulatedLLM(args.reply_latency, args.review_latency)
+            counts, stats = run_pipelined_batch(tickets, store(f"pipeline-{reply_workers}-{review_workers}"),
+                                                reply=llm.reply, review=llm.review, reply_workers=reply_workers,
+                                                review_workers=review_workers, warm_up=None)
+            assert counts["done"] == len(tickets)
+            assert llm.replies.peak <= reply_workers and llm.reviews.peak <= review_workers
+            rows.append((f"pipeline {reply_workers} reply / {review_workers} review", stats.elapsed, counts["done"],
+                         llm, stats))
+
+    print(f"\n📊 {args.tickets} tickets, emulated reply {args.reply_latency:.1f} s + review "
+          f"{args.review_latency:.1f} s")
+    print("| run                         | time (s) | tickets/min | peak replies | peak reviews | "
+          "review queue max |")
+    print("|-----------------------------|---------:|------------:|-------------:|-------------:|"
+          "-----------------:|")
+    for label, elapsed, done, llm, stats in rows:
+        depth = stats.review.summary()["depth_max"] if stats else "-"
+        print(f"| {label:27} | {elapsed:8.2f} | {60 * done / elapsed:11.1f} | {llm.replies.peak:12} | "
+              f"{llm.reviews.peak:12} | {depth:>16} |")
+
+
+if __name__ == "__main__":
+    main()
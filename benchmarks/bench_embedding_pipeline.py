@@ -0,0 +1,62 @@
+"""
+Compare one synchronous embed_documents call with the concurrent batched
+pipeline, against the local stub embeddings server (latency + injected 429s).
+A second pipeline run shows that completed batches are checkpointed in the
+embedding cache and not re-sent.
+
+    python benchmarks/bench_embedding_pipeline.py [--texts 2000] [--latency 0.2] [--error-rate 0.1]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_openai import OpenAIEmbeddings
+
+from benchmarks.stub_embedding_server import start_stub_server
+from utils.embedding_cache import CachedEmbeddings
+from utils.embedding_pipeline import embed_texts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--batch-tokens", type=int, default=1000)
+    args = parser.parse_args()
+
+    server, base_url, stats = start_stub_server(latency=args.latency, error_rate=args.error_rate, dim=256)
+    texts = [f"Ticket {i}: the demo import stops at {i % 97}% on my hosting." for i in range(args.texts)]
+
+    sync_client = OpenAIEmbeddings(openai_api_base=base_url, openai_api_key="stub", chunk_size=100,
+                                   max_retries=10, check_embedding_ctx_length=False)
+    t = time.perf_counter()
+    sync_client.embed_documents(texts)
+    print(f"synchronous client:  {time.perf_counter() - t:6.2f} s  ({stats['requests']} requests)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        client = OpenAIEmbeddings(openai_api_base=base_url, openai_api_key="stub", max_retries=0,
+                                  check_embedding_ctx_length=False)
+        cached = CachedEmbeddings(client, path=os.path.join(tmp, "embeddings.sqlite"))
+
+        stats["requests"] = stats["rate_limited"] = 0
+        t = time.perf_counter()
+        embed_texts(texts, cached, max_concurrency=args.workers, max_batch_tokens=args.batch_tokens)
+        print(f"batched pipeline:    {time.perf_counter() - t:6.2f} s  "
+              f"({stats['requests']} requests, {stats['rate_limited']} answered 429)")
+
+        stats["requests"] = 0
+        t = time.perf_counter()
+        embed_texts(texts, cached, max_concurrency=args.workers, max_batch_tokens=args.batch_tokens)
+        print(f"resumed from cache:  {time.perf_counter() - t:6.2f} s  ({stats['requests']} requests)")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
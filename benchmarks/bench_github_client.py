@@ -0,0 +1,138 @@
+"""
+Fetch theme metadata from a local fake GitHub contents API: the old loop (one
+unpooled requests.get per slug, in sequence) against the shared GitHubClient,
+cold and warm (ETag cache filled, nothing changed), and after one config changed.
+
+    python benchmarks/bench_github_client.py [--themes 120] [--latency 0.05] [--workers 8]
+"""
+import os
+import sys
+import json
+import time
+import base64
+import hashlib
+import argparse
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+import crawlers.github_client as github
+from crawlers.crawl_theme_meta import crawl_theme_meta, extract_metadata
+from crawlers.http_cache import HTTPCache
+
+
+class FakeGitHub:
+    def __init__(self, slugs, latency):
+        self.latency = latency
+        self.configs = {slug: {"name": slug.title(), "slug": slug, "builder": "Elementor", "version": "1.0.0"}
+                        for slug in slugs}
+        self.requests = 0
+        self.connections = set()
+
+    def handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                time.sleep(fake.latency)
+                fake.requests += 1
+                fake.connections.add(self.client_address)
+                parts = self.path.strip("/").split("/")
+                if parts[-1] == github.SLUGS_PATH:
+                    slugs = json.dumps({"theme_slugs": sorted(fake.configs)}).encode()
+                    body = json.dumps({"content": base64.b64encode(slugs).decode()})
+                elif parts[-1] == "app.config.json" and parts[-2] in fake.configs:
+                    body = json.dumps(fake.configs[parts[-2]])
+                else:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                etag = f'"{hashlib.md5(body.encode()).hexdigest()}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                data = body.encode()
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def old_loop(base_url, slugs):
+    """The previous crawler: a fresh connection per request, one slug after another."""
+    meta = {}
+    for slug in slugs:
+        res = requests.get(f"{base_url}/repos/{github.REPO}/contents/THEMES/{slug}/app.config.json", timeout=10)
+        res.raise_for_status()
+        meta[slug] = extract_metadata(res.json())
+    return meta
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--themes", type=int, default=120)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    fake = FakeGitHub([f"theme-{i}" for i in range(args.themes)], args.latency)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), fake.handler())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    rows = []
+
+    def measure(label, fn):
+        fake.requests = 0
+        fake.connections = set()
+        start = time.perf_counter()
+        meta = fn()
+        rows.append((label, time.perf_counter() - start, fake.requests, len(fake.connections)))
+        return meta
+
+    with tempfile.TemporaryDirectory() as folder:
+        cache = HTTPCache(os.path.join(folder, "http_cache.sqlite"))
+        slugs = sorted(fake.configs)
+        reference = measure("old sequential loop", lambda: old_loop(base_url, slugs))
+
+        def run_client():
+            client = github.GitHubClient(token="test", base_url=base_url, cache=cache, max_workers=args.workers)
+            meta = crawl_theme_meta(client=client)
+            # The second crawler of the same run reuses the slug list
+            assert github.get_theme_slugs(client) == tuple(slugs)
+            return meta
+
+        assert measure("client, cold cache", run_client) == reference
+        assert measure("client, warm cache", run_client) == reference
+        fake.configs["theme-0"]["version"] = "1.0.1"
+        meta = measure("client, 1 changed", run_client)
+        assert meta["theme-0"]["version"] == "1.0.1"
+        cache.close()
+    server.shutdown()
+
+    print(f"📊 {args.themes} themes, {args.latency * 1e3:.0f} ms server latency, {args.workers} workers")
+    print("| run                 | time (s) | requests | connections |")
+    print("|---------------------|---------:|---------:|------------:|")
+    for label, elapsed, count, connections in rows:
+        print(f"| {label:19} | {elapsed:8.2f} | {count:8} | {connections:11} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Check clean_html_to_text against the BeautifulSoup reference on a golden set,
+then compare their speed.
+
+    python benchmarks/bench_html_cleaning.py [--fuzz 5000] [--repeat 3] [--scale 10]
+
+The golden set is every KB article, every open and closed ticket comment and
+every theme doc in data/, hand-written edge cases (entities, comments, CDATA,
+script/style/template, unclosed and void tags) and random tag soup built from
+them. Any mismatch is printed and makes the script exit non-zero.
+"""
+import os
+import sys
+import html
+import time
+import random
+import argparse
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup, MarkupResemblesLocatorWarning
+
+from utils.helpers import MAX_CLEAN_WORKERS, clean_html_many, clean_html_to_text
+from utils.json_stream import iter_records
+
+warnings.filterwarnings("ignore", category=MarkupResemblesLocatorWarning)
+
+EDGE_CASES = [
+    "", "   ", "plain text", "  padded \n text  ", "a &amp; b", "&lt;b&gt;escaped&lt;/b&gt;",
+    "&amp;lt;double&amp;gt;", "AT&T", "&copy 2024", "&foo; &bar", "&#147;quoted&#148; &#x263A; &#129;",
+    "<p>one</p><p>two</p>", "<p>a<b>b</b>c</p>", "<br>line<br/>line<br></br>end",
+    "<div>x<!-- comment -->y</div>", "<!DOCTYPE html><html><body>doc</body></html>",
+    "<?php echo 1; ?>after", "<![CDATA[raw <b>data</b>]]>tail", "<template><p>hidden</p></template>shown",
+    "<script>var a = '<p>';</script>text<style>p {}</style>", "<ruby>漢<rp>(</rp><rt>kan</rt><rp>)</rp></ruby>",
+    "<p>unclosed <b>bold <i>italic</p> after", "</div>stray end", "<div><span>a</div>b</span>c",
+    "<img src='x.png' alt='alt'>after img", "<br><br/>x</br>y", "<textarea>  keep  </textarea>",
+    "<pre>  pre\n  formatted </pre>", "text with \xa0nbsp\xa0 ", "<a href='?a=1&b=2'>link</a>", "1 < 2 and 3 > 2",
+    "<p>trailing <", "<p>broken <b", "<script>never closed", "<ul><li>one<li>two</ul>",
+    "<table><tr><td>a</td><td>b</td></tr></table>", "<p> line separator </p>", "<P>UPPER</P>",
+    "&nbsp;&nbsp;", "<div>\n\n   \n</div>", "<!-->-->x", "<p>a</p>\r\n<p>b</p>",
+]
+
+
+def reference(text):
+    return BeautifulSoup(html.unescape(text), "html.parser").get_text(separator="\n", strip=True)
+
+
+def corpus_strings():
+    strings = []
+    for article in iter_records(os.path.join("data", "kb_articles.json")):
+        strings.append(article.get("content") or "")
+    for name, key in (("closed_tickets.json", "closed-tickets"), ("open_tickets.json", None)):
+        for ticket in iter_records(os.path.join("data", name), key):
+            if isinstance(ticket, dict):
+                strings += [c.get("comment", "") for c in ticket.get("ticket_comments") or []]
+    for doc in iter_records(os.path.join("data", "theme_docs.json")):
+        strings.append(doc.get("content") or "")
+    return strings
+
+
+def tag_soup(pieces, rng, count):
+    """Random concatenations of slices of real strings and edge cases."""
+    soup = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(1, 6)):
+            piece = rng.choice(pieces)
+            start = rng.randint(0, len(piece))
+            parts.append(piece[start:start + rng.randint(0, 200)])
+        soup.append("".join(parts))
+    return soup
+
+
+def check(golden):
+    mismatches = [text for text in golden if clean_html_to_text(text) != reference(text)]
+    for text in mismatches[:5]:
+        print(f"❌ Mismatch for {text[:120]!r}")
+        print(f"   expected {reference(text)[:200]!r}")
+        print(f"   got      {clean_html_to_text(text)[:200]!r}")
+    return mismatches
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fuzz", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scale", type=int, default=10, help="corpus copies for the process-pool timing")
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = corpus_strings()
+    golden = EDGE_CASES + corpus + tag_soup(corpus + EDGE_CASES, random.Random(args.seed), args.fuzz)
+    mismatches = check(golden)
+    print(f"🧪 Golden set: {len(golden)} strings, {len(mismatches)} mismatches")
+
+    markup = sum("<" in html.unescape(text) or "&" in html.unescape(text) for text in corpus)
+    chars = sum(map(len, corpus))
+    print(f"📊 Corpus: {len(corpus)} strings, {chars / 1e6:.1f} M chars, {markup} with markup")
+    old = timed(lambda: [reference(text) for text in corpus], args.repeat)
+    new = timed(lambda: [clean_html_to_text(text) for text in corpus], args.repeat)
+    print(f"   BeautifulSoup:      {old:7.3f} s")
+    print(f"   clean_html_to_text: {new:7.3f} s  ({old / new:.1f}x)")
+
+    if MAX_CLEAN_WORKERS < 2:
+        print("   Process pool timing skipped: only one CPU available.")
+        sys.exit(1 if mismatches else 0)
+    big = corpus * args.scale
+    serial = timed(lambda: clean_html_many(big, parallel_min_chars=float("inf")), 1)
+    parallel = timed(lambda: clean_html_many(big, parallel_min_chars=0), 1)
+    print(f"   {args.scale}x corpus serial:   {serial:7.3f} s")
+    print(f"   {args.scale}x corpus pool:     {parallel:7.3f} s  ({serial / parallel:.1f}x)")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
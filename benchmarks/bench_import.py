@@ -0,0 +1,51 @@
+"""
+Measure how long `import agents.support_agent` takes in a fresh interpreter,
+and how long the knowledge base takes to build on first use.
+
+    python benchmarks/bench_import.py [--runs 5] [--build]
+"""
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import agents.support_agent; "
+    "print(time.perf_counter() - t)"
+)
+BUILD_SNIPPET = (
+    "import time; import agents.support_agent as a; t = time.perf_counter(); "
+    "a.get_knowledge_base().indexes; print(time.perf_counter() - t)"
+)
+
+
+def time_snippet(snippet, runs):
+    timings = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", snippet], cwd=ROOT, capture_output=True, text=True, check=True
+        )
+        timings.append(float(out.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--build", action="store_true", help="also time the first knowledge base build")
+    args = parser.parse_args()
+
+    timings = time_snippet(IMPORT_SNIPPET, args.runs)
+    print(f"import agents.support_agent: median {statistics.median(timings) * 1000:.1f} ms "
+          f"(min {min(timings) * 1000:.1f} ms, {args.runs} runs)")
+
+    if args.build:
+        timings = time_snippet(BUILD_SNIPPET, 1)
+        print(f"first KnowledgeBase use (load corpora + FAISS): {timings[0]:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Recall@k, size and latency of every FAISS index layout, measured against the
+exact flat index on the vectors already stored under data/faiss_store.
+
+    python benchmarks/bench_index_modes.py [--k 4] [--queries 200] [--dims 0,512,256] [--augment 0]
+
+Queries are stored vectors with a little noise added (a near-duplicate ticket),
+and the flat index's top-k for each query is the ground truth. Our corpus is
+small, so ivfpq falls back to sq8 below MIN_IVFPQ_VECTORS; pass --augment N to
+add N synthetic neighbours of the real vectors and see how the layouts scale.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import faiss
+import numpy as np
+
+from utils.vector_index import INDEX_MODES, MIN_IVFPQ_VECTORS, create_index
+
+EMBED_PATH = os.path.join("data", "faiss_store")
+
+
+def load_corpus_vectors(embed_path=EMBED_PATH):
+    """Every exact vector under `embed_path`: the root index and/or the per-source partitions."""
+    paths = [os.path.join(embed_path, "index.faiss")]
+    if os.path.isdir(embed_path):
+        paths += [os.path.join(embed_path, name, "index.faiss") for name in sorted(os.listdir(embed_path))]
+    blocks = []
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        index = faiss.read_index(path)
+        if isinstance(faiss.downcast_index(index), faiss.IndexFlat) and index.ntotal:
+            blocks.append(index.reconstruct_n(0, index.ntotal))
+    if not blocks:
+        sys.exit(f"❌ No flat FAISS index found under {embed_path}.")
+    return np.vstack(blocks).astype(np.float32)
+
+
+def perturb(vectors, scale, rng):
+    noise = rng.normal(scale=scale / np.sqrt(vectors.shape[1]), size=vectors.shape)
+    noisy = (vectors + noise).astype(np.float32)
+    faiss.normalize_L2(noisy)
+    return noisy
+
+
+def measure(vectors, queries, truth, layout, k):
+    index = create_index(vectors, layout)
+    index.add(vectors)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "index.faiss")
+        faiss.write_index(index, path)
+        size = os.path.getsize(path)
+
+        start = time.perf_counter()
+        loaded = faiss.read_index(path)
+        load_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = np.vstack([loaded.search(q[None, :], k)[1] for q in queries])
+        latency = (time.perf_counter() - start) / len(queries)
+        del loaded
+
+    recall = np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)])
+    return {"size": size, "load": load_time, "latency": latency, "recall": recall}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dims", default="0,512,256", help="comma-separated truncated dimensions (0 = full)")
+    parser.add_argument("--augment", type=int, default=0, help="synthetic vectors to add to the corpus")
+    parser.add_argument("--noise", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    vectors = load_corpus_vectors()
+    real = len(vectors)
+    if args.augment:
+        picks = rng.integers(0, real, size=args.augment)
+        vectors = np.vstack([vectors, perturb(vectors[picks], 2 * args.noise, rng)])
+    queries = perturb(vectors[rng.integers(0, real, size=args.queries)], args.noise, rng)
+
+    exact = faiss.IndexFlatL2(vectors.shape[1])
+    exact.add(vectors)
+    truth = exact.search(queries, args.k)[1]
+
+    print(f"📊 {len(vectors)} vectors ({real} real), {vectors.shape[1]} dimensions, "
+          f"{args.queries} queries, recall@{args.k} vs flat")
+    if len(vectors) < MIN_IVFPQ_VECTORS:
+        print(f"   ivfpq falls back to sq8 below {MIN_IVFPQ_VECTORS} vectors")
+    print(f"| mode  |  dim | recall@{args.k} | size (KB) | B/vector | load (ms) | query (µs) |")
+    print("|-------|-----:|---------:|----------:|---------:|----------:|-----------:|")
+    for dim in [int(d) for d in args.dims.split(",")]:
+        for mode in INDEX_MODES:
+            r = measure(vectors, queries, truth, {"mode": mode, "dim": dim}, args.k)
+            print(f"| {mode:5} | {dim or vectors.shape[1]:4} | {r['recall']:8.3f} | {r['size'] / 1024:9.0f} | "
+                  f"{r['size'] / len(vectors):8.0f} | {r['load'] * 1e3:9.2f} | "
+                  f"{r['latency'] * 1e6:10.1f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Run the KB article crawler against a local stand-in for the Ticksy site and
+report wall time, requests and bytes for a cold crawl, a warm crawl (nothing
+changed) and a crawl after a few articles were edited, added and removed.
+
+    python benchmarks/bench_kb_crawler.py [--articles 200] [--latency 0.05] [--concurrency 4] [--delay 0]
+
+Half of the stand-in articles send an ETag, the other half only Last-Modified.
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+from email.utils import formatdate
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web
+
+from crawlers.crawl_kb_articles import crawl
+from crawlers.http_cache import HTTPCache
+
+
+class StandInSite:
+    def __init__(self, count, latency):
+        self.latency = latency
+        self.articles = {i: (f"Article {i}", f"<p>How to fix issue {i}.</p>", time.time()) for i in range(count)}
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes = 0
+
+    def edit(self, i, content):
+        title = self.articles.get(i, (f"Article {i}",))[0]
+        self.articles[i] = (title, content, time.time() + 1)
+
+    def _respond(self, request, body, etag, modified):
+        self.requests += 1
+        headers = {"ETag": etag} if etag else {"Last-Modified": formatdate(modified, usegmt=True)}
+        if etag and request.headers.get("If-None-Match") == etag or \
+                not etag and request.headers.get("If-Modified-Since") == headers["Last-Modified"]:
+            self.not_modified += 1
+            return web.Response(status=304, headers=headers)
+        self.bytes += len(body)
+        return web.Response(text=body, content_type="text/html", headers=headers)
+
+    async def listing(self, request):
+        await asyncio.sleep(self.latency)
+        body = "".join(f'<a href="/article/{i}/">{t}</a>' for i, (t, _, _) in sorted(self.articles.items()))
+        return self._respond(request, body, f'"list-{hash(body)}"', None)
+
+    async def article(self, request):
+        await asyncio.sleep(self.latency)
+        i = int(request.match_info["id"])
+        if i not in self.articles:
+            raise web.HTTPNotFound()
+        title, content, modified = self.articles[i]
+        body = (f'<div id="single-article"><h1 class="page-title">{title}</h1>'
+                f'<div class="article-content">{content}</div></div>')
+        return self._respond(request, body, f'"{i}-{hash(content)}"' if i % 2 == 0 else None, modified)
+
+
+async def run(args):
+    site = StandInSite(args.articles, args.latency)
+    app = web.Application()
+    app.router.add_get("/articles/", site.listing)
+    app.router.add_get("/article/{id}/", site.article)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    server = web.TCPSite(runner, "127.0.0.1", 0)
+    await server.start()
+    base_url = f"http://127.0.0.1:{runner.addresses[0][1]}"
+
+    with tempfile.TemporaryDirectory() as folder:
+        cache = HTTPCache(os.path.join(folder, "http_cache.sqlite"))
+
+        async def crawl_once(label):
+            site.requests = site.not_modified = site.bytes = 0
+            start = time.perf_counter()
+            articles, changed = await crawl(base_url, cache, args.concurrency, args.delay)
+            elapsed = time.perf_counter() - start
+            print(f"| {label:22} | {elapsed:8.2f} | {site.requests:8} | {site.not_modified:4} | "
+                  f"{site.bytes / 1024:9.0f} | {len(articles):8} | {len(changed):7} |")
+            return articles, changed
+
+        print(f"📊 {args.articles} articles, {args.latency * 1e3:.0f} ms server latency, "
+              f"{args.concurrency} per host, {args.delay}s politeness delay")
+        print("| crawl                  | time (s) | requests |  304 | body (KB) | articles | changed |")
+        print("|------------------------|---------:|---------:|-----:|----------:|---------:|--------:|")
+        await crawl_once("cold")
+        _, changed = await crawl_once("warm, nothing changed")
+        assert not changed, "an unchanged crawl reported changes"
+        site.edit(0, "<p>Updated answer.</p>")
+        site.edit(1, "<p>Updated answer.</p>")
+        site.edit(args.articles, "<p>A brand new article.</p>")
+        del site.articles[2]
+        _, changed = await crawl_once("2 edited, 1 added")
+        assert sorted(a["url"].rstrip("/").rsplit("/", 1)[1] for a in changed) == sorted(
+            map(str, (0, 1, args.articles)))
+        cache.close()
+    await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--delay", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Peak Python memory of loading the closed-ticket archive as it grows: the old
+whole-file json.load + document list, against the streaming loaders feeding
+chunking and the per-document sync bookkeeping (ID and hash only).
+
+    python benchmarks/bench_loader_memory.py [--scales 1,10,100] [--formats json,jsonl.gz,jsonl.zst]
+
+The archive is data/closed_tickets.json repeated `scale` times with fresh ticket IDs.
+"""
+import os
+import sys
+import json
+import gzip
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.document_loaders as loaders
+from utils.document_loaders import chunk_documents, load_closed_tickets, ticket_to_document
+from utils.vector_index import document_hash, document_id
+
+SOURCE = os.path.join("data", "closed_tickets.json")
+
+
+def scaled_tickets(scale):
+    with open(SOURCE, encoding="utf-8") as f:
+        tickets = json.load(f)
+    if isinstance(tickets, dict):
+        tickets = tickets.get("closed-tickets", [])
+    for copy in range(scale):
+        for ticket in tickets:
+            yield {**ticket, "ticket_id": f"{ticket.get('ticket_id')}-{copy}"}
+
+
+def write_archive(folder, scale, fmt):
+    path = os.path.join(folder, f"closed_tickets.{fmt}")
+    if fmt == "json":
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('{"closed-tickets": [')
+            for i, ticket in enumerate(scaled_tickets(scale)):
+                f.write(("," if i else "") + json.dumps(ticket))
+            f.write("]}")
+        return path
+    if fmt == "jsonl.gz":
+        out = gzip.open(path, "wt", encoding="utf-8")
+    else:
+        import zstandard
+        out = zstandard.open(path, "wt", encoding="utf-8")
+    with out:
+        for ticket in scaled_tickets(scale):
+            out.write(json.dumps(ticket) + "\n")
+    return path
+
+
+def load_whole_file(path):
+    """The previous loader: parse everything, build every Document, then chunk the list."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)["closed-tickets"]
+    documents = [doc for doc in map(ticket_to_document, data) if doc is not None]
+    return len(list(chunk_documents(documents)))
+
+
+def load_streaming(folder):
+    """Streaming loaders into chunking, keeping only what IndexSync keeps for unchanged documents."""
+    previous, loaders.DATA_FOLDER = loaders.DATA_FOLDER, folder
+    try:
+        hashes = {document_id(doc): document_hash(doc) for doc in chunk_documents(load_closed_tickets())}
+    finally:
+        loaders.DATA_FOLDER = previous
+    return len(hashes)
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = fn(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="1,10,100")
+    parser.add_argument("--formats", default="json,jsonl.gz,jsonl.zst")
+    args = parser.parse_args()
+
+    print("| scale | format    | archive (MB) | chunks | whole-file peak (MB) | streaming peak (MB) | streaming (s) |")
+    print("|------:|-----------|-------------:|-------:|---------------------:|--------------------:|--------------:|")
+    for scale in [int(s) for s in args.scales.split(",")]:
+        for fmt in args.formats.split(","):
+            with tempfile.TemporaryDirectory() as folder:
+                path = write_archive(folder, scale, fmt)
+                size = os.path.getsize(path) / 1e6
+                whole = "-"
+                if fmt == "json":
+                    _, peak, _ = measure(load_whole_file, path)
+                    whole = f"{peak / 1e6:.1f}"
+                count, peak, elapsed = measure(load_streaming, folder)
+            print(f"| {scale:5} | {fmt:9} | {size:12.1f} | {count:6} | {whole:>20} | {peak / 1e6:19.1f} | {elapsed:13.1f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Local pre-review with LLM escalation against an LLM review of every reply.
+Tickets go through the real support_crew_followup_with_review with KB results
+built from data/kb_articles.json; the crew kickoff is emulated: the support
+task "writes" one of several reply variants (faithful to the article, with an
+invented link, generic web advice, no sign-off) and each LLM task costs
+`--llm-latency` seconds.
+
+    python benchmarks/bench_pre_review.py [--tickets 50] [--llm-latency 0.3]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crewai.tasks.task_output import TaskOutput
+
+import crews.support_crew as support_crew
+from utils.helpers import clean_html_to_text
+from utils.ticket_analysis import TicketAnalysis
+from utils.ticket_utils import load_tickets
+
+# (variant, share of the replies)
+VARIANTS = [("faithful", 0.6), ("partly reworded", 0.1), ("invented link", 0.1), ("generic advice", 0.1),
+            ("no sign-off", 0.1)]
+GENERIC = ("Please clear your browser cache, deactivate all your plugins one by one and switch to a default "
+           "theme to find the conflict, then reinstall WordPress if nothing else works.")
+
+
+def make_reply(variant, article):
+    words = clean_html_to_text(article["content"]).split()
+    excerpt = " ".join(words[:45])
+    if variant == "faithful":
+        body = f"{excerpt}\n\nYou will find all the steps here: {article['url']}"
+    elif variant == "partly reworded":
+        body = f"Good question! {' '.join(words[:20])}, and afterwards simply follow the remaining steps in this guide: {article['url']}"
+    elif variant == "invented link":
+        body = f"{excerpt}\n\nSee https://wolfthemes.ticksy.com/article/99999/ for the details."
+    elif variant == "generic advice":
+        body = GENERIC
+    else:
+        return f"Hi there,\n\n{excerpt}\n\nLet me know if you need more help!"
+    return f"Hi there,\n\n{body}\n\nI hope it helps,\nBest regards"
+
+
+class EmulatedKickoff:
+    def __init__(self, latency):
+        self.latency = latency
+        self.reply_text = None
+        self.calls = Counter()
+
+    def __call__(self, *tasks):
+        for task in tasks:
+            self.calls[task.name] += 1
+            time.sleep(self.latency)
+            text = self.reply_text if task.name == "Support Reply" else "Approved ✅"
+            task.output = TaskOutput(description=task.description, raw=text, agent=task.agent.role)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=50)
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    with open(os.path.join("data", "kb_articles.json"), encoding="utf-8") as f:
+        articles = [a for a in json.load(f) if len(clean_html_to_text(a["content"]).split()) > 60]
+    plan = [variant for variant, share in VARIANTS for _ in range(round(share * args.tickets))]
+    base = load_tickets()
+    kickoff = EmulatedKickoff(args.llm_latency)
+    support_crew._kickoff = kickoff
+
+    outcomes = {variant: Counter() for variant, _ in VARIANTS}
+    checks_time = []
+    start = time.perf_counter()
+    for i, variant in enumerate(plan):
+        article = articles[i % len(articles)]
+        kb_result = {"source": "kb_article", "title": article["title"], "url": article["url"],
+                     "content": clean_html_to_text(article["content"]), "is_strict": False}
+        ticket = {**base[i % len(base)], "ticket_id": str(8_000_000 + i)}
+        analysis = TicketAnalysis(text="", parts=[], text_vector=[], part_vectors=[], category="emulated",
+                                  classifications=[], kb_result=kb_result)
+        kickoff.reply_text = make_reply(variant, article)
+        result = support_crew.support_crew_followup_with_review(ticket, analysis=analysis)
+        check_start = time.perf_counter()
+        support_crew.pre_review(result["reply"], kb_result, support_crew.kb_sources(kb_result))
+        checks_time.append(time.perf_counter() - check_start)
+        outcomes[variant]["approved by rules" if result["pre_review"].passed else "escalated"] += 1
+        outcomes[variant]["grounding"] += result["pre_review"].grounding
+    elapsed = time.perf_counter() - start
+
+    reviews = kickoff.calls["Quality Review"]
+    print(f"📊 {len(plan)} replies, emulated {args.llm_latency:.1f} s per LLM task, "
+          f"pre-review {1000 * sum(checks_time) / len(checks_time):.2f} ms per reply")
+    print("| reply variant    | replies | approved by rules | escalated | mean grounding |")
+    print("|------------------|--------:|------------------:|----------:|---------------:|")
+    for variant, counts in outcomes.items():
+        total = counts["approved by rules"] + counts["escalated"]
+        if total:
+            print(f"| {variant:16} | {total:7} | {counts['approved by rules']:17} | {counts['escalated']:9} | "
+                  f"{counts['grounding'] / total:14.2f} |")
+    print(f"\nLLM reviews: {reviews}/{len(plan)}; batch {elapsed:.1f}s vs "
+          f"{len(plan) * 2 * args.llm_latency:.1f}s with an LLM review of every reply")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Strict common-issue tickets answered from their template against the full
+reply + review crew. Tickets go through the real
+support_crew_followup_with_review routing with precomputed analyses; only the
+crew kickoff is emulated with `--llm-latency` seconds per LLM task.
+
+    python benchmarks/bench_strict_path.py [--tickets 40] [--strict-share 0.3] [--llm-latency 0.5]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crews.support_crew as support_crew
+from crews.batch_runner import _ticket_fields, run_batch
+from utils.result_store import ResultStore
+from utils.reply_format import render_reply
+from utils.strict_reply import APPROVED, STRICT_PATH
+from utils.ticket_analysis import TicketAnalysis
+from utils.ticket_utils import load_tickets
+
+
+def emulated_kickoff(latency, calls):
+    def run(support_task, quality_task, kb_result, sources):
+        calls.append(2)
+        time.sleep(2 * latency)
+        return {"reply": render_reply("emulated reply"), "review": APPROVED}
+    return run
+
+
+def analysis_for(text, kb_result):
+    return TicketAnalysis(text=text, parts=[text], text_vector=[], part_vectors=[], category="emulated",
+                          classifications=["emulated"], kb_result=kb_result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=40)
+    parser.add_argument("--strict-share", type=float, default=0.3)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    with open(os.path.join("data", "common_issues.json"), encoding="utf-8") as f:
+        issues = json.load(f)
+    base = load_tickets()
+    tickets, analyses = [], {}
+    strict_every = round(1 / args.strict_share) if args.strict_share else 0
+    for i in range(args.tickets):
+        ticket = {**base[i % len(base)], "ticket_id": str(7_000_000 + i), "needs_response": "1"}
+        if strict_every and i % strict_every == 0:
+            issue = issues[i % len(issues)]
+            kb_result = {"source": "common_issue", "title": issue["title"], "is_strict": True,
+                         "content": f"STRICT_RESPONSE: {issue['expected_response']}", "similarity": 0.93}
+        else:
+            kb_result = {"source": "kb_article", "title": "Emulated article", "content": "...", "is_strict": False}
+        tickets.append(ticket)
+        analyses[ticket["ticket_id"]] = analysis_for(ticket.get("ticket_title", ""), kb_result)
+
+    calls = []
+    support_crew._run_reply_and_review = emulated_kickoff(args.llm_latency, calls)
+    timings = {}
+
+    def process(ticket):
+        start = time.perf_counter()
+        result = support_crew.support_crew_followup_with_review(ticket, analysis=analyses[ticket["ticket_id"]])
+        timings.setdefault(result["path"], []).append(time.perf_counter() - start)
+        return _ticket_fields(result["analysis"], result["reply"], result["review"], result["path"],
+                              result.get("pre_review"))
+
+    with tempfile.TemporaryDirectory() as folder:
+        store = ResultStore(os.path.join(folder, "results.sqlite"))
+        start = time.perf_counter()
+        counts = run_batch(tickets, store, process=process, workers=1, warm_up=None)
+        elapsed = time.perf_counter() - start
+        strict_ids = [t for t, a in analyses.items() if a.kb_result["is_strict"]]
+        stored = store.latest(strict_ids[0])
+        assert stored["review"].startswith(APPROVED) and stored["details"]["path"] == STRICT_PATH
+        paths = store.path_counts()
+        store.close()
+
+    llm_only = args.tickets * 2 * args.llm_latency
+    print(f"\n📊 {args.tickets} tickets, {paths[STRICT_PATH]} strict ({paths[STRICT_PATH] / args.tickets:.0%}), "
+          f"emulated {args.llm_latency:.1f} s per LLM task")
+    print("| path   | tickets | mean latency (ms) | LLM calls |")
+    print("|--------|--------:|------------------:|----------:|")
+    for path, values in sorted(timings.items()):
+        llm_calls = sum(calls) if path != STRICT_PATH else 0
+        print(f"| {path:6} | {len(values):7} | {1000 * sum(values) / len(values):17.2f} | {llm_calls:9} |")
+    print(f"\nBatch: {elapsed:.1f}s with the strict path vs {llm_only:.1f}s if every ticket ran the crew "
+          f"({counts['done']} done)")
+
+
+if __name__ == "__main__":
+    main()
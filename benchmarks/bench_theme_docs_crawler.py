@@ -0,0 +1,134 @@
+"""
+Run the theme docs crawler against a local stand-in docs site and compare it
+with the old crawl (one browser page, every slug rendered in sequence with a
+0.5 s pause, markdownify on every page).
+
+    python benchmarks/bench_theme_docs_crawler.py [--pages 30] [--js-share 0.3] [--render 0.2] [--contexts 4]
+
+The browser is emulated: a render costs `--render` seconds and returns the page
+with its JS-injected content, so the timings need no Chromium. A fraction
+`--js-share` of the pages only has its content after rendering.
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web
+from markdownify import markdownify as md
+
+from crawlers.crawl_theme_docs import crawl_docs, extract_section
+from crawlers.http_cache import HTTPCache
+
+PARAGRAPH = "<p>Go to Appearance &gt; Theme Settings and import the demo content with the importer. </p>" * 4
+
+
+class StandInDocs:
+    def __init__(self, count, js_share, render_cost):
+        self.render_cost = render_cost
+        self.pages = {f"theme-{i}": f"<h2>Theme {i}</h2>{PARAGRAPH}" for i in range(count)}
+        self.js_pages = set(list(self.pages)[:int(count * js_share)])
+        self.renders = 0
+
+    def html(self, slug, rendered):
+        content = "" if slug in self.js_pages and not rendered else self.pages[slug]
+        return (f"<html><head><title>{slug} docs</title></head><body><div id=\"page\">{content}</div>"
+                f"<script src=\"/app.js\"></script></body></html>")
+
+    async def page(self, request):
+        slug = request.match_info["slug"]
+        if slug not in self.pages:
+            raise web.HTTPNotFound()
+        body = self.html(slug, False)
+        etag = f'"{hash(body)}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(text=body, content_type="text/html", headers={"ETag": etag})
+
+    async def render(self, url):
+        """Emulated browser render: `render_cost` seconds, then the page with its JS content."""
+        self.renders += 1
+        await asyncio.sleep(self.render_cost)
+        return self.html(url.rstrip("/").rsplit("/", 1)[1], True)
+
+
+async def old_crawl(site, base_url, delay):
+    """The previous crawler: one page rendered after the other, converted every time."""
+    docs = []
+    for slug in site.pages:
+        title, section = extract_section(await site.render(f"{base_url}{slug}/"), slug)
+        docs.append({"slug": slug, "url": f"{base_url}{slug}/", "title": title,
+                     "content": md(section.decode_contents().strip(), heading_style="ATX")})
+        await asyncio.sleep(delay)
+    return docs, docs
+
+
+async def run(args):
+    site = StandInDocs(args.pages, args.js_share, args.render)
+    app = web.Application()
+    app.router.add_get("/theme/{slug}/", site.page)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    server = web.TCPSite(runner, "127.0.0.1", 0)
+    await server.start()
+    base_url = f"http://127.0.0.1:{runner.addresses[0][1]}/theme/"
+
+    rows = []
+
+    async def measure(label, coro):
+        site.renders = 0
+        start = time.perf_counter()
+        result = await coro
+        rows.append((label, time.perf_counter() - start, site.renders, len(result[0]), len(result[1])))
+        return result
+
+    reference, _ = await measure("old: 1 page, sequential", old_crawl(site, base_url, args.old_delay))
+    with tempfile.TemporaryDirectory() as folder:
+        cache = HTTPCache(os.path.join(folder, "http_cache.sqlite"))
+        state, previous = {}, {}
+
+        async def crawl(label):
+            nonlocal state, previous
+            docs, changed, state = await measure(label, crawl_docs(
+                list(site.pages), previous, state, base_url, cache, site.render, contexts=args.contexts))
+            previous = {doc["slug"]: doc for doc in docs}
+            return docs, changed
+
+        docs, _ = await crawl("new: cold")
+        assert docs == reference, "the new crawler converts pages differently"
+        _, changed = await crawl("new: nothing changed")
+        assert not changed
+        static_slug, js_slug = list(site.pages)[-1], sorted(site.js_pages)[0] if site.js_pages else None
+        site.pages[static_slug] += "<p>New section.</p>"
+        if js_slug:
+            site.pages[js_slug] += "<p>New section.</p>"
+        _, changed = await crawl("new: 1 static + 1 JS edit")
+        assert sorted(doc["slug"] for doc in changed) == sorted(filter(None, (static_slug, js_slug)))
+        cache.close()
+    await runner.cleanup()
+
+    print(f"📊 {args.pages} doc pages ({len(site.js_pages)} need JS), {args.render * 1e3:.0f} ms per render, "
+          f"{args.contexts} browser contexts")
+    print("| crawl                      | time (s) | renders | docs | changed |")
+    print("|----------------------------|---------:|--------:|-----:|--------:|")
+    for label, elapsed, renders, docs, changed in rows:
+        print(f"| {label:26} | {elapsed:8.2f} | {renders:7} | {docs:4} | {changed:7} |")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--js-share", type=float, default=0.3)
+    parser.add_argument("--render", type=float, default=0.2)
+    parser.add_argument("--contexts", type=int, default=4)
+    parser.add_argument("--old-delay", type=float, default=0.5)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Run the incremental Ticksy sync against a local mock of the closed- and
+open-ticket endpoints and report what each sync appends or rewrites, compared
+with the old full overwrite (json.dump(..., indent=2) of the whole payload).
+
+    python benchmarks/bench_ticket_sync.py [--archive 2000] [--recent 100]
+
+The mock serves the `recent` newest tickets of a synthetic archive built from
+data/closed_tickets.json; the local store starts from the full archive.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.document_loaders as loaders
+from crawlers.crawl_closed_tickets import fetch_closed_tickets, sync_closed_tickets
+from crawlers.crawl_open_tickets import fetch_open_tickets, save_tickets
+
+
+class MockTicksy:
+    def __init__(self, closed, opened):
+        self.closed = closed
+        self.opened = opened
+        self.payload_bytes = 0
+
+    def handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.endswith("/closed-tickets.json"):
+                    body = {"closed-tickets": mock.closed}
+                elif self.path.endswith("/open-tickets.json"):
+                    body = {"open-tickets": mock.opened}
+                else:
+                    self.send_error(404)
+                    return
+                data = json.dumps(body).encode("utf-8")
+                mock.payload_bytes += len(data)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def synthetic_archive(size):
+    with open(os.path.join("data", "closed_tickets.json"), encoding="utf-8") as f:
+        base = json.load(f)["closed-tickets"]
+    return [{**base[i % len(base)], "ticket_id": str(1_000_000 + i)} for i in range(size)]
+
+
+def add_comment(ticket, text):
+    comment = {**ticket["ticket_comments"][0], "comment_id": str(int(time.time() * 1e6)),
+               "comment": text, "time_stamp": "2030-01-01 00:00:00"}
+    return {**ticket, "ticket_comments": [comment] + ticket["ticket_comments"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--archive", type=int, default=2000)
+    parser.add_argument("--recent", type=int, default=100)
+    args = parser.parse_args()
+
+    archive = synthetic_archive(args.archive)
+    with open(os.path.join("data", "open_tickets.json"), encoding="utf-8") as f:
+        opened = json.load(f)["open-tickets"]
+    mock = MockTicksy(archive[-args.recent:], opened)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), mock.handler())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1/domain/key"
+
+    folder = tempfile.mkdtemp()
+    data, state = os.path.join(folder, "data"), os.path.join(folder, "cache")
+    os.makedirs(data)
+    with open(os.path.join(data, "closed_tickets.json"), "w", encoding="utf-8") as f:
+        json.dump({"closed-tickets": archive[:-args.recent]}, f)
+    full_size = len(json.dumps({"closed-tickets": archive}, indent=2, ensure_ascii=False).encode("utf-8"))
+    store = os.path.join(data, "closed_tickets.jsonl")
+
+    def sync(label):
+        size = os.path.getsize(store) if os.path.exists(store) else 0
+        mock.payload_bytes = 0
+        start = time.perf_counter()
+        closed = sync_closed_tickets(fetch_closed_tickets(base_url), data, state)
+        opened_changes = save_tickets(fetch_open_tickets(base_url), os.path.join(data, "open_tickets.json"), state)
+        elapsed = time.perf_counter() - start
+        rows.append((label, elapsed, mock.payload_bytes, os.path.getsize(store) - size,
+                     len(closed["new"]) + len(closed["updated"]),
+                     len(opened_changes["new"]) + len(opened_changes["updated"]) + len(opened_changes["removed"])))
+        return closed, opened_changes
+
+    rows = []
+    try:
+        closed, _ = sync("seed + first sync")
+        assert len(closed["new"]) == args.recent
+        closed, opened_changes = sync("nothing changed")
+        assert not closed["new"] and not closed["updated"] and not any(opened_changes[k] for k in opened_changes)
+
+        mock.closed = mock.closed[2:] + [add_comment(mock.closed[0], "<p>Reopened and closed again.</p>")]
+        mock.closed.append({**archive[0], "ticket_id": "9999999"})
+        mock.opened = [add_comment(mock.opened[0], "<p>Any update?</p>")] + mock.opened[2:]
+        closed, opened_changes = sync("1 updated, 1 new")
+        assert closed["updated"] == [archive[-args.recent]["ticket_id"]] and closed["new"] == ["9999999"]
+        assert len(opened_changes["updated"]) == 1 and len(opened_changes["removed"]) == 1
+
+        loaders.DATA_FOLDER = data
+        tickets = list(loaders.latest_records("closed_tickets", key="closed-tickets"))
+        assert len(tickets) == args.archive + 1 and len({t["ticket_id"] for t in tickets}) == len(tickets)
+    finally:
+        server.shutdown()
+        shutil.rmtree(folder)
+
+    print(f"📊 Archive of {args.archive} closed tickets, endpoint returns the newest {args.recent}; "
+          f"a full indent=2 overwrite writes {full_size / 1e6:.1f} MB")
+    print("| sync              | time (s) | downloaded (KB) | appended (KB) | closed changed | open changed |")
+    print("|-------------------|---------:|----------------:|--------------:|---------------:|-------------:|")
+    for label, elapsed, downloaded, appended, closed_changed, open_changed in rows:
+        print(f"| {label:17} | {elapsed:8.2f} | {downloaded / 1024:15.0f} | {appended / 1024:13.0f} | "
+              f"{closed_changed:14} | {open_changed:12} |")
+    print(f"✅ Store holds {len(tickets)} tickets (latest revision each).")
+
+
+if __name__ == "__main__":
+    main()
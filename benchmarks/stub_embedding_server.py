@@ -0,0 +1,97 @@
+"""
+A local stand-in for the OpenAI embeddings endpoint, for exercising the
+embedding pipeline offline. It returns deterministic vectors and can inject
+latency and 429 responses.
+
+    python benchmarks/stub_embedding_server.py --port 8765 --latency 0.2 --error-rate 0.1
+
+Point OpenAIEmbeddings at it with openai_api_base="http://127.0.0.1:8765/v1".
+"""
+import json
+import time
+import base64
+import random
+import hashlib
+import argparse
+import threading
+from array import array
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_vector(item, dim):
+    seed = hashlib.sha256(json.dumps(item).encode("utf-8")).digest()
+    rng = random.Random(seed)
+    return [rng.uniform(-1, 1) for _ in range(dim)]
+
+
+def make_handler(latency, error_rate, dim, stats):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, payload, headers=None):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            with stats["lock"]:
+                stats["requests"] += 1
+            time.sleep(latency)
+
+            if random.random() < error_rate:
+                with stats["lock"]:
+                    stats["rate_limited"] += 1
+                self._send(429, {"error": {"message": "Rate limit reached", "type": "requests"}},
+                           headers={"Retry-After": "0.2"})
+                return
+
+            inputs = request.get("input", [])
+            if isinstance(inputs, (str, int)) or (inputs and isinstance(inputs[0], int)):
+                inputs = [inputs]
+            data = []
+            for i, item in enumerate(inputs):
+                vector = fake_vector(item, dim)
+                if request.get("encoding_format") == "base64":
+                    vector = base64.b64encode(array("f", vector).tobytes()).decode("ascii")
+                data.append({"object": "embedding", "index": i, "embedding": vector})
+            with stats["lock"]:
+                stats["inputs"] += len(inputs)
+            self._send(200, {
+                "object": "list",
+                "data": data,
+                "model": request.get("model", "stub"),
+                "usage": {"prompt_tokens": 0, "total_tokens": 0},
+            })
+
+    return Handler
+
+
+def start_stub_server(port=0, latency=0.0, error_rate=0.0, dim=1536):
+    """Start the stub server in a background thread. Returns (server, base_url, stats)."""
+    stats = {"requests": 0, "inputs": 0, "rate_limited": 0, "lock": threading.Lock()}
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(latency, error_rate, dim, stats))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1", stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    parser.add_argument("--dim", type=int, default=1536)
+    args = parser.parse_args()
+    server, url, _ = start_stub_server(args.port, args.latency, args.error_rate, args.dim)
+    print(f"🧪 Stub embeddings server listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -1,9 +1,15 @@
 import requests
-import json
 import os
+import sys
+import argparse
 from dotenv import load_dotenv
 from pathlib import Path
 
+# Allow running as `python crawlers/crawl_closed_tickets.py` from the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from crawlers.ticket_sync import DATA_FOLDER, TicketStore
+
 # Load .env from parent directory explicitly
 dotenv_path = Path(__file__).resolve().parent.parent / '.env'
 load_dotenv(dotenv_path=dotenv_path)
@@ -11,30 +17,43 @@ load_dotenv(dotenv_path=dotenv_path)
 TICKSY_DOMAIN = os.getenv("TICKSY_DOMAIN")
 TICKSY_API_KEY = os.getenv("TICKSY_API_KEY")
 BASE_API_URL = f"https://api.ticksy.com/v1/{TICKSY_DOMAIN}/{TICKSY_API_KEY}"
+PAYLOAD_KEY = "closed-tickets"
+TIMEOUT = 60
 
-os.makedirs("data", exist_ok=True)
-
-def fetch_closed_tickets():
-    url = f"{BASE_API_URL}/closed-tickets.json"
+def fetch_closed_tickets(base_url=BASE_API_URL, session=None):
+    url = f"{base_url}/closed-tickets.json"
     print(f"Fetching tickets from {url}")
 
-    response = requests.get(url)
+    response = (session or requests).get(url, timeout=TIMEOUT)
 
     if response.status_code != 200:
         print(f"Failed to fetch tickets: {response.status_code}")
         return []
 
-    return response.json()
-
-def save_tickets(data, filename="data/closed_tickets.json"):
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    print(f"✅ Saved recent closed tickets to {filename}")
+    data = response.json()
+    return data.get(PAYLOAD_KEY, []) if isinstance(data, dict) else data
+
+def sync_closed_tickets(tickets, folder=DATA_FOLDER, state_folder=None):
+    """
+    Merge fetched closed tickets into the append-only store data/closed_tickets.jsonl
+    and return the changed-ticket set. Closed tickets are only ever added or updated.
+    """
+    kwargs = {"state_folder": state_folder} if state_folder else {}
+    store = TicketStore("closed_tickets", folder, key=PAYLOAD_KEY, **kwargs)
+    changes = store.merge(tickets)
+    print(f"✅ {len(changes['new'])} new and {len(changes['updated'])} updated closed tickets appended to "
+          f"{store.path} (high-water mark: ticket {changes['high_water'].get('ticket_id')}, "
+          f"{changes['high_water'].get('time_stamp')}).")
+    return changes
 
 def main():
-    tickets = fetch_closed_tickets()
+    parser = argparse.ArgumentParser(description="Incrementally sync closed Ticksy tickets.")
+    parser.add_argument("--base-url", default=BASE_API_URL)
+    args = parser.parse_args()
+
+    tickets = fetch_closed_tickets(args.base_url)
     if tickets:
-        save_tickets(tickets)
+        sync_closed_tickets(tickets)
     else:
         print("No tickets fetched.")
 
@@ -1,68 +1,150 @@
-import requests
-from bs4 import BeautifulSoup
+import os
+import sys
 import json
-import time
+import asyncio
+import argparse
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+# Allow running as `python crawlers/crawl_kb_articles.py` from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawlers.http_cache import CACHE_PATH, USER_AGENT, HTTPCache, HostLimiter, cached_get
 
 BASE_URL = "https://wolfthemes.ticksy.com"
-ARTICLE_LIST_URL = f"{BASE_URL}/articles/"
+ARTICLE_LIST_PATH = "/articles/"
+OUTPUT_PATH = os.path.join("data", "kb_articles.json")
+# New or changed articles of the last run, for incremental downstream processing
+CHANGES_PATH = os.path.join("data", "cache", "kb_articles_changes.json")
+
+CONCURRENCY = 4      # requests in flight per host
+REQUEST_DELAY = 0.25  # seconds between request starts to the same host
+TIMEOUT = 30
 
-def get_article_links():
-    print("🔎 Crawling article links...")
-    response = requests.get(ARTICLE_LIST_URL)
-    soup = BeautifulSoup(response.text, "html.parser")
-    links = []
 
+def parse_article_links(html, base_url=BASE_URL):
+    """Absolute URLs of the article links on the article list page, in page order."""
+    soup = BeautifulSoup(html, "html.parser")
+    links = []
     # The articles are listed in <a> tags with hrefs containing '/article/'
     for a in soup.find_all("a", href=True):
         href = a["href"]
         if "/article/" in href:
-            full_url = BASE_URL + href if not href.startswith("http") else href
+            full_url = urljoin(base_url + "/", href)
             if full_url not in links:
                 links.append(full_url)
+    return links
+
 
-    return list(set(links))
-
-def fetch_article_content(url):
-    try:
-        response = requests.get(url)
-        soup = BeautifulSoup(response.text, "html.parser")
-        article_section = soup.select_one("#single-article")
-        if not article_section:
-            print(f"⚠️ Article content not found at {url}")
-            return None
-
-        title = article_section.select_one("h1.page-title")
-        content = article_section.select_one(".article-content")
-        if not title or not content:
-            print(f"⚠️ Missing title or content in article {url}")
-            return None
-
-        return {
-            "title": title.get_text(strip=True),
-            "url": url,
-            "content": content.decode_contents().strip()
-        }
-    except Exception as e:
-        print(f"⚠️ Error fetching {url}: {e}")
-        with open("errors.log", "a", encoding="utf-8") as log:
-            log.write(f"{url} - {e}\n")
+def parse_article(html, url):
+    soup = BeautifulSoup(html, "html.parser")
+    article_section = soup.select_one("#single-article")
+    if not article_section:
+        print(f"⚠️ Article content not found at {url}")
         return None
 
-def main():
-    links = get_article_links()
-    print(f"🔗 Found {len(links)} articles.")
-    articles = []
+    title = article_section.select_one("h1.page-title")
+    content = article_section.select_one(".article-content")
+    if not title or not content:
+        print(f"⚠️ Missing title or content in article {url}")
+        return None
+
+    return {
+        "title": title.get_text(strip=True),
+        "url": url,
+        "content": content.decode_contents().strip()
+    }
+
+
+def log_error(url, error):
+    print(f"⚠️ Error fetching {url}: {error}")
+    with open("errors.log", "a", encoding="utf-8") as log:
+        log.write(f"{url} - {error}\n")
 
-    for i, link in enumerate(links, 1):
-        print(f"[{i}/{len(links)}] Fetching: {link}")
-        article = fetch_article_content(link)
+
+async def crawl(base_url=BASE_URL, cache=None, concurrency=CONCURRENCY, delay=REQUEST_DELAY, previous=None):
+    """
+    Fetch the article list and every article concurrently, revalidating cached
+    copies with conditional requests. Returns (articles, changed): every article
+    currently listed, and the ones that are new or changed since the last crawl.
+    An article that fails to fetch and has no cached copy keeps its record from
+    `previous` (the last output), so a transient error never drops it from the KB.
+    """
+    import aiohttp
+
+    cache = cache or HTTPCache(CACHE_PATH)
+    limiter = HostLimiter(concurrency, delay)
+    timeout = aiohttp.ClientTimeout(total=TIMEOUT)
+    connector = aiohttp.TCPConnector(limit_per_host=concurrency)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector,
+                                     headers={"User-Agent": USER_AGENT}) as session:
+        print("🔎 Crawling article links...")
+        listing = await cached_get(session, urljoin(base_url + "/", ARTICLE_LIST_PATH.lstrip("/")), cache, limiter)
+        links = parse_article_links(listing.body, base_url)
+        print(f"🔗 Found {len(links)} articles.")
+
+        async def fetch(url):
+            try:
+                return await cached_get(session, url, cache, limiter)
+            except Exception as e:
+                log_error(url, e)
+                return None
+
+        results = await asyncio.gather(*(fetch(url) for url in links))
+
+    previous_by_url = {article.get("url"): article for article in previous or []}
+    articles, changed, kept = [], [], 0
+    for url, result in zip(links, results):
+        if result is None:
+            if url in previous_by_url:
+                articles.append(previous_by_url[url])
+                kept += 1
+            continue
+        article = parse_article(result.body, result.url)
         if article:
             articles.append(article)
-        time.sleep(1)  # be nice to the server
+            if result.changed:
+                changed.append(article)
+    if kept:
+        print(f"⚠️ Kept the previous copy of {kept} articles that could not be fetched (see errors.log).")
+    return articles, changed
+
+
+def save_json(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl the Ticksy knowledge base articles.")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument("--changes", default=CHANGES_PATH, help="where to write only the new or changed articles")
+    parser.add_argument("--cache", default=CACHE_PATH)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--delay", type=float, default=REQUEST_DELAY)
+    args = parser.parse_args()
+
+    previous = []
+    if os.path.exists(args.output):
+        with open(args.output, encoding="utf-8") as f:
+            previous = json.load(f)
+
+    cache = HTTPCache(args.cache)
+    articles, changed = asyncio.run(crawl(args.base_url.rstrip("/"), cache, args.concurrency, args.delay, previous))
+    removed = {a.get("url") for a in previous} - {a["url"] for a in articles}
+
+    save_json(args.changes, changed)
+    if changed or removed or not os.path.exists(args.output):
+        # Leave an unchanged corpus untouched so the index manifest sees no change
+        save_json(args.output, articles)
+    print(f"✅ Saved {len(articles)} articles to {args.output}: "
+          f"{len(changed)} new or changed (in {args.changes}), {len(removed)} removed.")
 
-    with open("data/wolfthemes_kb_articles.json", "w", encoding="utf-8") as f:
-        json.dump(articles, f, indent=2, ensure_ascii=False)
-    print(f"✅ Saved {len(articles)} articles to data/kb_articles.json")
 
 if __name__ == "__main__":
     main()
@@ -1,9 +1,15 @@
 import requests
-import json
 import os
+import sys
+import argparse
 from dotenv import load_dotenv
 from pathlib import Path
 
+# Allow running as `python crawlers/crawl_open_tickets.py` from the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from crawlers.ticket_sync import sync_ticket_snapshot
+
 # Load .env from parent directory explicitly
 dotenv_path = Path(__file__).resolve().parent.parent / '.env'
 load_dotenv(dotenv_path=dotenv_path)
@@ -11,32 +17,44 @@ load_dotenv(dotenv_path=dotenv_path)
 TICKSY_DOMAIN = os.getenv("TICKSY_DOMAIN")
 TICKSY_API_KEY = os.getenv("TICKSY_API_KEY")
 BASE_API_URL = f"https://api.ticksy.com/v1/{TICKSY_DOMAIN}/{TICKSY_API_KEY}"
+PAYLOAD_KEY = "open-tickets"
+OUTPUT_PATH = "data/open_tickets.json"
+TIMEOUT = 60
 
-os.makedirs("data", exist_ok=True)
-
-def fetch_open_tickets():
-    url = f"{BASE_API_URL}/open-tickets.json"
+def fetch_open_tickets(base_url=BASE_API_URL, session=None):
+    url = f"{base_url}/open-tickets.json"
     print(f"Fetching tickets from {url}")
 
-    response = requests.get(url)
+    response = (session or requests).get(url, timeout=TIMEOUT)
 
     if response.status_code != 200:
         print(f"Failed to fetch tickets: {response.status_code}")
         return []
 
-    return response.json()
+    data = response.json()
+    return data.get(PAYLOAD_KEY, []) if isinstance(data, dict) else data
 
-def save_tickets(data, filename="data/open_tickets.json"):
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    print(f"✅ Saved recent open tickets to {filename}")
+def save_tickets(data, filename=OUTPUT_PATH, state_folder=None):
+    """
+    Replace the open-ticket set, rewriting `filename` only when a ticket was opened,
+    answered or closed. Returns the changed-ticket set.
+    """
+    kwargs = {"state_folder": state_folder} if state_folder else {}
+    changes = sync_ticket_snapshot(data, filename, PAYLOAD_KEY, **kwargs)
+    print(f"✅ Open tickets in {filename}: {len(changes['new'])} new, {len(changes['updated'])} updated, "
+          f"{len(changes['removed'])} no longer open.")
+    return changes
 
 def main():
-    tickets = fetch_open_tickets()
+    parser = argparse.ArgumentParser(description="Sync open Ticksy tickets.")
+    parser.add_argument("--base-url", default=BASE_API_URL)
+    args = parser.parse_args()
+
+    tickets = fetch_open_tickets(args.base_url)
     if tickets:
         save_tickets(tickets)
     else:
         print("No tickets fetched.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,80 +1,202 @@
 import os
+import sys
 import json
-import time
+import asyncio
+import hashlib
+import argparse
 from dotenv import load_dotenv
 from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
 from markdownify import markdownify as md
 
 load_dotenv()
 
-# Load theme slugs from GitHub
-import base64
-import requests
+# Allow running as `python crawlers/crawl_theme_docs.py` from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawlers.github_client import get_theme_slugs
+from crawlers.http_cache import CACHE_PATH, USER_AGENT, HTTPCache, HostLimiter, cached_get
 
-GITHUB_USERNAME = os.getenv("GITHUB_USERNAME")
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
-REPO = "wolfthemes/wolf-supertheme"
-FILE_PATH = "theme-slugs.json"
 DOC_BASE_URL = "https://doc.wolfthemes.com/theme/"
+OUTPUT_PATH = os.path.join("data", "theme_docs.json")
+# Per-slug content hash and whether the page needs a browser, plus the changed docs of the last run
+STATE_PATH = os.path.join("data", "cache", "theme_docs_state.json")
+CHANGES_PATH = os.path.join("data", "cache", "theme_docs_changes.json")
 
-def get_theme_slugs():
-    print("📥 Fetching theme slugs from private GitHub repo via API...")
-    api_url = f"https://api.github.com/repos/{REPO}/contents/{FILE_PATH}"
-    headers = {
-        "Accept": "application/vnd.github.v3+json",
-    }
-    response = requests.get(api_url, headers=headers, auth=(GITHUB_USERNAME, GITHUB_TOKEN))
-    if response.status_code != 200:
-        raise Exception(f"❌ Failed to fetch theme slugs ({response.status_code})\n{response.text}")
-    content_data = response.json()
-    decoded_content = base64.b64decode(content_data["content"]).decode("utf-8")
-    return json.loads(decoded_content)["theme_slugs"]
-
-def fetch_doc_content(page, slug):
-    url = f"{DOC_BASE_URL}{slug}/"
-    try:
-        page.goto(url, timeout=15000)
-        page.wait_for_selector("#page", timeout=10000)
-
-        html = page.content()
-        soup = BeautifulSoup(html, "html.parser")
-        content_section = soup.select_one("#page") or soup.body
-
-        title = soup.title.string.strip() if soup.title else slug
-        return {
-            "slug": slug,
-            "url": url,
-            "title": title,
-            "content": md(content_section.decode_contents().strip(), heading_style="ATX")
-        }
-
-    except Exception as e:
-        print(f"⚠️ Error fetching {url}: {e}")
-        return None
-
-def main():
-    slugs = get_theme_slugs()
-    print(f"🔗 Found {len(slugs)} theme slugs.")
-    docs = []
+BROWSER_CONTEXTS = 4   # pages rendered in parallel
+CONCURRENCY = 4        # plain HTTP requests in flight to the docs host
+REQUEST_DELAY = 0.1    # seconds between request starts to the docs host
+# A statically served #page with less text than this is a JS shell: render it in the browser
+MIN_STATIC_TEXT = 200
+TIMEOUT = 30
+
+
+def extract_section(html, slug):
+    """(title, #page element) of a doc page; the element is None when the page has no body."""
+    soup = BeautifulSoup(html, "html.parser")
+    content_section = soup.select_one("#page") or soup.body
+    title = soup.title.string.strip() if soup.title and soup.title.string else slug
+    return title, content_section
+
+
+def needs_browser(section):
+    return section is None or len(section.get_text(strip=True)) < MIN_STATIC_TEXT
+
+
+class BrowserPool:
+    """
+    `size` Playwright browser contexts sharing one headless Chromium, handed out
+    to renders through a queue. The browser is only launched on the first render,
+    so a run where every page is served statically never starts it.
+    """
+
+    def __init__(self, size=BROWSER_CONTEXTS):
+        self.size = size
+        self._playwright = None
+        self._browser = None
+        self._pages = None
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+
+    async def _start(self):
+        from playwright.async_api import async_playwright
+
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=True)
+        pages = asyncio.Queue()
+        for _ in range(self.size):
+            context = await self._browser.new_context(user_agent=USER_AGENT)
+            pages.put_nowait(await context.new_page())
+        self._pages = pages
+
+    async def __call__(self, url):
+        """Rendered HTML of `url` once its #page element exists."""
+        async with self._lock:
+            if self._pages is None:
+                await self._start()
+        page = await self._pages.get()
+        try:
+            await page.goto(url, timeout=15000)
+            await page.wait_for_selector("#page", timeout=10000)
+            return await page.content()
+        finally:
+            self._pages.put_nowait(page)
+
+
+class _Renderer:
+    """Adapts a plain async render function to the BrowserPool interface."""
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
+    def __init__(self, render):
+        self.render = render
 
-        for i, slug in enumerate(slugs, 1):
-            print(f"[{i}/{len(slugs)}] Fetching: {slug}")
-            doc = fetch_doc_content(page, slug)
-            if doc:
-                docs.append(doc)
-            time.sleep(0.5)  # polite delay
+    async def __aenter__(self):
+        return self.render
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+async def crawl_docs(slugs, previous=None, state=None, base_url=DOC_BASE_URL, cache=None, render=None,
+                     contexts=BROWSER_CONTEXTS, concurrency=CONCURRENCY, delay=REQUEST_DELAY):
+    """
+    Fetch the doc page of every slug: over plain HTTP (conditional GET against the
+    response cache) when the served HTML already holds the doc, and through the
+    browser pool (or `render`, an async url -> HTML function) when it still needs
+    JS; pages rendered last time are re-checked over HTTP first. A page whose
+    content hash (or, when served statically, whose 304) shows it unchanged
+    reuses its `previous` doc without converting it again.
+    Returns (docs, changed docs, state).
+    """
+    import aiohttp
+
+    previous = previous or {}
+    state = dict(state or {})
+    cache = cache or HTTPCache(CACHE_PATH)
+    limiter = HostLimiter(concurrency, delay)
+    timeout = aiohttp.ClientTimeout(total=TIMEOUT)
+    connector = aiohttp.TCPConnector(limit_per_host=concurrency)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector,
+                                     headers={"User-Agent": USER_AGENT}) as session, \
+            (BrowserPool(contexts) if render is None else _Renderer(render)) as render_page:
+
+        async def crawl_one(slug):
+            url = f"{base_url}{slug}/"
+            entry = state.get(slug) or {}
+            try:
+                # Pages rendered last time are re-checked too, in case the host now serves them statically
+                result = await cached_get(session, url, cache, limiter)
+                if not result.changed and not entry.get("browser") and entry.get("hash") and slug in previous:
+                    return previous[slug], False
+                title, section = extract_section(result.body, slug)
+                browser = needs_browser(section)
+                if browser:
+                    title, section = extract_section(await render_page(url), slug)
+            except Exception as e:
+                print(f"⚠️ Error fetching {url}: {e}")
+                return previous.get(slug), False
+            if section is None:
+                print(f"⚠️ No content at {url}")
+                return previous.get(slug), False
+
+            content_html = section.decode_contents().strip()
+            digest = hashlib.sha256(f"{title}\n{content_html}".encode("utf-8")).hexdigest()
+            state[slug] = {"hash": digest, "browser": browser}
+            if digest == entry.get("hash") and slug in previous:
+                return previous[slug], False
+            doc = {
+                "slug": slug,
+                "url": url,
+                "title": title,
+                "content": md(content_html, heading_style="ATX")
+            }
+            return doc, doc != previous.get(slug)
+
+        results = await asyncio.gather(*(crawl_one(slug) for slug in slugs))
+
+    docs = [doc for doc, _ in results if doc]
+    changed = [doc for doc, is_changed in results if doc and is_changed]
+    return docs, changed, {slug: state[slug] for slug in slugs if slug in state}
+
+
+def load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_json(path, data, **kwargs):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, **kwargs)
+    os.replace(tmp_path, path)
+
+
+def main(slugs=None, contexts=BROWSER_CONTEXTS):
+    slugs = get_theme_slugs() if slugs is None else slugs
+    print(f"🔗 Found {len(slugs)} theme slugs.")
 
-        browser.close()
+    previous = {doc["slug"]: doc for doc in load_json(OUTPUT_PATH, [])}
+    docs, changed, state = asyncio.run(crawl_docs(slugs, previous, load_json(STATE_PATH, {}), contexts=contexts))
+    removed = set(previous) - {doc["slug"] for doc in docs}
 
-    os.makedirs("data", exist_ok=True)
-    with open("data/theme_docs.json", "w", encoding="utf-8") as f:
-        json.dump(docs, f, indent=2, ensure_ascii=False)
-    print(f"✅ Saved {len(docs)} docs to data/theme_docs.json")
+    save_json(STATE_PATH, state)
+    save_json(CHANGES_PATH, changed)
+    if changed or removed or not os.path.exists(OUTPUT_PATH):
+        # Leave an unchanged corpus untouched so the index manifest sees no change
+        save_json(OUTPUT_PATH, docs, indent=2)
+    print(f"✅ Saved {len(docs)} docs to {OUTPUT_PATH}: {len(changed)} new or changed, {len(removed)} removed "
+          f"({sum(entry['browser'] for entry in state.values())} rendered in the browser).")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Crawl the theme documentation pages.")
+    parser.add_argument("--contexts", type=int, default=BROWSER_CONTEXTS, help="browser pages rendered in parallel")
+    main(contexts=parser.parse_args().contexts)
@@ -1,43 +1,18 @@
 import os
+import sys
 import json
-import base64
-import requests
-from dotenv import load_dotenv
 
-load_dotenv()
+# Allow running as `python crawlers/crawl_theme_meta.py` from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-GITHUB_USERNAME = os.getenv("GITHUB_USERNAME")
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
-REPO = "wolfthemes/wolf-supertheme"
-SLUGS_PATH = "theme-slugs.json"
-OUTPUT_PATH = "data/theme_info.json"
+from crawlers.github_client import REPO, get_client, get_theme_slugs
 
-def get_theme_slugs():
-    print("📥 Fetching theme slugs from private GitHub repo via API...")
-    api_url = f"https://api.github.com/repos/{REPO}/contents/{SLUGS_PATH}"
-    headers = {
-        "Accept": "application/vnd.github.v3+json",
-    }
-    response = requests.get(api_url, headers=headers, auth=(GITHUB_USERNAME, GITHUB_TOKEN))
-    if response.status_code != 200:
-        raise Exception(f"❌ Failed to fetch theme slugs ({response.status_code})\n{response.text}")
-    content_data = response.json()
-    decoded_content = base64.b64decode(content_data["content"]).decode("utf-8")
-    return json.loads(decoded_content)["theme_slugs"]
+OUTPUT_PATH = "data/theme_info.json"
 
-def fetch_theme_config(slug):
-    # Use GitHub API endpoint instead of raw URL
-    api_url = f"https://api.github.com/repos/{REPO}/contents/THEMES/{slug}/app.config.json"
-    headers = {
-        "Accept": "application/vnd.github.raw",
-        "Authorization": f"token {GITHUB_TOKEN}"
-    }
-    
-    print(f"🔗 Fetching: {api_url}")
+def fetch_theme_config(slug, client=None):
+    client = client or get_client()
     try:
-        res = requests.get(api_url, headers=headers, timeout=10)
-        res.raise_for_status()
-        return res.json()
+        return json.loads(client.get_file(REPO, f"THEMES/{slug}/app.config.json"))
     except Exception as e:
         print(f"⚠️ Error fetching config for {slug}: {e}")
         return None
@@ -55,23 +30,48 @@ def extract_metadata(config):
         "category": config.get("category"),
     }
 
-def main():
-    os.makedirs("data", exist_ok=True)
-    theme_meta = {}
-
-    slugs = get_theme_slugs()
+def crawl_theme_meta(slugs=None, client=None, previous=None):
+    """
+    {slug: metadata} for every theme, fetching the app.config.json files concurrently.
+    A theme whose config fails to fetch keeps its entry from `previous` (the last
+    output), so a transient error never drops it from the KB.
+    """
+    client = client or get_client()
+    slugs = get_theme_slugs(client) if slugs is None else slugs
     print(f"🔍 Found {len(slugs)} slugs.")
+    configs = client.map(lambda slug: fetch_theme_config(slug, client), slugs)
+    print(f"🔗 {client.not_modified}/{client.requests} GitHub requests answered 304 (unchanged).")
 
-    for i, slug in enumerate(slugs, 1):
-        print(f"[{i}/{len(slugs)}] Processing: {slug}")
-        config = fetch_theme_config(slug)
+    previous = previous or {}
+    theme_meta, kept = {}, 0
+    for slug, config in zip(slugs, configs):
         if config:
             theme_meta[slug] = extract_metadata(config)
+        elif slug in previous:
+            theme_meta[slug] = previous[slug]
+            kept += 1
+    if kept:
+        print(f"⚠️ Kept the previous metadata of {kept} themes whose config could not be fetched.")
+    return theme_meta
+
+def main(slugs=None, client=None, output_path=OUTPUT_PATH):
+    previous = None
+    if os.path.exists(output_path):
+        with open(output_path, encoding="utf-8") as f:
+            previous = json.load(f)
+
+    theme_meta = crawl_theme_meta(slugs, client, previous)
+    if theme_meta == previous:
+        # Leave the file untouched so the index manifest sees no change
+        print(f"✅ Theme metadata unchanged ({output_path})")
+        return theme_meta
 
-    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
         json.dump(theme_meta, f, indent=2, ensure_ascii=False)
 
-    print(f"✅ Saved theme metadata to {OUTPUT_PATH}")
+    print(f"✅ Saved theme metadata to {output_path}")
+    return theme_meta
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,28 @@
+import os
+import sys
+import argparse
+
+# Allow running as `python crawlers/crawl_themes.py` from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawlers.github_client import get_client, get_theme_slugs
+
+
+def main():
+    """Crawl theme metadata and theme docs in one run, sharing the GitHub client and the slug list."""
+    parser = argparse.ArgumentParser(description="Crawl theme metadata and docs.")
+    parser.add_argument("--skip-docs", action="store_true", help="only refresh data/theme_info.json")
+    args = parser.parse_args()
+
+    client = get_client()
+    slugs = get_theme_slugs(client)
+
+    import crawlers.crawl_theme_meta as theme_meta
+    theme_meta.main(slugs, client)
+    if not args.skip_docs:
+        import crawlers.crawl_theme_docs as theme_docs
+        theme_docs.main(slugs)
+
+
+if __name__ == "__main__":
+    main()
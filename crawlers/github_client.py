@@ -0,0 +1,110 @@
+import os
+import sys
+import json
+import base64
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawlers.http_cache import CACHE_PATH, USER_AGENT, FetchResult, HTTPCache, conditional_headers
+
+load_dotenv()
+
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+REPO = "wolfthemes/wolf-supertheme"
+SLUGS_PATH = "theme-slugs.json"
+
+MAX_WORKERS = 8
+TIMEOUT = 10
+
+
+class GitHubClient:
+    """
+    GitHub contents API client shared by the theme crawlers: one pooled session
+    with retries, bounded-concurrency fetching, and conditional requests backed by
+    the on-disk HTTPCache, so an unchanged file costs a 304 (which GitHub does not
+    count against the rate limit) and no download.
+    """
+
+    def __init__(self, token=GITHUB_TOKEN, base_url=GITHUB_API_URL, cache=None, max_workers=MAX_WORKERS):
+        self.base_url = base_url.rstrip("/")
+        self.cache = cache or HTTPCache(CACHE_PATH)
+        self.max_workers = max_workers
+        self.requests = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        self.session = requests.Session()
+        retry = Retry(total=3, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=("GET",), respect_retry_after_header=True)
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=max_workers, max_retries=retry))
+        self.session.mount("http://", HTTPAdapter(pool_maxsize=max_workers, max_retries=retry))
+        self.session.headers["User-Agent"] = USER_AGENT
+        if token:
+            self.session.headers["Authorization"] = f"token {token}"
+
+    def get(self, path, accept="application/vnd.github.raw"):
+        """GET an API path, revalidating the cached copy. Returns a FetchResult."""
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        # The Accept header changes the body, so it is part of the cache key
+        key = f"{url} {accept}"
+        cached = self.cache.get(key)
+        response = self.session.get(url, headers={"Accept": accept, **conditional_headers(cached)}, timeout=TIMEOUT)
+        with self._lock:
+            self.requests += 1
+            self.not_modified += response.status_code == 304
+        if response.status_code == 304 and cached is not None:
+            self.cache.touch(key)
+            return FetchResult(url, cached.body, 304, False)
+        if response.status_code == 403 and response.headers.get("X-RateLimit-Remaining") == "0":
+            raise requests.HTTPError(f"GitHub rate limit exhausted until {response.headers.get('X-RateLimit-Reset')}",
+                                     response=response)
+        response.raise_for_status()
+        self.cache.put(key, response.text, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return FetchResult(url, response.text, response.status_code, cached is None or cached.body != response.text)
+
+    def get_file(self, repo, path):
+        """Raw text of a file in `repo`."""
+        return self.get(f"repos/{repo}/contents/{path}").body
+
+    def map(self, fn, items):
+        """fn(item) for every item over at most `max_workers` threads, in order."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(fn, items))
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """The process-wide GitHubClient, created on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = GitHubClient()
+        return _client
+
+
+def get_theme_slugs(client=None):
+    """Theme slugs from the private repo, fetched once per run and shared by the theme crawlers."""
+    return _theme_slugs(client or get_client())
+
+
+@lru_cache(maxsize=None)
+def _theme_slugs(client):
+    print("📥 Fetching theme slugs from private GitHub repo via API...")
+    try:
+        result = client.get(f"repos/{REPO}/contents/{SLUGS_PATH}", accept="application/vnd.github.v3+json")
+    except requests.RequestException as e:
+        raise Exception(f"❌ Failed to fetch theme slugs: {e}") from e
+    content_data = json.loads(result.body)
+    decoded_content = base64.b64decode(content_data["content"]).decode("utf-8")
+    return tuple(json.loads(decoded_content)["theme_slugs"])
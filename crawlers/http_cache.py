@@ -0,0 +1,148 @@
+import os
+import time
+import asyncio
+import sqlite3
+import threading
+from typing import NamedTuple
+from urllib.parse import urlsplit
+
+CACHE_PATH = os.path.join("data", "cache", "http_cache.sqlite")
+USER_AGENT = "wolfthemes-ai-crew-crawler/1.0"
+
+
+class CachedResponse(NamedTuple):
+    url: str
+    body: str
+    etag: str = None
+    last_modified: str = None
+    fetched_at: float = 0.0
+
+
+class FetchResult(NamedTuple):
+    url: str
+    body: str
+    status: int
+    changed: bool  # False when the body is the one already cached (304, identical 200 or stale fallback)
+
+
+class HTTPCache:
+    """
+    On-disk store of response bodies with their ETag / Last-Modified validators,
+    so crawlers can send conditional requests and skip unchanged pages.
+    """
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, url):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, body, etag, last_modified, fetched_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        return CachedResponse(*row) if row else None
+
+    def put(self, url, body, etag=None, last_modified=None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (url, etag, last_modified, body, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, body, time.time()),
+            )
+            self._conn.commit()
+
+    def touch(self, url):
+        with self._lock:
+            self._conn.execute("UPDATE responses SET fetched_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def conditional_headers(cached):
+    """If-None-Match / If-Modified-Since headers revalidating a cached response."""
+    headers = {}
+    if cached is not None:
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+    return headers
+
+
+class HostLimiter:
+    """
+    Per-host politeness: at most `concurrency` requests in flight to one host,
+    and request starts to the same host at least `delay` seconds apart.
+    """
+
+    def __init__(self, concurrency=4, delay=0.25):
+        self.concurrency = concurrency
+        self.delay = delay
+        self._semaphores = {}
+        self._locks = {}
+        self._next_start = {}
+
+    def _host(self, url):
+        return urlsplit(url).netloc.lower()
+
+    async def __call__(self, url):
+        host = self._host(url)
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.concurrency))
+        await semaphore.acquire()
+        async with self._locks.setdefault(host, asyncio.Lock()):
+            wait = self._next_start.get(host, 0.0) - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_start[host] = time.monotonic() + self.delay
+        return semaphore
+
+
+async def cached_get(session, url, cache, limiter, retries=2):
+    """
+    GET `url` through `session` (an aiohttp.ClientSession), revalidating the cached
+    copy when there is one. Returns a FetchResult; when the request fails but a
+    cached body exists, that body is returned as unchanged instead of raising.
+    """
+    import aiohttp
+
+    cached = cache.get(url)
+    for attempt in range(retries + 1):
+        semaphore = await limiter(url)
+        try:
+            async with session.get(url, headers=conditional_headers(cached)) as response:
+                if response.status == 304 and cached is not None:
+                    cache.touch(url)
+                    return FetchResult(url, cached.body, 304, False)
+                if response.status == 429 or response.status >= 500:
+                    raise aiohttp.ClientResponseError(response.request_info, response.history,
+                                                      status=response.status, message=response.reason)
+                response.raise_for_status()
+                body = await response.text()
+                cache.put(url, body, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+                return FetchResult(url, body, response.status, cached is None or cached.body != body)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            retryable = not isinstance(e, aiohttp.ClientResponseError) or e.status == 429 or e.status >= 500
+            if retryable and attempt < retries:
+                await asyncio.sleep(2 ** attempt)
+                continue
+            if cached is not None:
+                print(f"⚠️ {url} failed ({e}); using the cached copy.")
+                return FetchResult(url, cached.body, 0, False)
+            raise
+        finally:
+            semaphore.release()
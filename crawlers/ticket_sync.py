@@ -0,0 +1,152 @@
+import os
+import json
+
+from utils.json_stream import find_corpus_file, iter_records
+
+DATA_FOLDER = "data"
+# Sync state and changed-ticket sets are derived data: they live in the cache folder
+STATE_FOLDER = os.path.join("data", "cache")
+
+
+def ticket_revision(ticket):
+    """Changes whenever a ticket gets a comment or a new status: status, comment count and newest comment."""
+    comments = ticket.get("ticket_comments") or []
+    newest = max(comments, key=lambda c: (str(c.get("time_stamp", "")), _as_int(c.get("comment_id"))), default={})
+    return f"{ticket.get('status')}|{len(comments)}|{newest.get('comment_id', '')}|{newest.get('time_stamp', '')}"
+
+
+def _as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def raise_high_water(mark, ticket):
+    """The high-water mark (newest ticket_id, ticket time_stamp and comment) after seeing `ticket`."""
+    comments = ticket.get("ticket_comments") or []
+    return {
+        "ticket_id": max(_as_int(mark.get("ticket_id")), _as_int(ticket.get("ticket_id"))),
+        "time_stamp": max(str(mark.get("time_stamp") or ""), str(ticket.get("time_stamp") or "")),
+        "comment_id": max([_as_int(mark.get("comment_id"))] + [_as_int(c.get("comment_id")) for c in comments]),
+    }
+
+
+def save_json(path, data, **kwargs):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, **kwargs)
+    os.replace(tmp_path, path)
+
+
+def save_changes(name, new, updated, removed=(), high_water=None, state_folder=STATE_FOLDER):
+    """Write the changed-ticket set of the last sync to `<state_folder>/<name>_changes.json` and return it."""
+    changes = {"new": sorted(new), "updated": sorted(updated), "removed": sorted(removed)}
+    if high_water is not None:
+        changes["high_water"] = high_water
+    save_json(os.path.join(state_folder, f"{name}_changes.json"), changes)
+    return changes
+
+
+class TicketStore:
+    """
+    Append-only JSONL store of ticket revisions (data/<name>.jsonl). A ticket is
+    appended when it is new or its revision changed and is never rewritten, so
+    the last line for a ticket_id is its current state. The revision of every
+    ticket and the high-water mark are kept in a state file, rebuilt from the
+    store whenever the store no longer matches it.
+    """
+
+    def __init__(self, name, folder=DATA_FOLDER, key=None, state_folder=STATE_FOLDER):
+        self.name = name
+        self.folder = folder
+        self.key = key
+        self.path = os.path.join(folder, f"{name}.jsonl")
+        self.state_path = os.path.join(state_folder, f"{name}.sync.json")
+        self.state_folder = state_folder
+        self.revisions = {}
+        self.high_water = {}
+        self._load_state()
+
+    def _store_stat(self):
+        stat = os.stat(self.path)
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def _load_state(self):
+        if not os.path.exists(self.path):
+            self._seed()
+        if os.path.exists(self.state_path):
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("store") == self._store_stat():
+                self.revisions, self.high_water = state["revisions"], state["high_water"]
+                return
+        print(f"🔁 Rebuilding sync state from {self.path}...")
+        for ticket in iter_records(self.path):
+            if isinstance(ticket, dict) and ticket.get("ticket_id"):
+                self.revisions[str(ticket["ticket_id"])] = ticket_revision(ticket)
+                self.high_water = raise_high_water(self.high_water, ticket)
+        self._save_state()
+
+    def _seed(self):
+        """Start the store from the existing full export (e.g. data/closed_tickets.json), if any."""
+        source = find_corpus_file(self.folder, self.name)
+        os.makedirs(self.folder, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as out:
+            if source is not None:
+                print(f"📥 Seeding {self.path} from {source}...")
+                for ticket in iter_records(source, self.key):
+                    if isinstance(ticket, dict) and ticket.get("ticket_id"):
+                        out.write(json.dumps(ticket, ensure_ascii=False) + "\n")
+
+    def _save_state(self):
+        save_json(self.state_path, {
+            "store": self._store_stat(),
+            "high_water": self.high_water,
+            "revisions": self.revisions,
+        })
+
+    def merge(self, tickets):
+        """
+        Append the new and changed `tickets` to the store. Returns the changed-ticket
+        set ({"new", "updated", "high_water"}), also written to <name>_changes.json.
+        """
+        new, updated = [], []
+        with open(self.path, "a", encoding="utf-8") as out:
+            for ticket in tickets:
+                if not isinstance(ticket, dict) or not ticket.get("ticket_id"):
+                    continue
+                ticket_id = str(ticket["ticket_id"])
+                revision = ticket_revision(ticket)
+                previous = self.revisions.get(ticket_id)
+                if previous == revision:
+                    continue
+                (new if previous is None else updated).append(ticket_id)
+                out.write(json.dumps(ticket, ensure_ascii=False) + "\n")
+                self.revisions[ticket_id] = revision
+                self.high_water = raise_high_water(self.high_water, ticket)
+        self._save_state()
+        return save_changes(self.name, new, updated, high_water=self.high_water, state_folder=self.state_folder)
+
+
+def sync_ticket_snapshot(tickets, path, key, state_folder=STATE_FOLDER):
+    """
+    Sync a payload that is the complete current set (open tickets): rewrite `path`
+    only when a ticket was added, changed or removed. Returns the changed-ticket set.
+    """
+    previous = {}
+    if os.path.exists(path):
+        for ticket in iter_records(path, key):
+            if isinstance(ticket, dict) and ticket.get("ticket_id"):
+                previous[str(ticket["ticket_id"])] = ticket_revision(ticket)
+
+    current = {str(t["ticket_id"]): ticket_revision(t) for t in tickets if isinstance(t, dict) and t.get("ticket_id")}
+    new = [ticket_id for ticket_id in current if ticket_id not in previous]
+    updated = [ticket_id for ticket_id, revision in current.items()
+               if ticket_id in previous and previous[ticket_id] != revision]
+    removed = [ticket_id for ticket_id in previous if ticket_id not in current]
+    if new or updated or removed or not os.path.exists(path):
+        save_json(path, {key: tickets})
+    name = os.path.basename(path).split(".", 1)[0]
+    return save_changes(name, new, updated, removed, state_folder=state_folder)
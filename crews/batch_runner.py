@@ -0,0 +1,260 @@
+import os
+import sys
+import time
+import asyncio
+import argparse
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Allow running as `python crews/batch_runner.py` from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crews.pipeline import QUEUE_SIZE, REPLY_WORKERS, REVIEW_WORKERS, run_pipeline
+from utils.result_store import DONE, FAILED, RESULTS_PATH, ResultStore
+from utils.strict_reply import STRICT_PATH
+from utils.ticket_utils import last_comment_hash, load_tickets, should_process_ticket
+
+OPEN_TICKETS_PATH = os.path.join("data", "open_tickets.json")
+MAX_WORKERS = 4
+
+# Each worker thread builds its own agents once; the knowledge base is shared
+_worker = threading.local()
+
+
+def warm_knowledge_base():
+    """Load the shared knowledge base (documents, FAISS and BM25 indexes) before the workers start."""
+    from utils.knowledge_base import get_knowledge_base
+
+    get_knowledge_base().indexes
+
+
+def _ticket_fields(analysis, reply, review, path, checks=None):
+    if path == STRICT_PATH:
+        reviewed_by = "template"
+    else:
+        reviewed_by = "rules" if checks is not None and checks.passed else "llm"
+    return {
+        "category": analysis.category,
+        "reply": str(reply),
+        "review": str(review),
+        "details": {
+            "path": path,
+            "reviewed_by": reviewed_by,
+            "grounding": checks.grounding if checks is not None else None,
+            "rules": analysis.rules,
+            "kb_source": analysis.kb_result.get("source"),
+            "kb_title": analysis.kb_result.get("title"),
+        },
+    }
+
+
+def process_ticket(ticket):
+    """Reply to and review one open ticket with this worker's agents; returns the fields to store."""
+    from agents.support_agent import build_support_agent
+    from agents.support_quality_control_agent import build_support_quality_control_agent
+    from crews.support_crew import support_crew_followup_with_review
+
+    if not hasattr(_worker, "agent"):
+        _worker.agent = build_support_agent()
+        _worker.reviewer = build_support_quality_control_agent()
+    result = support_crew_followup_with_review(ticket, agent=_worker.agent, reviewer=_worker.reviewer)
+    return _ticket_fields(result["analysis"], result["reply"], result["review"], result["path"],
+                          result.get("pre_review"))
+
+
+def draft_ticket_reply(ticket):
+    """Pipeline reply stage: draft a reply with this reply thread's support agent."""
+    from agents.support_agent import build_support_agent
+    from crews.support_crew import draft_followup_reply
+
+    if not hasattr(_worker, "agent"):
+        _worker.agent = build_support_agent()
+    return draft_followup_reply(ticket, agent=_worker.agent)
+
+
+def review_ticket_reply(ticket, draft):
+    """Pipeline review stage: review a drafted reply with this review thread's quality agent."""
+    from agents.support_quality_control_agent import build_support_quality_control_agent
+    from crews.support_crew import review_reply
+
+    result = finished_draft(draft)
+    if result is not None:
+        return result
+    if not hasattr(_worker, "reviewer"):
+        _worker.reviewer = build_support_quality_control_agent()
+    checks = draft.get("pre_review")
+    review = review_reply(draft["ticket_text"], draft["analysis"].kb_result, draft["reply"], reviewer=_worker.reviewer,
+                          checks=checks)
+    return _ticket_fields(draft["analysis"], draft["reply"], review, draft["path"], checks)
+
+
+def finished_draft(draft):
+    """
+    The stored fields of a draft that needs no review stage: answered from a
+    strict common-issue template, or approved by the local pre-review.
+    """
+    if draft.get("path") == STRICT_PATH:
+        return _ticket_fields(draft["analysis"], draft["reply"], draft["review"], STRICT_PATH)
+    checks = draft.get("pre_review")
+    if checks is not None and checks.passed:
+        return _ticket_fields(draft["analysis"], draft["reply"], checks.review, draft["path"], checks)
+    return None
+
+
+def _count_path(counts, result):
+    details = result.get("details") or {}
+    if details.get("path"):
+        counts[f"{details['path']} path"] += 1
+    if details.get("reviewed_by"):
+        counts[f"{details['reviewed_by']} review"] += 1
+
+
+def report_review_paths(counts):
+    """Print how many finished tickets were answered from strict templates and how many replies the LLM reviewed."""
+    if counts[DONE]:
+        strict = counts[f"{STRICT_PATH} path"]
+        print(f"⚡ Strict path: {strict}/{counts[DONE]} tickets ({strict / counts[DONE]:.0%}) answered from "
+              f"common-issue templates without LLM calls.")
+    if counts["rules review"] or counts["llm review"]:
+        print(f"🔎 Pre-review: {counts['rules review']} replies approved by the local rules, "
+              f"{counts['llm review']} escalated to the LLM reviewer.")
+
+
+def select_pending(tickets, store, force=False, limit=None):
+    """The (ticket, thread_hash) pairs that need a run, and the counts of the skipped tickets."""
+    counts = Counter()
+    pending = []
+    for ticket in tickets:
+        if not should_process_ticket(ticket):
+            counts["no response needed"] += 1
+            continue
+        thread_hash = last_comment_hash(ticket)
+        if not force and store.is_done(ticket["ticket_id"], thread_hash):
+            counts["unchanged"] += 1
+            continue
+        pending.append((ticket, thread_hash))
+    if limit is not None:
+        pending = pending[:limit]
+
+    print(f"📋 {len(pending)} tickets to process, {counts['unchanged']} unchanged since their last run, "
+          f"{counts['no response needed']} not needing a response.")
+    return pending, counts
+
+
+def run_batch(tickets, store, process=process_ticket, workers=MAX_WORKERS, force=False, limit=None,
+              warm_up=warm_knowledge_base):
+    """
+    Run `process` on every ticket that needs a response and has no stored result
+    for its current thread, over `workers` threads, saving each outcome as soon as
+    it is known so an interrupted batch resumes where it stopped. Failed tickets
+    are retried on the next run. Returns the outcome counts.
+    """
+    start = time.perf_counter()
+    pending, counts = select_pending(tickets, store, force, limit)
+    if not pending:
+        return counts
+    if warm_up is not None:
+        warm_up()
+
+    def run(ticket, thread_hash):
+        ticket_start = time.perf_counter()
+        try:
+            result = process(ticket)
+        except Exception as e:
+            store.save(ticket["ticket_id"], thread_hash, FAILED, error=f"{type(e).__name__}: {e}",
+                       duration=time.perf_counter() - ticket_start)
+            return FAILED, None
+        store.save(ticket["ticket_id"], thread_hash, DONE, duration=time.perf_counter() - ticket_start, **result)
+        return DONE, result
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run, ticket, thread_hash): ticket for ticket, thread_hash in pending}
+        for i, future in enumerate(as_completed(futures), 1):
+            status, result = future.result()
+            counts[status] += 1
+            if result is not None:
+                _count_path(counts, result)
+            ticket = futures[future]
+            icon = "✅" if status == DONE else "❌"
+            print(f"[{i}/{len(pending)}] {icon} Ticket {ticket['ticket_id']}: {ticket.get('ticket_title', '')}")
+
+    print(f"🏁 Batch finished in {time.perf_counter() - start:.1f}s: {counts[DONE]} done, {counts[FAILED]} failed, "
+          f"{counts['unchanged']} skipped as unchanged.")
+    report_review_paths(counts)
+    return counts
+
+
+def run_pipelined_batch(tickets, store, reply=draft_ticket_reply, review=review_ticket_reply,
+                        finished=finished_draft, reply_workers=REPLY_WORKERS, review_workers=REVIEW_WORKERS,
+                        queue_size=QUEUE_SIZE, force=False, limit=None, warm_up=warm_knowledge_base):
+    """
+    Like run_batch, but replies and reviews run as separate pipeline stages with
+    their own concurrency limits (crews.pipeline), so the next tickets are
+    drafted while earlier replies are reviewed. Prints per-stage latency and
+    queue depth; returns the outcome counts and the PipelineStats.
+    """
+    pending, counts = select_pending(tickets, store, force, limit)
+    if not pending:
+        return counts, None
+    if warm_up is not None:
+        warm_up()
+
+    def on_result(job, draft, result, error, duration):
+        ticket, thread_hash = job
+        if error is None:
+            status = DONE
+            store.save(ticket["ticket_id"], thread_hash, DONE, duration=duration, **result)
+            _count_path(counts, result)
+        else:
+            status = FAILED
+            stage = "reply" if draft is None else "review"
+            store.save(ticket["ticket_id"], thread_hash, FAILED, error=f"{stage}: {type(error).__name__}: {error}",
+                       duration=duration)
+        counts[status] += 1
+        icon = "✅" if status == DONE else "❌"
+        print(f"[{counts[DONE] + counts[FAILED]}/{len(pending)}] {icon} Ticket {ticket['ticket_id']}: "
+              f"{ticket.get('ticket_title', '')}")
+
+    stats = asyncio.run(run_pipeline(pending, lambda job: reply(job[0]), lambda job, draft: review(job[0], draft),
+                                     on_result, reply_workers, review_workers, queue_size, finished))
+    print(f"🏁 Pipeline finished: {counts[DONE]} done, {counts[FAILED]} failed, "
+          f"{counts['unchanged']} skipped as unchanged.")
+    report_review_paths(counts)
+    stats.report()
+    return counts, stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reply to and review every open ticket that needs a response.")
+    parser.add_argument("--tickets", default=OPEN_TICKETS_PATH)
+    parser.add_argument("--db", default=RESULTS_PATH, help="SQLite result store")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--limit", type=int, default=None, help="process at most this many tickets")
+    parser.add_argument("--force", action="store_true", help="re-run tickets whose thread is unchanged")
+    parser.add_argument("--pipeline", action="store_true", help="run replies and reviews as separate pipelined stages")
+    parser.add_argument("--reply-workers", type=int, default=REPLY_WORKERS, help="concurrent replies (--pipeline)")
+    parser.add_argument("--review-workers", type=int, default=REVIEW_WORKERS, help="concurrent reviews (--pipeline)")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE, help="bounded queue size per stage (--pipeline)")
+    args = parser.parse_args(argv)
+
+    store = ResultStore(args.db)
+    try:
+        tickets = load_tickets(args.tickets)
+        if args.pipeline:
+            counts, _ = run_pipelined_batch(tickets, store, reply_workers=args.reply_workers,
+                                            review_workers=args.review_workers, queue_size=args.queue_size,
+                                            force=args.force, limit=args.limit)
+        else:
+            counts = run_batch(tickets, store, workers=args.workers, force=args.force, limit=args.limit)
+        paths = store.path_counts()
+        if paths:
+            print(f"📊 All stored replies: {paths[STRICT_PATH]}/{sum(paths.values())} "
+                  f"({paths[STRICT_PATH] / sum(paths.values()):.0%}) took the strict path.")
+    finally:
+        store.close()
+    return 1 if counts[FAILED] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+REPLY_WORKERS = 3
+REVIEW_WORKERS = 2
+QUEUE_SIZE = 4
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class StageStats:
+    """Latency, queue wait and queue depth samples of one pipeline stage."""
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.latencies = []
+        self.waits = []
+        self.depths = []
+        self.failed = 0
+
+    def sample_depth(self, queue):
+        self.depths.append(queue.qsize())
+
+    def summary(self):
+        return {
+            "stage": self.name,
+            "workers": self.workers,
+            "processed": len(self.latencies),
+            "failed": self.failed,
+            "latency_p50": _percentile(self.latencies, 0.5),
+            "latency_p95": _percentile(self.latencies, 0.95),
+            "wait_mean": sum(self.waits) / len(self.waits) if self.waits else 0.0,
+            "depth_mean": sum(self.depths) / len(self.depths) if self.depths else 0.0,
+            "depth_max": max(self.depths, default=0),
+        }
+
+
+class PipelineStats:
+    def __init__(self, reply_workers, review_workers):
+        self.reply = StageStats("reply", reply_workers)
+        self.review = StageStats("review", review_workers)
+        self.review_skipped = 0
+        self.elapsed = 0.0
+
+    @property
+    def completed(self):
+        return len(self.review.latencies) + self.review_skipped
+
+    @property
+    def tickets_per_minute(self):
+        return 60 * self.completed / self.elapsed if self.elapsed else 0.0
+
+    def report(self):
+        print(f"📈 {self.completed} tickets in {self.elapsed:.1f}s ({self.tickets_per_minute:.1f} tickets/min), "
+              f"{self.review_skipped} finished without the review stage")
+        print("| stage  | workers | done | failed | p50 (s) | p95 (s) | queue wait (s) | queue depth mean/max |")
+        print("|--------|--------:|-----:|-------:|--------:|--------:|---------------:|---------------------:|")
+        for stage in (self.reply, self.review):
+            s = stage.summary()
+            print(f"| {s['stage']:6} | {s['workers']:7} | {s['processed']:4} | {s['failed']:6} | "
+                  f"{s['latency_p50']:7.2f} | {s['latency_p95']:7.2f} | {s['wait_mean']:14.2f} | "
+                  f"{s['depth_mean']:15.1f}/{s['depth_max']:<4} |")
+
+
+async def run_pipeline(items, reply, review, on_result, reply_workers=REPLY_WORKERS, review_workers=REVIEW_WORKERS,
+                       queue_size=QUEUE_SIZE, finished=None):
+    """
+    Run `reply(item)` and then `review(item, draft)` on every item as two
+    pipelined stages connected by bounded queues: the next item's reply is
+    generated while earlier ones are reviewed. Each stage calls its (blocking)
+    function from its own pool of `*_workers` threads, which caps the LLM
+    requests in flight per stage, and a full queue holds the stage before it.
+
+    `finished(draft)` may return a draft's final result directly, e.g. for a
+    templated reply that needs no LLM review; such items skip the review stage.
+    `on_result(item, draft, review, error, duration)` is called on the event
+    loop as soon as an item finishes or fails in either stage. Returns the
+    PipelineStats with per-stage latency and queue depth.
+    """
+    loop = asyncio.get_running_loop()
+    stats = PipelineStats(reply_workers, review_workers)
+    reply_queue = asyncio.Queue(maxsize=queue_size)
+    review_queue = asyncio.Queue(maxsize=queue_size)
+    reply_pool = ThreadPoolExecutor(reply_workers, thread_name_prefix="reply")
+    review_pool = ThreadPoolExecutor(review_workers, thread_name_prefix="review")
+    start = time.perf_counter()
+
+    async def feed():
+        for item in items:
+            now = time.perf_counter()
+            await reply_queue.put((item, now, now))
+            stats.reply.sample_depth(reply_queue)
+        for _ in range(reply_workers):
+            await reply_queue.put(None)
+
+    async def reply_worker():
+        while (job := await reply_queue.get()) is not None:
+            item, started, queued = job
+            stats.reply.sample_depth(reply_queue)
+            begin = time.perf_counter()
+            stats.reply.waits.append(begin - queued)
+            try:
+                draft = await loop.run_in_executor(reply_pool, reply, item)
+            except Exception as e:
+                stats.reply.failed += 1
+                on_result(item, None, None, e, time.perf_counter() - started)
+                continue
+            stats.reply.latencies.append(time.perf_counter() - begin)
+            result = finished(draft) if finished else None
+            if result is not None:
+                stats.review_skipped += 1
+                on_result(item, draft, result, None, time.perf_counter() - started)
+                continue
+            await review_queue.put((item, draft, started, time.perf_counter()))
+            stats.review.sample_depth(review_queue)
+
+    async def review_worker():
+        while (job := await review_queue.get()) is not None:
+            item, draft, started, queued = job
+            stats.review.sample_depth(review_queue)
+            begin = time.perf_counter()
+            stats.review.waits.append(begin - queued)
+            try:
+                result = await loop.run_in_executor(review_pool, review, item, draft)
+            except Exception as e:
+                stats.review.failed += 1
+                on_result(item, draft, None, e, time.perf_counter() - started)
+                continue
+            stats.review.latencies.append(time.perf_counter() - begin)
+            on_result(item, draft, result, None, time.perf_counter() - started)
+
+    async def replies_then_stop():
+        await asyncio.gather(*(reply_worker() for _ in range(reply_workers)))
+        for _ in range(review_workers):
+            await review_queue.put(None)
+
+    try:
+        await asyncio.gather(feed(), replies_then_stop(), *(review_worker() for _ in range(review_workers)))
+    finally:
+        reply_pool.shutdown(wait=False, cancel_futures=True)
+        review_pool.shutdown(wait=False, cancel_futures=True)
+    stats.elapsed = time.perf_counter() - start
+    return stats
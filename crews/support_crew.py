@@ -1,40 +1,127 @@
 from crewai import Crew, Process
-from agents.support_agent import support_agent
-from agents.support_quality_control_agent import support_quality_control_agent
 from tasks.support_tasks import create_support_reply_task
 from tasks.quality_tasks import review_support_reply_task
+from utils.ticket_analysis import analyze_ticket
+from utils.strict_reply import LLM_PATH, STRICT_PATH, answer_strict, greeting_name
+from utils.pre_review import kb_sources, pre_review
 
-def support_crew_fresh_with_review(ticket_text, kb_result):
+def support_crew_fresh_with_review(ticket_text, kb_result=None, analysis=None, agent=None, reviewer=None):
     """
     Creates a crew that generates a support reply and then reviews it,
     without creating an infinite loop.
+    Both tasks share one TicketAnalysis, so the ticket is only embedded,
+    classified and searched once. Pass `agent` and `reviewer` to use specific
+    support and quality agents instead of the shared ones.
     
-    Returns a dictionary with both the reply and the review.
+    Strict common issues are answered from their template without any agent,
+    and the LLM review only runs when the local pre-review of the reply fails.
+
+    Returns a dictionary with the reply, the review, the path taken
+    ("strict" or "llm") and the PreReview of LLM replies.
     """
+    analysis = analysis or analyze_ticket(ticket_text)
+    kb_result = kb_result or analysis.kb_result
+    strict = answer_strict(kb_result)
+    if strict:
+        return {**strict, "path": STRICT_PATH}
+
     # Create the support reply task with a specific task ID
-    support_task = create_support_reply_task(ticket_text, kb_result)
+    support_task = create_support_reply_task(ticket_text, kb_result, analysis, agent=agent)
     support_task.name = "Support Reply"
     
     # Create the quality review task with a clear dependency on the support task
-    quality_task = review_support_reply_task(ticket_text, kb_result)
+    quality_task = review_support_reply_task(ticket_text, kb_result, analysis, agent=reviewer)
     quality_task.name = "Quality Review"
     
     # Set up the task dependency - quality reviews the support reply
     quality_task.context = [support_task]
     
-    # Create the crew with a sequential process to prevent looping
-    crew = Crew(
-        agents=[support_agent, support_quality_control_agent],
-        tasks=[support_task, quality_task],
-        process=Process.sequential,  # Ensure sequential execution
-        verbose=True
-    )
-    
-    # Execute the crew
-    crew.kickoff()
+    sources = kb_sources(kb_result, analysis.hits)
+    return {**_run_reply_and_review(support_task, quality_task, kb_result, sources), "path": LLM_PATH}
+
+def support_crew_followup_with_review(ticket, analysis=None, agent=None, reviewer=None):
+    """
+    Reply to an ongoing ticket thread and review the reply, like
+    support_crew_fresh_with_review. The latest user comment is analyzed once
+    and shared by both tasks.
+
+    Returns a dictionary with the reply, the review, the path taken, the
+    PreReview of LLM replies and the analysis.
+    """
+    from tasks.task_ticket_followup import build_followup_task
+    from utils.ticket_utils import extract_latest_user_comment
+
+    user_comment = extract_latest_user_comment(ticket["ticket_comments"])
+    analysis = analysis or analyze_ticket(user_comment)
+    strict = answer_strict(analysis.kb_result, _customer_name(ticket), ticket["ticket_comments"])
+    if strict:
+        return {**strict, "path": STRICT_PATH, "analysis": analysis}
+
+    support_task = build_followup_task(ticket, analysis, agent=agent)
+    support_task.name = "Support Reply"
+    quality_task = review_support_reply_task(user_comment, analysis.kb_result, analysis, agent=reviewer)
+    quality_task.name = "Quality Review"
+    quality_task.context = [support_task]
+
+    sources = kb_sources(analysis.kb_result, analysis.hits)
+    return {**_run_reply_and_review(support_task, quality_task, analysis.kb_result, sources), "path": LLM_PATH,
+            "analysis": analysis}
+
+def draft_followup_reply(ticket, analysis=None, agent=None):
+    """
+    The reply stage of the ticket pipeline: reply to an ongoing ticket thread
+    with a one-task crew, without reviewing it. Strict common issues are
+    answered and reviewed right away from their template.
+
+    Returns a dictionary with the reply text, the reviewed comment, the path
+    taken and the analysis, plus the review on the strict path and the
+    PreReview of LLM replies; only replies failing it need the review stage.
+    """
+    from tasks.task_ticket_followup import build_followup_task
+    from utils.ticket_utils import extract_latest_user_comment
+
+    user_comment = extract_latest_user_comment(ticket["ticket_comments"])
+    analysis = analysis or analyze_ticket(user_comment)
+    strict = answer_strict(analysis.kb_result, _customer_name(ticket), ticket["ticket_comments"])
+    if strict:
+        return {**strict, "ticket_text": user_comment, "path": STRICT_PATH, "analysis": analysis}
+    support_task = build_followup_task(ticket, analysis, agent=agent)
+    support_task.name = "Support Reply"
+    _kickoff(support_task)
+    reply = str(support_task.output)
+    checks = pre_review(reply, analysis.kb_result, kb_sources(analysis.kb_result, analysis.hits))
+    return {"reply": reply, "ticket_text": user_comment, "path": LLM_PATH, "pre_review": checks, "analysis": analysis}
+
+def review_reply(ticket_text, kb_result, reply, reviewer=None, checks=None):
+    """
+    The review stage of the ticket pipeline: review an already generated reply
+    with a one-task crew, pointing the reviewer at the failed pre-review `checks`.
+    """
+    from tasks.task_review_support_reply import build_review_task
+
+    quality_task = build_review_task(ticket_text, kb_result, reply, agent=reviewer)
+    quality_task.name = "Quality Review"
+    if checks is not None and not checks.passed:
+        quality_task.description += f"\n\nAutomated pre-review findings to verify:\n{checks.review}\n"
+    _kickoff(quality_task)
+    return str(quality_task.output)
+
+def _customer_name(ticket):
+    user_comments = [c for c in ticket["ticket_comments"] if c.get("user_type") == "user"]
+    return greeting_name(user_comments[0].get("commenter_name")) if user_comments else None
+
+def _kickoff(*tasks):
+    Crew(agents=[task.agent for task in tasks], tasks=list(tasks), process=Process.sequential, verbose=True).kickoff()
 
-    # Access results by task_id
+def _run_reply_and_review(support_task, quality_task, kb_result, sources):
+    # Reply first; the quality agent only reviews replies failing the local pre-review
+    _kickoff(support_task)
+    checks = pre_review(support_task.output, kb_result, sources)
+    if not checks.passed:
+        quality_task.description += f"\n\nAutomated pre-review findings to verify:\n{checks.review}\n"
+        _kickoff(quality_task)
     return {
         "reply": support_task.output,
-        "review": quality_task.output
-    }
\ No newline at end of file
+        "review": checks.review if checks.passed else quality_task.output,
+        "pre_review": checks,
+    }
@@ -2,19 +2,45 @@ from dotenv import load_dotenv
 import sys
 load_dotenv()
 
-#from crews.support_crew import support_crew_fresh, support_crew_conversation
-from crews.support_crew import support_crew_fresh_with_review
+USAGE = """Usage:
+  python main.py fresh "<ticket text>"   Reply to (and review) a new support message
+  python main.py conversation [index]    Reply to (and review) an open ticket thread
+  python main.py batch [--workers N]     Reply to every open ticket that needs a response
+  python main.py batch --pipeline        ...with replies and reviews as separate pipelined stages
+"""
 
 if __name__ == "__main__":
     mode = sys.argv[1] if len(sys.argv) > 1 else "fresh"
 
+    if mode == "batch":
+        from crews.batch_runner import main as run_batch
+        sys.exit(run_batch(sys.argv[2:]))
+
     if mode == "conversation":
-        crew = support_crew_conversation
+        from crews.support_crew import support_crew_followup_with_review
+        from utils.ticket_utils import load_ticket, should_process_ticket
+
+        ticket = load_ticket(index=int(sys.argv[2]) if len(sys.argv) > 2 else 0)
+        if not should_process_ticket(ticket):
+            print("🚫 Skipping — this ticket doesn't need a response.")
+            sys.exit(0)
         print("🔄 Responding to ongoing ticket thread...")
-    else:
-        crew = support_crew_fresh
+        result = support_crew_followup_with_review(ticket)
+    elif mode == "fresh":
+        from crews.support_crew import support_crew_fresh_with_review
+
+        if len(sys.argv) < 3:
+            print(USAGE)
+            sys.exit(1)
         print("✉️ Responding to new support message...")
+        result = support_crew_fresh_with_review(sys.argv[2])
+    else:
+        print(USAGE)
+        sys.exit(1)
 
-    result = crew.kickoff()
+    if result.get("path") == "strict":
+        print("⚡ Answered from a strict common-issue template, without LLM calls.")
     print("\n=== Support Reply Suggestion ===\n")
-    print(result)
+    print(result["reply"])
+    print("\n=== Quality Review ===\n")
+    print(result["review"])
@@ -1,6 +1,5 @@
 from crews.support_crew import support_crew_fresh_with_review
-from utils.ticket_classifier import classify_ticket
-from agents.support_agent import search_kb_raw
+from utils.ticket_analysis import analyze_ticket
 
 def main():
     ticket_text = """
@@ -10,18 +9,15 @@ Ticket from user:
 John"
 """
     
-    # 1. Classify the ticket for internal use
-    category = classify_ticket(ticket_text)
-    print(f"📋 Ticket classified as: {category}")
-    
-    # 2. Use KB tool to get relevant information
-    kb_result = search_kb_raw(ticket_text)
+    # 1. Embed, classify and search the ticket once
+    analysis = analyze_ticket(ticket_text)
+    print(f"📋 Ticket classified as: {analysis.category}")
     print(f"📚 Knowledge base searched.")
     
-    # 3. Run both reply and review with proper crew
+    # 2. Run both reply and review with proper crew
     print("🤖 Starting support crew...")
     try:
-        result = support_crew_fresh_with_review(ticket_text, kb_result)
+        result = support_crew_fresh_with_review(ticket_text, analysis.kb_result, analysis)
         
         print("\n📝 Support Reply:\n")
         print(result["reply"])
@@ -4,8 +4,7 @@ import streamlit as st
 from crewai import Crew
 from tasks.task_fresh_ticket import support_task_fresh  # this task uses support_agent
 from crews.support_crew import support_crew_fresh_with_review
-from utils.ticket_classifier import classify_ticket
-from agents.support_agent import search_kb_raw
+from utils.ticket_analysis import analyze_ticket
 
 st.set_page_config(page_title="WolfThemes Support Agent", layout="centered")
 
@@ -33,18 +32,15 @@ Your answer must be markdown formatted, short and professional.
     #     verbose=False
     # )
 
-    # 1. Classify the ticket for internal use
-    category = classify_ticket(ticket_input)
-    print(f"📋 Ticket classified as: {category}")
-    
-    # 2. Use KB tool to get relevant information
-    kb_result = search_kb_raw(ticket_input)
+    # 1. Embed, classify and search the ticket once
+    analysis = analyze_ticket(ticket_input)
+    print(f"📋 Ticket classified as: {analysis.category}")
     print(f"📚 Knowledge base searched.")
     
-    # 3. Run both reply and review with proper crew
+    # 2. Run both reply and review with proper crew
     print("🤖 Starting support crew...")
 
-    result = support_crew_fresh_with_review(ticket_input, kb_result)
+    result = support_crew_fresh_with_review(ticket_input, analysis.kb_result, analysis)
     
     st.markdown("### 💬 Suggested Reply:")
     st.markdown(result["reply"])
@@ -1,18 +1,18 @@
 from crewai import Task
 from agents.support_quality_control_agent import support_quality_control_agent
-from utils.ticket_classifier import classify_ticket, split_ticket_into_parts
+from utils.ticket_analysis import analyze_ticket
 from utils.document_loaders import load_guidelines
 
-def review_support_reply_task(ticket_text, kb_result):
+def review_support_reply_task(ticket_text, kb_result=None, analysis=None, agent=None):
     """
     Creates a task for the quality control agent to review a support reply,
     with proper context to prevent looping back
     """
     guidelines = load_guidelines()
 
-    parts = split_ticket_into_parts(ticket_text)
-    classified_parts = [(p, classify_ticket(p)) for p in parts]
-    issue_summary = "\\n".join([f"- {cat}: \"{part}\"" for part, cat in classified_parts])
+    analysis = analysis or analyze_ticket(ticket_text)
+    kb_result = kb_result or analysis.kb_result
+    issue_summary = analysis.issue_summary
 
     source_info = f"Source: {kb_result['source'] if kb_result and 'source' in kb_result else 'N/A'}"
     source_title = f"Source: {kb_result['title'] if kb_result and 'title' in kb_result else 'N/A'}"
@@ -44,6 +44,6 @@ def review_support_reply_task(ticket_text, kb_result):
         4. Has the right tone and format
         """,
         expected_output="Quality assessment report with specific feedback on the support reply.",
-        agent=support_quality_control_agent,
+        agent=agent or support_quality_control_agent,
         context=[],  # This will be filled by the crew with the output of the previous task
     )
\ No newline at end of file
@@ -1,18 +1,18 @@
 from crewai import Task
-from agents.support_agent import support_agent
-from utils.ticket_classifier import classify_ticket, split_ticket_into_parts
+from agents.support_agent import build_support_tools, support_agent
+from utils.ticket_analysis import analyze_ticket
 from utils.document_loaders import load_guidelines
 
-def create_support_reply_task(ticket_text, kb_result):
+def create_support_reply_task(ticket_text, kb_result=None, analysis=None, agent=None):
     """
     Creates a task for the support agent to respond to a ticket,
     using pre-fetched knowledge base results
     """
     guidelines = load_guidelines()
 
-    parts = split_ticket_into_parts(ticket_text)
-    classified_parts = [(p, classify_ticket(p)) for p in parts]
-    issue_summary = "\\n".join([f"- {cat}: \"{part}\"" for part, cat in classified_parts])
+    analysis = analysis or analyze_ticket(ticket_text)
+    kb_result = kb_result or analysis.kb_result
+    issue_summary = analysis.issue_summary
 
     source_info = f"Source: {kb_result['source'] if kb_result and 'source' in kb_result else 'N/A'}"
     source_title = f"Title: {kb_result['title'] if kb_result and 'title' in kb_result else 'N/A'}"
@@ -47,5 +47,7 @@ def create_support_reply_task(ticket_text, kb_result):
         Create a helpful and accurate response based on these results.
         """,
         expected_output="Markdown formatted support reply that directly addresses the customer's issue.",
-        agent=support_agent
+        agent=agent or support_agent,
+        # Per-ticket tools: the agent's searches for this ticket's text reuse its analysis
+        tools=list(build_support_tools(analysis=analysis)),
     )
\ No newline at end of file
@@ -1,7 +1,8 @@
 from crewai import Task
 from agents.support_quality_control_agent import support_quality_control_agent
 
-def build_review_task(ticket_text, kb_result, support_reply):
+def build_review_task(ticket_text, kb_result, support_reply, agent=None):
+    """Review an already generated reply on its own, e.g. as a separate pipeline stage."""
     return Task(
         description=f"""
 You are reviewing a support reply for quality control.
@@ -25,6 +26,6 @@ If the reply is perfect, respond with **'Approved ✅'**
 Otherwise, list required changes in bullet points.
         """,
         expected_output="Review result: either 'Approved ✅' or a bullet list of issues",
-        agent=support_quality_control_agent
+        agent=agent or support_quality_control_agent
     )
 
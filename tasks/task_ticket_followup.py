@@ -1,24 +1,24 @@
 from crewai import Task
-from crewai import Crew
-from agents.support_agent import support_agent
 from utils.ticket_utils import load_ticket, extract_latest_user_comment, format_ticket_history, should_process_ticket
-from utils.ticket_classifier import classify_ticket
-
 from utils.document_loaders import load_guidelines
 
-guidelines = load_guidelines()
-ticket = load_ticket(index=0)
-
-if not should_process_ticket(ticket):
-    print("🚫 Skipping — this ticket doesn't need a response.")
-    exit()
-
-user_comment = extract_latest_user_comment(ticket["ticket_comments"])
-history_text = format_ticket_history(ticket["ticket_comments"], max_entries=50)
-category = classify_ticket(user_comment)
-
-support_task_conversation = Task(
-    description=f"""
+def build_followup_task(ticket, analysis=None, agent=None):
+    """
+    Build the task replying to an ongoing ticket thread. Pass the ticket's
+    TicketAnalysis (of its latest user comment) to reuse its classification and
+    KB hits, and `agent` to use a specific support agent.
+    """
+    from agents.support_agent import build_support_tools, support_agent
+    from utils.ticket_analysis import analyze_ticket
+
+    guidelines = load_guidelines()
+    user_comment = extract_latest_user_comment(ticket["ticket_comments"])
+    history_text = format_ticket_history(ticket["ticket_comments"], max_entries=50)
+    analysis = analysis or analyze_ticket(user_comment)
+    kb_result = analysis.kb_result or {}
+
+    return Task(
+        description=f"""
 You are responding to this ongoing customer support ticket.
 
 Theme: {ticket['envato_verified_string']}
@@ -32,12 +32,32 @@ Related URL: {ticket.get('related_url')}
 ### Latest user message:
 "{user_comment}"
 
+Internally, the latest message contains the following parts:
+{analysis.issue_summary}
+
+Most relevant knowledge base result:
+Source: {kb_result.get('source', 'N/A')}
+Title: {kb_result.get('title', 'N/A')}
+Content: {kb_result.get('content', 'N/A')}
+
 Classify the issue and respond as accurately as possible using the knowledge base and support rules.
 
 {guidelines}
 
 Use markdown formatting and be concise and helpful.
 """,
-    expected_output="Markdown formatted support reply that directly addresses the customer's issue.",
-    agent=support_agent,
-)
+        expected_output="Markdown formatted support reply that directly addresses the customer's issue.",
+        agent=agent or support_agent,
+        # Per-ticket tools: the agent's searches for this ticket's text reuse its analysis
+        tools=list(build_support_tools(analysis=analysis)),
+    )
+
+def __getattr__(name):
+    # Keep `from tasks.task_ticket_followup import support_task_conversation` working: the first
+    # open ticket's task is only built on access instead of at import time.
+    if name == "support_task_conversation":
+        ticket = load_ticket(index=0)
+        if not should_process_ticket(ticket):
+            raise AttributeError("🚫 The first open ticket doesn't need a response.")
+        return build_followup_task(ticket)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,29 +1,70 @@
-from langchain_core.documents import Document
-from crewai.tools import tool
-import os
-import json
+PRIORITY_MAP = {
+    "common_issue": 1,
+    "kb_article": 2,
+    "theme_note": 3,
+    "theme_doc": 4,
+    "support_ticket": 5
+}
+
+# Reciprocal-rank fusion constant and per-retriever weights
+RRF_K = 60
+FUSION_WEIGHTS = {"vector": 1.0, "bm25": 1.0}
+
+def source_priority(doc):
+    return PRIORITY_MAP.get(doc.metadata.get("source", ""), 99)
 
 def rerank_results(results):
-    """Sort results by priority type"""
-    priority_map = {
-        "common_issue": 1,
-        "kb_article": 2,
-        "theme_note": 3,
-        "theme_doc": 4,
-        "support_ticket": 5
-    }
-    return sorted(results, key=lambda doc: priority_map.get(doc.metadata.get("source", ""), 99))
+    """Sort (document, score) pairs by priority type, then by score within each type"""
+    return sorted(results, key=lambda pair: (source_priority(pair[0]), -(pair[1] or 0.0)))
+
+def fuse_results(ranked_lists, weights=None, k=RRF_K):
+    """
+    Weighted reciprocal-rank fusion of several ranked [(document, score)] lists.
+    Returns (document, fused score) pairs, best first, with scores normalized to
+    0..1 (1.0 means ranked first by every retriever).
+    """
+    from utils.vector_index import document_id
+
+    weights = weights or {}
+    fused, docs = {}, {}
+    total_weight = 0.0
+    for name, results in ranked_lists.items():
+        weight = weights.get(name, 1.0)
+        total_weight += weight
+        for rank, (doc, _) in enumerate(results):
+            doc_id = document_id(doc)
+            docs.setdefault(doc_id, doc)
+            fused[doc_id] = fused.get(doc_id, 0.0) + weight / (k + rank + 1)
 
-def search_kb_raw(query: str, retriever=None):
+    best_possible = total_weight / (k + 1) if total_weight else 1.0
+    ranked = sorted(fused.items(), key=lambda item: item[1], reverse=True)
+    return [(docs[doc_id], score / best_possible) for doc_id, score in ranked]
+
+def dedupe_chunks(results):
+    """Keep only the best-ranked chunk of each parent document."""
+    seen = set()
+    unique = []
+    for doc, score in results:
+        key = doc.metadata.get("parent_id") or id(doc)
+        if key not in seen:
+            seen.add(key)
+            unique.append((doc, score))
+    return unique
+
+def search_kb_raw(query: str, kb=None):
     """Raw search function that returns structured data from the KB"""
-    if not retriever:
+    if not kb or not kb.use_vectorstore:
         return {
             "source": "error",
             "title": "Retrieval Error",
             "content": "Retrieval is disabled. Vectorstore not loaded."
         }
 
-    results = rerank_results(retriever.invoke(query))
+    return format_kb_result(kb.search(query))
+
+def format_kb_result(hits):
+    """Turn (document, score) search hits into the structured KB result used by tasks"""
+    results = dedupe_chunks(rerank_results(hits))
 
     if not results:
         return {
@@ -33,30 +74,35 @@ def search_kb_raw(query: str, retriever=None):
         }
 
     # Return structured data for common issues with a special prefix
-    common_issues = [doc for doc in results if doc.metadata.get("issue_type") == "common_issue"]
+    common_issues = [(doc, score) for doc, score in results if doc.metadata.get("issue_type") == "common_issue"]
     if common_issues:
+        doc, score = common_issues[0]
         return {
             "source": "common_issue",
-            "title": common_issues[0].metadata.get("title", "Common Issue"),
-            "content": f"STRICT_RESPONSE: {common_issues[0].metadata.get('expected_response')}",
+            "title": doc.metadata.get("title", "Common Issue"),
+            "content": f"STRICT_RESPONSE: {doc.metadata.get('expected_response')}",
+            "score": score,
             "is_strict": True
         }
 
     # Fallback: return first result in structured format
-    first_result = results[0]
+    first_result, first_score = results[0]
     return {
         "source": first_result.metadata.get("source", "unknown"),
         "title": first_result.metadata.get("title", "Untitled"),
         "url": first_result.metadata.get("url", ""),
-        "content": first_result.page_content[:1000],
+        "section": first_result.metadata.get("section", ""),
+        "content": first_result.page_content,
+        "score": first_score,
         "is_strict": False,
         "all_results": [
             {
                 "source": doc.metadata.get("source", "unknown"),
                 "title": doc.metadata.get("title", "Untitled"),
                 "url": doc.metadata.get("url", ""),
-                "snippet": doc.page_content[:300]
+                "snippet": doc.page_content[:300],
+                "score": score
             }
-            for doc in results[1:3]  # Include 2 additional results
+            for doc, score in results[1:3]  # Include 2 additional results
         ]
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,76 @@
+import re
+import math
+from collections import Counter, defaultdict
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[._\-][a-z0-9]+)*")
+
+STOPWORDS = frozenset("""
+a an and are as at be but by can do for from has have hi how i if in is it its my
+not of on or our please so that the this to was we what when with you your
+""".split())
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Lowercase word tokens that keep versions and compound names intact
+    ("8.3.1", "slider-revolution") and also emit their parts.
+    """
+    tokens = []
+    for token in TOKEN_RE.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        tokens.append(token)
+        parts = re.split(r"[._\-]", token)
+        if len(parts) > 1:
+            tokens.extend(p for p in parts if p and p not in STOPWORDS and not p.isdigit())
+    return tokens
+
+
+class BM25Index:
+    """
+    In-memory inverted index with Okapi BM25 scoring, for exact-term matches.
+    `documents` are Documents, or (key, text) pairs together with `resolve`:
+    then only the keys are kept and `resolve(key)` fetches the Document of each hit.
+    """
+
+    def __init__(self, documents, k1=1.5, b=0.75, resolve=None):
+        self.resolve = resolve
+        self.documents = []
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(list)
+        self.doc_lengths = []
+        for i, item in enumerate(documents):
+            if resolve is None:
+                text = item.page_content + "\n" + str(item.metadata.get("title", ""))
+            else:
+                item, text = item
+            self.documents.append(item)
+            counts = Counter(tokenize(text))
+            self.doc_lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings[term].append((i, tf))
+        self.avg_length = (sum(self.doc_lengths) / len(self.doc_lengths)) if self.doc_lengths else 0.0
+        n = len(self.documents)
+        self.idf = {
+            term: math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            for term, posting in self.postings.items()
+        }
+
+    def __len__(self):
+        return len(self.documents)
+
+    def search(self, query: str, k: int = 10):
+        """Return up to `k` (document, score) pairs, best first."""
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for i, tf in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[i] / (self.avg_length or 1))
+                scores[i] += idf * tf * (self.k1 + 1) / (tf + norm)
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        if self.resolve is not None:
+            return [(self.resolve(self.documents[i]), score) for i, score in best]
+        return [(self.documents[i], score) for i, score in best]
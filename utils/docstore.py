@@ -0,0 +1,133 @@
+import os
+import json
+import sqlite3
+import threading
+
+from langchain_community.docstore.base import AddableMixin, Docstore
+from langchain_core.documents import Document
+
+DOCSTORE_FILENAME = "docstore.sqlite"
+
+# Metadata fields copied into their own indexed columns so they can be queried
+METADATA_COLUMNS = ("source", "theme", "slug", "ticket_id", "title")
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS documents (
+    id TEXT PRIMARY KEY,
+    {", ".join(f"{column} TEXT" for column in METADATA_COLUMNS)},
+    metadata TEXT NOT NULL,
+    page_content TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS positions (
+    position INTEGER PRIMARY KEY,
+    id TEXT NOT NULL
+);
+{"".join(f"CREATE INDEX IF NOT EXISTS documents_{column} ON documents ({column});" for column in METADATA_COLUMNS)}
+"""
+
+
+class SQLiteDocstore(Docstore, AddableMixin):
+    """
+    FAISS docstore kept in an SQLite file next to the index, in place of the
+    pickled in-memory one. Opening it reads nothing but the schema: a document
+    is only read when a search returns it. The vector position → document ID
+    map is stored in the same file, and changes become durable on `save()`.
+    """
+
+    def __init__(self, path, reset=False):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.executescript(SCHEMA)
+            if reset:
+                self._conn.execute("DELETE FROM documents")
+                self._conn.execute("DELETE FROM positions")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def search(self, search: str):
+        """Return the Document stored under `search`, or an error string like InMemoryDocstore."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT page_content, metadata FROM documents WHERE id = ?", (search,)
+            ).fetchone()
+        if row is None:
+            return f"ID {search} not found."
+        return Document(page_content=row[0], metadata=json.loads(row[1]))
+
+    def add(self, texts: dict):
+        with self._lock:
+            existing = self._existing_ids(texts)
+            if existing:
+                raise ValueError(f"Tried to add ids that already exist: {existing}")
+            self._conn.executemany(
+                f"INSERT INTO documents (id, {', '.join(METADATA_COLUMNS)}, metadata, page_content) "
+                f"VALUES ({', '.join('?' * (len(METADATA_COLUMNS) + 3))})",
+                [
+                    (doc_id, *[_column_value(doc.metadata.get(column)) for column in METADATA_COLUMNS],
+                     json.dumps(doc.metadata, ensure_ascii=False, default=str), doc.page_content)
+                    for doc_id, doc in texts.items()
+                ],
+            )
+
+    def delete(self, ids):
+        with self._lock:
+            missing = set(ids) - set(self._existing_ids(ids))
+            if missing:
+                raise ValueError(f"Tried to delete ids that does not exist: {sorted(missing)}")
+            self._conn.executemany("DELETE FROM documents WHERE id = ?", [(doc_id,) for doc_id in ids])
+
+    def _existing_ids(self, ids):
+        ids = list(ids)
+        found = []
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            found += [row[0] for row in self._conn.execute(
+                f"SELECT id FROM documents WHERE id IN ({', '.join('?' * len(chunk))})", chunk
+            )]
+        return found
+
+    def query(self, **filters):
+        """IDs of the documents whose metadata columns equal the given values, e.g. query(source="kb_article")."""
+        unknown = set(filters) - set(METADATA_COLUMNS)
+        if unknown:
+            raise ValueError(f"Cannot query on {sorted(unknown)}; queryable columns are {METADATA_COLUMNS}.")
+        where = " AND ".join(f"{column} = ?" for column in filters) or "1"
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                f"SELECT id FROM documents WHERE {where} ORDER BY id",
+                [_column_value(value) for value in filters.values()],
+            )]
+
+    def iter_texts(self):
+        """Yield (id, page_content, title) for every document, without building Documents."""
+        with self._lock:
+            rows = self._conn.execute("SELECT id, page_content, title FROM documents").fetchall()
+        yield from rows
+
+    def load_positions(self):
+        """The saved {vector position: document ID} map."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT position, id FROM positions"))
+
+    def save(self, index_to_docstore_id):
+        """Store the position map and commit every pending add and delete."""
+        with self._lock:
+            self._conn.execute("DELETE FROM positions")
+            self._conn.executemany(
+                "INSERT INTO positions (position, id) VALUES (?, ?)",
+                [(int(position), doc_id) for position, doc_id in index_to_docstore_id.items()],
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _column_value(value):
+    return None if value is None else str(value)
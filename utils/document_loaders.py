@@ -1,19 +1,96 @@
 
 import os
+import re
 import json
+from functools import lru_cache, wraps
 from langchain_core.documents import Document
-from utils.helpers import parse_json_file, clean_html_to_text
+from itertools import islice
+from utils.helpers import clean_html_many, clean_html_to_text, compute_file_hash
+from utils.embedding_pipeline import count_tokens
+from utils.json_stream import find_corpus_file, iter_records
+from utils.snapshot_cache import cached_documents, code_version
 
 DATA_FOLDER = "data"
 
+# Chunking: long theme docs, KB articles and ticket threads are split into
+# heading-aligned, token-bounded chunks so each vector covers one topic.
+CHUNK_TOKENS = 400
+CHUNK_OVERLAP = 50
+MAX_CHUNKS_PER_DOC = 24
+CHUNKED_SOURCES = ("theme_doc", "kb_article", "support_ticket")
+
+HEADING_RE = re.compile(r"^#{1,6}[ \t]+\S", re.M)
+
+# Closed tickets are read in batches so their comments can be cleaned in parallel
+TICKET_BATCH = 500
+
+# Cleaned Documents of each corpus are snapshotted under DATA_FOLDER/SNAPSHOT_FOLDER
+SNAPSHOTS_ENABLED = os.getenv("CORPUS_SNAPSHOTS", "1") != "0"
+SNAPSHOT_FOLDER = os.path.join("cache", "snapshots")
+UTILS_FOLDER = os.path.dirname(os.path.abspath(__file__))
+# Code whose output a snapshot stores: a change to any of these files invalidates it
+LOADER_CODE = ("document_loaders.py", "helpers.py", "json_stream.py")
+CHUNKER_CODE = ("embedding_pipeline.py", "vector_index.py")
+
+@lru_cache(maxsize=2)
+def loader_code_version(chunked=False):
+    files = LOADER_CODE + (CHUNKER_CODE if chunked else ())
+    return code_version(*(os.path.join(UTILS_FOLDER, name) for name in files))
+
+def snapshotted(name):
+    """
+    Serve a corpus loader from a snapshot of the Documents it last produced, keyed by
+    the digest of the `name` corpus file and the loader code version, so a corpus is
+    only re-parsed and re-cleaned when its own file changed. The wrapped loader takes
+    `chunked=True` to stream (and snapshot) its chunk_documents output instead.
+    """
+    def decorate(build):
+        @wraps(build)
+        def loader(chunked=False):
+            produce = (lambda: chunk_documents(build())) if chunked else build
+            path = find_corpus_file(DATA_FOLDER, name)
+            if not SNAPSHOTS_ENABLED or path is None:
+                return produce()
+            key = {
+                "source": os.path.basename(path),
+                "source_digest": compute_file_hash(path),
+                "code": loader_code_version(chunked),
+            }
+            snapshot = os.path.join(DATA_FOLDER, SNAPSHOT_FOLDER, f"{name}{'.chunks' if chunked else ''}.pkl")
+            return cached_documents(snapshot, key, produce)
+        loader.corpus = name
+        return loader
+    return decorate
+
+def corpus_records(name, key=None):
+    """Stream the records of the `name` corpus from name.json, .jsonl, .jsonl.gz or .jsonl.zst."""
+    return iter_records(find_corpus_file(DATA_FOLDER, name) or os.path.join(DATA_FOLDER, f"{name}.json"), key)
+
+def latest_records(name, key=None, id_field="ticket_id"):
+    """
+    Stream the `name` corpus keeping only the last record for each `id_field`. JSONL
+    corpora can be append-only stores holding several revisions of a record; they
+    are read twice (first for the position of each record's last revision).
+    """
+    path = find_corpus_file(DATA_FOLDER, name)
+    if path is None or ".jsonl" not in os.path.basename(path):
+        yield from corpus_records(name, key)
+        return
+    last = {}
+    for i, record in enumerate(corpus_records(name, key)):
+        if isinstance(record, dict):
+            last[record.get(id_field)] = i
+    for i, record in enumerate(corpus_records(name, key)):
+        if not isinstance(record, dict) or last.get(record.get(id_field)) == i:
+            yield record
+
 def format_documents(raw_data, source, content_key="content", title_key="title", url_key="url"):
-    documents = []
     for item in raw_data:
         content = item.get(content_key)
         if not content:
             continue
         page_content = clean_html_to_text(content) if source == "kb_article" else content.strip()
-        documents.append(Document(
+        yield Document(
             page_content=page_content,
             metadata={
                 "title": item.get(title_key, "Untitled"),
@@ -21,16 +98,16 @@ def format_documents(raw_data, source, content_key="content", title_key="title",
                 "source": source,
                 **({"slug": item.get("slug")} if source == "theme_doc" else {})
             }
-        ))
-    return documents
+        )
 
+@snapshotted("theme_info")
 def load_theme_meta():
-    data = parse_json_file(os.path.join(DATA_FOLDER, "theme_info.json"))
-    documents = []
-    for slug, meta in data.items():
+    # theme_info.json maps slug -> meta; JSONL variants carry the slug in each record
+    for record in corpus_records("theme_info"):
+        slug, meta = record if isinstance(record, tuple) else (record.get("slug"), record)
         builder = meta.get("builder", "Unknown")
         name = meta.get("name", slug)
-        documents.append(Document(
+        yield Document(
             page_content=f"{name} uses the {builder} page builder.",
             metadata={
                 "title": f"{name} Builder Info",
@@ -44,18 +121,19 @@ def load_theme_meta():
                 "category": meta.get("category"),
                 "source": "theme_info"
             }
-        ))
-    return documents
+        )
 
+@snapshotted("kb_articles")
 def load_kb_articles():
-    return format_documents(parse_json_file(os.path.join(DATA_FOLDER, "kb_articles.json")), "kb_article")
+    return format_documents(corpus_records("kb_articles"), "kb_article")
 
+@snapshotted("theme_docs")
 def load_theme_docs():
-    return format_documents(parse_json_file(os.path.join(DATA_FOLDER, "theme_docs.json")), "theme_doc")
+    return format_documents(corpus_records("theme_docs"), "theme_doc")
 
+@snapshotted("common_issues")
 def load_common_issues():
-    data = parse_json_file(os.path.join(DATA_FOLDER, "common_issues.json"))
-    return [
+    return (
         Document(
             page_content = (
                 f"COMMON TITLE: {item['title']}\n"
@@ -71,13 +149,13 @@ def load_common_issues():
                 "customization_summary": item.get("customization_summary", "")
             }
         )
-        for item in data
-    ]
+        for item in corpus_records("common_issues")
+    )
 
 
+@snapshotted("theme_notes")
 def load_theme_notes():
-    data = parse_json_file(os.path.join(DATA_FOLDER, "theme_notes.json"))
-    return [
+    return (
         Document(
             page_content=item["note"],
             metadata={
@@ -86,12 +164,12 @@ def load_theme_notes():
                 "version": item.get("version"),
                 "source": "theme_note"
             }
-        ) for item in data
-    ]
+        ) for item in corpus_records("theme_notes")
+    )
 
+@snapshotted("ticket_examples")
 def load_ticket_examples():
-    data = parse_json_file(os.path.join(DATA_FOLDER, "ticket_examples.json"))
-    return [
+    return (
         Document(
             page_content=f"CUSTOMER MESSAGE: {item.get('customer_message', '')} EXPECTED RESPONSE: {item.get('expected_response', '')}",
             metadata={
@@ -99,58 +177,180 @@ def load_ticket_examples():
                 "issue_type": item.get("issue_type", "unknown"),
                 "source": "ticket_example"
             }
-        ) for item in data
-    ]
+        ) for item in corpus_records("ticket_examples")
+    )
 
+@snapshotted("closed_tickets")
 def load_closed_tickets():
-    """Load closed support tickets from a JSON file."""
-    path = os.path.join(DATA_FOLDER, "closed_tickets.json")
-    data = parse_json_file(path)
+    """Stream closed support tickets, one Document per ticket thread."""
+    records = latest_records("closed_tickets", key="closed-tickets")
+    while records_batch := list(islice(records, TICKET_BATCH)):
+        batch = [t for t in records_batch if isinstance(t, dict) and t.get("ticket_comments")]
+        cleaned = iter(clean_html_many(c.get("comment", "") for t in batch for c in t["ticket_comments"]))
+        for t in batch:
+            doc = ticket_to_document(t, [next(cleaned) for _ in t["ticket_comments"]])
+            if doc is not None:
+                yield doc
 
-    if isinstance(data, dict) and "closed-tickets" in data:
-        data = data["closed-tickets"]
+# Knowledge base corpora, in indexing order
+KNOWLEDGE_BASE_LOADERS = (
+    load_theme_meta, load_theme_notes, load_common_issues,
+    load_kb_articles, load_theme_docs, load_closed_tickets,
+)
 
-    documents = []
-    for t in data:
-        if not isinstance(t, dict) or not t.get("ticket_comments"):
-            continue
+def ticket_to_document(t, comments=None):
+    """
+    Build the Document for one closed ticket, or None when it has no usable comments.
+    `comments` are the already cleaned comment texts, in order, when available.
+    """
+    if not isinstance(t, dict) or not t.get("ticket_comments"):
+        return None
+    if comments is None:
+        comments = [clean_html_to_text(c.get("comment", "")) for c in t["ticket_comments"]]
 
-        text_blocks = []
-        for c in t["ticket_comments"]:
-            comment = clean_html_to_text(c.get("comment", ""))
-            if comment:
-                is_private = c.get("private") == "1"
-                prefix = f"[PRIVATE] " if is_private else ""
-                text_blocks.append(f"{prefix}{c.get('commenter_name', 'User')}:\n{comment}")
-        conversation = "\n\n---\n\n".join(text_blocks)
-        if conversation.strip():
-            theme = "Unknown Theme"
-            envato_str = t.get("envato_verified_string")
-            if isinstance(envato_str, str):
-                try:
-                    theme_data = json.loads(envato_str)
-                    theme = theme_data.get("item_name", theme)
-                except json.JSONDecodeError:
-                    print(f"⚠️ Invalid JSON in envato_verified_string for ticket {t.get('ticket_id', 'unknown')}")
-                except Exception as e:
-                    print(f"⚠️ Error parsing envato_verified_string for ticket {t.get('ticket_id', 'unknown')}: {e}")
-
-            documents.append(Document(
-                page_content=conversation.strip(),
-                metadata={
-                    "title": t.get("ticket_title", "Untitled Ticket"),
-                    "url": t.get("related_url", ""),
-                    "ticket_id": t.get("ticket_id"),
-                    "theme": theme,
-                    "source": "support_ticket"
-                }
-            ))
-    return documents
+    text_blocks = []
+    for c, comment in zip(t["ticket_comments"], comments):
+        if comment:
+            is_private = c.get("private") == "1"
+            prefix = f"[PRIVATE] " if is_private else ""
+            text_blocks.append(f"{prefix}{c.get('commenter_name', 'User')}:\n{comment}")
+    conversation = "\n\n---\n\n".join(text_blocks)
+    if conversation.strip():
+        theme = "Unknown Theme"
+        envato_str = t.get("envato_verified_string")
+        if isinstance(envato_str, str):
+            try:
+                theme_data = json.loads(envato_str)
+                theme = theme_data.get("item_name", theme)
+            except json.JSONDecodeError:
+                print(f"⚠️ Invalid JSON in envato_verified_string for ticket {t.get('ticket_id', 'unknown')}")
+            except Exception as e:
+                print(f"⚠️ Error parsing envato_verified_string for ticket {t.get('ticket_id', 'unknown')}: {e}")
+
+        return Document(
+            page_content=conversation.strip(),
+            metadata={
+                "title": t.get("ticket_title", "Untitled Ticket"),
+                "url": t.get("related_url", ""),
+                "ticket_id": t.get("ticket_id"),
+                "theme": theme,
+                "source": "support_ticket"
+            }
+        )
+    return None
 
 def load_backstory(path="data/support_agent_backstory.md"):
     with open(path, encoding="utf-8") as f:
         return f.read()
     
+@lru_cache(maxsize=4)
 def load_guidelines(path="data/support_task_guidelines.md"):
     with open(path, encoding="utf-8") as f:
-        return f.read()
\ No newline at end of file
+        return f.read()
+
+def _split_sections(text):
+    """Split markdown into (heading, section text) pairs at ATX headings."""
+    starts = [m.start() for m in HEADING_RE.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    for begin, end in zip(starts, starts[1:] + [len(text)]):
+        section = text[begin:end].strip()
+        if section:
+            first_line = section.split("\n", 1)[0]
+            heading = first_line.lstrip("#").strip() if first_line.startswith("#") else ""
+            yield heading, section
+
+def _split_units(section, max_tokens):
+    """Break a section into paragraphs, lines or word runs that each fit in `max_tokens`."""
+    for paragraph in re.split(r"\n\s*\n", section):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        tokens = count_tokens(paragraph)
+        if tokens <= max_tokens:
+            yield paragraph, tokens
+            continue
+        for line in paragraph.split("\n"):
+            line = line.strip()
+            if not line:
+                continue
+            tokens = count_tokens(line)
+            if tokens <= max_tokens:
+                yield line, tokens
+                continue
+            words = line.split()
+            step = max(1, len(words) * max_tokens // tokens)
+            for i in range(0, len(words), step):
+                piece = " ".join(words[i:i + step])
+                yield piece, count_tokens(piece)
+
+def _pack_chunks(text, max_tokens, overlap):
+    """Greedily pack section units into chunks, carrying `overlap` tokens between chunks of a section."""
+    chunk, size, chunk_heading = [], 0, ""
+    for heading, section in _split_sections(text):
+        units = list(_split_units(section, max_tokens))
+        section_tokens = sum(tokens for _, tokens in units)
+        # Start a new chunk at a heading unless the whole section still fits
+        if chunk and size + section_tokens > max_tokens:
+            yield chunk_heading, "\n\n".join(u for u, _ in chunk)
+            chunk, size = [], 0
+        if not chunk:
+            chunk_heading = heading
+        for unit, tokens in units:
+            if chunk and size + tokens > max_tokens:
+                yield chunk_heading, "\n\n".join(u for u, _ in chunk)
+                carry, carry_size = [], 0
+                for u, t in reversed(chunk):
+                    if carry_size + t > overlap:
+                        break
+                    carry.insert(0, (u, t))
+                    carry_size += t
+                chunk, size, chunk_heading = carry, carry_size, heading
+                # Repeat the heading on continuation chunks so they keep their context
+                if heading and not (chunk and chunk[0][0].startswith("#")):
+                    heading_line = section.split("\n", 1)[0]
+                    chunk.insert(0, (heading_line, count_tokens(heading_line)))
+                    size += chunk[0][1]
+            chunk.append((unit, tokens))
+            size += tokens
+    if chunk:
+        yield chunk_heading, "\n\n".join(u for u, _ in chunk)
+
+def chunk_documents(documents, max_tokens=CHUNK_TOKENS, overlap=CHUNK_OVERLAP,
+                    max_chunks=MAX_CHUNKS_PER_DOC, sources=CHUNKED_SOURCES):
+    """
+    Stream `documents`, splitting long ones from `sources` into token-bounded chunks
+    along markdown headings. Each chunk keeps its parent's metadata plus `parent_id`,
+    `chunk_index`, `chunk_count` and `section`; documents that fit in one chunk pass
+    through unchanged. The chunk budget grows for very long documents so no document
+    produces more than `max_chunks` vectors.
+    """
+    from utils.vector_index import document_id
+
+    for doc in documents:
+        if doc.metadata.get("source") not in sources:
+            yield doc
+            continue
+        total = count_tokens(doc.page_content)
+        if total <= max_tokens:
+            yield doc
+            continue
+
+        budget = max(max_tokens, -(-total // max_chunks) + overlap)
+        pieces = list(_pack_chunks(doc.page_content, budget, overlap))
+        while len(pieces) > max_chunks:
+            budget = int(budget * 1.25)
+            pieces = list(_pack_chunks(doc.page_content, budget, overlap))
+
+        parent_id = document_id(doc)
+        for i, (section, content) in enumerate(pieces):
+            yield Document(
+                page_content=content,
+                metadata={
+                    **doc.metadata,
+                    "parent_id": parent_id,
+                    "chunk_index": i,
+                    "chunk_count": len(pieces),
+                    "section": section,
+                }
+            )
@@ -0,0 +1,138 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from array import array
+from functools import lru_cache
+
+from langchain_core.embeddings import Embeddings
+
+CACHE_PATH = os.path.join("data", "cache", "embeddings.sqlite")
+MAX_ENTRIES = 200_000
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for cache keys so whitespace-only differences share a vector."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps any LangChain embedder with a persistent SQLite cache keyed by
+    (model, normalized text hash), so a text is only ever sent to the API once.
+    The cache is bounded to `max_entries` and evicts the least recently used vectors.
+    """
+
+    def __init__(self, embedder, path=CACHE_PATH, max_entries=MAX_ENTRIES, model=None):
+        self.embedder = embedder
+        self.model = model or getattr(embedder, "model", None) or type(embedder).__name__
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                key TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, key)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+
+    def lookup(self, texts):
+        """Return {key: vector} for every text already in the cache."""
+        keys = list({text_key(t) for t in texts})
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE model = ? AND key IN ({','.join('?' * len(batch))})",
+                    [self.model, *batch],
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND key = ?",
+                    [(now, self.model, key) for key in found],
+                )
+                self._conn.commit()
+        return found
+
+    def store(self, texts, vectors):
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, key, vector, last_used) VALUES (?, ?, ?, ?)",
+                [(self.model, text_key(t), array("f", v).tobytes(), now) for t, v in zip(texts, vectors)],
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE rowid IN "
+                "(SELECT rowid FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                (overflow,),
+            )
+
+    def embed_documents(self, texts):
+        texts = list(texts)
+        cached = self.lookup(texts)
+        missing = {}
+        for t in texts:
+            key = text_key(t)
+            if key not in cached and key not in missing:
+                missing[key] = t
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            new_texts = list(missing.values())
+            new_vectors = self.embedder.embed_documents(new_texts)
+            self.store(new_texts, new_vectors)
+            cached.update(zip(missing.keys(), new_vectors))
+
+        return [list(cached[text_key(t)]) for t in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+    def stats(self):
+        with self._lock:
+            (entries,) = self._conn.execute(
+                "SELECT COUNT(*) FROM embeddings WHERE model = ?", (self.model,)
+            ).fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_embeddings():
+    """Shared cached OpenAI embedder used by every index builder."""
+    from langchain_openai import OpenAIEmbeddings
+    return CachedEmbeddings(OpenAIEmbeddings())
@@ -0,0 +1,189 @@
+import time
+import random
+import asyncio
+import multiprocessing
+from functools import lru_cache
+
+MAX_WORKERS = max(1, multiprocessing.cpu_count() - 1)
+
+# OpenAI accepts up to 2048 inputs and ~300k tokens per embeddings request;
+# stay well below so a single slow batch does not hold up the whole build.
+MAX_BATCH_TOKENS = 100_000
+MAX_BATCH_SIZE = 512
+MAX_RETRIES = 8
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Token count with tiktoken, or a ~4 chars/token estimate when it is unavailable."""
+    encoding = _encoding()
+    if encoding is None:
+        return max(1, len(text) // 4)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def pack_batches(texts, max_tokens=MAX_BATCH_TOKENS, max_size=MAX_BATCH_SIZE):
+    """Group text indices into batches that stay under both the token and the input budget."""
+    batches, batch, batch_tokens = [], [], 0
+    for i, text in enumerate(texts):
+        tokens = count_tokens(text)
+        if batch and (batch_tokens + tokens > max_tokens or len(batch) >= max_size):
+            batches.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append(i)
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def is_rate_limit_error(error) -> bool:
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or type(error).__name__ == "RateLimitError"
+
+
+def retry_after_seconds(error):
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit shared by all batch workers. A 429 halves the number of
+    requests allowed in flight and pauses everyone until the cooldown expires;
+    each success lets one more request through, up to `max_concurrency`.
+    """
+
+    def __init__(self, max_concurrency, base_delay=1.0, max_delay=60.0):
+        self.max_concurrency = max_concurrency
+        self.limit = max_concurrency
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.delay = base_delay
+        self.resume_at = 0.0
+        self.in_flight = 0
+        self.rate_limited = 0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._cond:
+            while True:
+                wait = self.resume_at - time.monotonic()
+                if wait > 0:
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), timeout=wait)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                if self.in_flight < self.limit:
+                    self.in_flight += 1
+                    return
+                await self._cond.wait()
+
+    async def release(self, rate_limited=False, retry_after=None):
+        async with self._cond:
+            self.in_flight -= 1
+            if rate_limited:
+                self.rate_limited += 1
+                self.limit = max(1, self.limit // 2)
+                pause = retry_after if retry_after is not None else self.delay * (1 + random.random())
+                self.resume_at = max(self.resume_at, time.monotonic() + pause)
+                self.delay = min(self.max_delay, self.delay * 2)
+            else:
+                self.limit = min(self.max_concurrency, self.limit + 1)
+                self.delay = max(self.base_delay, self.delay / 2)
+            self._cond.notify_all()
+
+
+async def _embed_batch(embedder, texts, limiter, max_retries):
+    for attempt in range(max_retries + 1):
+        await limiter.acquire()
+        try:
+            if hasattr(embedder, "aembed_documents"):
+                vectors = await embedder.aembed_documents(texts)
+            else:
+                vectors = await asyncio.to_thread(embedder.embed_documents, texts)
+        except Exception as e:
+            if not is_rate_limit_error(e) or attempt == max_retries:
+                await limiter.release()
+                raise
+            await limiter.release(rate_limited=True, retry_after=retry_after_seconds(e))
+            continue
+        await limiter.release()
+        return vectors
+
+
+async def aembed_texts(texts, embedding, max_concurrency=MAX_WORKERS,
+                       max_batch_tokens=MAX_BATCH_TOKENS, max_batch_size=MAX_BATCH_SIZE,
+                       max_retries=MAX_RETRIES):
+    """
+    Embed `texts` in token-budgeted batches with bounded, rate-limit-aware concurrency.
+
+    When `embedding` is a CachedEmbeddings, already-cached texts are skipped and every
+    finished batch is written to the cache straight away, so the cache doubles as the
+    build checkpoint: an interrupted build resumes from the last completed batch.
+    """
+    texts = list(texts)
+    cache = embedding if hasattr(embedding, "lookup") and hasattr(embedding, "store") else None
+    embedder = cache.embedder if cache else embedding
+
+    vectors = [None] * len(texts)
+    pending = list(range(len(texts)))
+    if cache:
+        from utils.embedding_cache import text_key
+        found = cache.lookup(texts)
+        pending = []
+        for i, text in enumerate(texts):
+            vector = found.get(text_key(text))
+            if vector is None:
+                pending.append(i)
+            else:
+                vectors[i] = vector
+        cache.hits += len(texts) - len(pending)
+        cache.misses += len(pending)
+
+    if not pending:
+        return vectors
+
+    pending_texts = [texts[i] for i in pending]
+    batches = pack_batches(pending_texts, max_batch_tokens, max_batch_size)
+    limiter = AdaptiveLimiter(max_concurrency)
+    started = time.monotonic()
+    done = 0
+
+    async def run(batch):
+        nonlocal done
+        batch_texts = [pending_texts[j] for j in batch]
+        batch_vectors = await _embed_batch(embedder, batch_texts, limiter, max_retries)
+        if cache:
+            await asyncio.to_thread(cache.store, batch_texts, batch_vectors)
+        for j, vector in zip(batch, batch_vectors):
+            vectors[pending[j]] = vector
+        done += 1
+        print(f"    🧮 Embedded batch {done}/{len(batches)} ({len(batch_texts)} texts)")
+
+    await asyncio.gather(*(run(batch) for batch in batches))
+    print(f"✅ Embedded {len(pending)} texts in {len(batches)} batches "
+          f"({time.monotonic() - started:.1f}s, {limiter.rate_limited} rate-limited retries).")
+    return vectors
+
+
+def embed_texts(texts, embedding, **kwargs):
+    """Synchronous entry point for `aembed_texts`."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(aembed_texts(texts, embedding, **kwargs))
+    # Already inside an event loop (e.g. a notebook): fall back to the plain client.
+    return embedding.embed_documents(list(texts))
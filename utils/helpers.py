@@ -1,47 +1,168 @@
 
 import os
-import json
 import html
+import atexit
 import hashlib
-from functools import lru_cache
-from bs4 import BeautifulSoup
+from html.entities import html5
+from html.parser import HTMLParser
+from concurrent.futures import ProcessPoolExecutor
 
-@lru_cache(maxsize=100)
-def compute_file_hash(filepath):
-    """Compute MD5 hash of a file with caching."""
-    hash_md5 = hashlib.md5()
+# Batches with at least this many characters of HTML are cleaned across a process pool
+PARALLEL_MIN_CHARS = 1_000_000
+MAX_CLEAN_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+# Tags BeautifulSoup's html.parser builder closes immediately, and tags whose
+# text it stores as non-content strings (left out of get_text)
+VOID_TAGS = frozenset((
+    "area", "base", "basefont", "bgsound", "br", "col", "command", "embed", "frame", "hr", "image",
+    "img", "input", "isindex", "keygen", "link", "menuitem", "meta", "nextid", "param", "source",
+    "spacer", "track", "wbr",
+))
+HIDDEN_TEXT_TAGS = frozenset(("script", "style", "template", "rt", "rp"))
+ENTITIES = {name[:-1] if name.endswith(";") else name: char for name, char in sorted(html5.items())}
+# Files are hashed in chunks of this many bytes
+HASH_CHUNK_SIZE = 1 << 20
+
+def compute_file_hash(filepath, chunk_size=HASH_CHUNK_SIZE):
+    """BLAKE2b digest of a file's bytes, read in fixed-size chunks."""
+    digest = hashlib.blake2b()
     with open(filepath, "rb") as f:
-        while chunk := f.read(8192):
-            hash_md5.update(chunk)
-    return hash_md5.hexdigest()
-
-def compute_all_file_hashes(folder_path):
-    file_hashes = {}
-    for root, _, files in sorted(os.walk(folder_path)):
-        for fname in sorted(files):
-            fpath = os.path.join(root, fname)
-            if os.path.isfile(fpath):
-                file_hashes[os.path.relpath(fpath, folder_path)] = compute_file_hash(fpath)
-    return file_hashes
-
-def hashes_changed(stored_hashes, current_hashes):
-    return stored_hashes != current_hashes
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class _TextExtractor(HTMLParser):
+    """
+    Collects the strings BeautifulSoup(markup, "html.parser").get_text("\\n", strip=True)
+    returns, straight from the parser events and without building a tree: text is
+    split at every tag, comment or declaration, and text inside script, style,
+    template, rt and rp is skipped.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.parts = []
+        self.current = []
+        self.open_tags = []
+        self.hidden = 0
+        self.closed_void_tags = []
+
+    def flush(self):
+        if self.current:
+            text = "".join(self.current).strip()
+            self.current = []
+            if text and not self.hidden:
+                self.parts.append(text)
+
+    def handle_starttag(self, tag, attrs, close_void=True):
+        self.flush()
+        self.open_tags.append(tag)
+        if tag in HIDDEN_TEXT_TAGS:
+            self.hidden += 1
+        if close_void and tag in VOID_TAGS:
+            self._close(tag)
+            # A later explicit </tag> for it is then ignored
+            self.closed_void_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs, close_void=False)
+        self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in self.closed_void_tags:
+            self.closed_void_tags.remove(tag)
+        else:
+            self._close(tag)
+
+    def _close(self, tag):
+        self.flush()
+        if tag not in self.open_tags:
+            return
+        while self.open_tags:
+            name = self.open_tags.pop()
+            if name in HIDDEN_TEXT_TAGS:
+                self.hidden -= 1
+            if name == tag:
+                break
+
+    def handle_data(self, data):
+        self.current.append(data)
+
+    def handle_charref(self, name):
+        number = int(name.lstrip("xX"), 16) if name[:1] in "xX" else int(name)
+        data = None
+        if number < 256:
+            # Like BeautifulSoup, read low code points as windows-1252 (&#147; is a curly quote)
+            try:
+                data = bytes([number]).decode("windows-1252")
+            except UnicodeDecodeError:
+                pass
+        if not data:
+            try:
+                data = chr(number)
+            except (ValueError, OverflowError):
+                pass
+        self.current.append(data or "\N{REPLACEMENT CHARACTER}")
+
+    def handle_entityref(self, name):
+        self.current.append(ENTITIES.get(name, f"&{name}"))
+
+    def handle_comment(self, data):
+        self.flush()
+
+    def handle_decl(self, data):
+        self.flush()
+
+    def handle_pi(self, data):
+        self.flush()
+
+    def unknown_decl(self, data):
+        self.flush()
+        # CDATA sections are content, even inside hidden tags
+        if data.upper().startswith("CDATA["):
+            text = data[len("CDATA["):].strip()
+            if text:
+                self.parts.append(text)
+
+    def text(self, markup):
+        self.feed(markup)
+        self.close()
+        self.flush()
+        return "\n".join(self.parts)
+
 
 def clean_html_to_text(html_string: str) -> str:
-    soup = BeautifulSoup(html.unescape(html_string), "html.parser")
-    return soup.get_text(separator="\n", strip=True)
-
-@lru_cache(maxsize=20)
-def parse_json_file(path):
-    if not os.path.exists(path) or os.path.getsize(path) == 0:
-        print(f"⚠️ Warning: {path} is empty or missing.")
-        return []
+    """
+    Plain text of an HTML fragment, one text node per line. Output is identical to
+    BeautifulSoup(html.unescape(s), "html.parser").get_text("\\n", strip=True):
+    text without markup skips parsing entirely, the rest goes through a tree-less parser.
+    """
+    text = html.unescape(html_string)
+    if "<" not in text and "&" not in text:
+        return text.strip()
     try:
-        with open(path, encoding="utf-8") as f:
-            data = json.load(f)
-            if isinstance(data, dict) and "closed-tickets" in data:
-                return data["closed-tickets"]
-            return data
-    except Exception as e:
-        print(f"❌ JSON error in {path}: {str(e)}")
-        return []
+        return _TextExtractor().text(text)
+    except Exception:
+        from bs4 import BeautifulSoup
+        return BeautifulSoup(text, "html.parser").get_text(separator="\n", strip=True)
+
+
+_pool = None
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(MAX_CLEAN_WORKERS)
+        atexit.register(_pool.shutdown)
+    return _pool
+
+def clean_html_many(html_strings, parallel_min_chars=PARALLEL_MIN_CHARS):
+    """
+    clean_html_to_text over a list of strings, in order. Batches of at least
+    `parallel_min_chars` characters are spread over a shared process pool.
+    """
+    html_strings = list(html_strings)
+    if MAX_CLEAN_WORKERS < 2 or sum(map(len, html_strings)) < parallel_min_chars:
+        return [clean_html_to_text(s) for s in html_strings]
+    chunksize = max(1, len(html_strings) // (MAX_CLEAN_WORKERS * 4))
+    return list(_get_pool().map(clean_html_to_text, html_strings, chunksize=chunksize))
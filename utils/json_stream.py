@@ -0,0 +1,175 @@
+import io
+import os
+import json
+import gzip
+
+CHUNK_SIZE = 1 << 16
+
+# Corpus file variants, tried for every corpus name (e.g. "closed_tickets")
+CORPUS_EXTENSIONS = (".json", ".jsonl", ".jsonl.gz", ".jsonl.zst", ".json.gz", ".json.zst")
+
+_decoder = json.JSONDecoder()
+_DELIMITERS = frozenset(" \t\r\n,:]}")
+
+
+def find_corpus_file(folder, name):
+    """
+    Path of the `name` corpus in `folder` in any supported format. When several
+    variants exist, the most recently written one wins. Returns None if there is none.
+    """
+    candidates = [os.path.join(folder, name + ext) for ext in CORPUS_EXTENSIONS]
+    existing = [path for path in candidates if os.path.exists(path)]
+    if not existing:
+        return None
+    return max(existing, key=os.path.getmtime)
+
+
+def open_text(path):
+    """Open a plain, gzip or zstandard compressed file for text reading."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.endswith(".zst"):
+        import zstandard
+
+        raw = open(path, "rb")
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+class _JSONReader:
+    """Reads one JSON value at a time from a text stream, buffering only what it needs."""
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        if self.eof:
+            return False
+        # Read at least as much as is buffered, so a value larger than a chunk costs O(n)
+        chunk = self.f.read(max(self.chunk_size, len(self.buf) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character, without consuming it ("" at end of input)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' at offset {self.pos}, found '{self.peek()}'")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+                # A number cut at the buffer edge ("5." of "5.5e3") decodes early: accept it only when
+                # a delimiter follows. Containers and strings only decode once complete.
+                complete = self.buf[self.pos] in "[{\"" or (end < len(self.buf) and self.buf[end] in _DELIMITERS)
+                if complete or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            if not self._fill():
+                value, self.pos = _decoder.raw_decode(self.buf, self.pos)
+                return value
+
+
+def _iter_array(reader):
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        if reader.peek() == ",":
+            reader.pos += 1
+            continue
+        reader.expect("]")
+        return
+
+
+def _iter_object(reader):
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.pos += 1
+        return
+    while True:
+        name = reader.value()
+        reader.expect(":")
+        yield name, reader
+        if reader.peek() == ",":
+            reader.pos += 1
+            continue
+        reader.expect("}")
+        return
+
+
+def iter_json(f, key=None):
+    """
+    Stream a JSON document from the text stream `f` without loading it whole.
+    A top-level array yields its elements. A top-level object yields the elements
+    of its `key` array when `key` is given (other members are skipped), and
+    (name, value) pairs otherwise.
+    """
+    reader = _JSONReader(f)
+    first = reader.peek()
+    if first == "[":
+        yield from _iter_array(reader)
+    elif first == "{":
+        for name, member in _iter_object(reader):
+            if key is None:
+                yield name, member.value()
+            elif name == key and member.peek() == "[":
+                yield from _iter_array(member)
+            else:
+                member.value()
+    elif first:
+        raise ValueError(f"Unexpected '{first}' at the start of a JSON document")
+
+
+def iter_json_lines(f):
+    for line in f:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def iter_records(path, key=None):
+    """
+    Stream the records of a JSON, JSONL or gzip/zstandard-compressed corpus file;
+    see iter_json for how `key` selects records in a JSON object. Missing or empty
+    files yield nothing, and a malformed file stops at the first bad record.
+    """
+    if not path or not os.path.exists(path) or os.path.getsize(path) == 0:
+        print(f"⚠️ Warning: {path} is empty or missing.")
+        return
+    try:
+        with open_text(path) as f:
+            if ".jsonl" in os.path.basename(path):
+                yield from iter_json_lines(f)
+            else:
+                yield from iter_json(f, key)
+    except ImportError as e:
+        print(f"❌ Cannot read {path}: {e}")
+    except (ValueError, OSError) as e:
+        print(f"❌ JSON error in {path}: {str(e)}")
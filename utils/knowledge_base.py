@@ -0,0 +1,289 @@
+import os
+import threading
+
+from utils.query_cache import QueryCache
+
+DATA_FOLDER = "data"
+SEARCH_K = 4
+
+# Sub-indexes are searched in hierarchy order, keeping hits whose vector
+# similarity reaches the tier's threshold: (source, minimum similarity).
+# The thresholds are provisional and not calibrated against labelled tickets yet.
+SEARCH_TIERS = (
+    ("common_issue", 0.80),
+    ("kb_article", 0.76),
+    ("theme_note", 0.76),
+    ("theme_doc", 0.74),
+    ("theme_info", 0.74),
+    ("support_ticket", 0.74),
+)
+# A common issue at least this similar answers the ticket on its own: stop searching.
+# Provisional like SEARCH_TIERS; it also gates the strict template path (utils/strict_reply.py).
+CONFIDENT_COMMON_ISSUE = 0.88
+# Keyword-only hits (found by BM25 but not by the vector search) need this BM25 score
+MIN_KEYWORD_SCORE = 4.0
+
+
+def similarity_from_distance(distance):
+    """Cosine similarity from the squared L2 distance FAISS returns for unit-length vectors."""
+    return 1.0 - distance / 2.0
+
+
+class KnowledgeBase:
+    """
+    The support knowledge base: every corpus in `data/`, one FAISS sub-index per
+    document source and a BM25 keyword index over each. Nothing is read from disk
+    until the documents or the indexes are first used, so importing agents, tasks
+    or tools stays cheap.
+    """
+
+    def __init__(self, data_folder=DATA_FOLDER, embed_path=None, embedding=None, use_vectorstore=True,
+                 max_workers=None, query_cache=None, index_mode=None, index_dim=None):
+        self.data_folder = data_folder
+        self.embed_path = embed_path or os.path.join(data_folder, "faiss_store")
+        self.use_vectorstore = use_vectorstore
+        self.max_workers = max_workers
+        self.index_mode = index_mode
+        self.index_dim = index_dim
+        self._embedding = embedding
+        self._documents = None
+        self._indexes = None
+        self._bm25 = None
+        self._lock = threading.RLock()
+        self.query_cache = query_cache or QueryCache()
+
+    @property
+    def embedding(self):
+        if self._embedding is None:
+            from utils.embedding_cache import get_embeddings
+            self._embedding = get_embeddings()
+        return self._embedding
+
+    @property
+    def documents(self):
+        with self._lock:
+            if self._documents is None:
+                self._documents = self._load_documents()
+            return self._documents
+
+    @property
+    def indexes(self):
+        """{source: FAISS} sub-indexes, loaded or synced on first access."""
+        if not self.use_vectorstore:
+            return {}
+        with self._lock:
+            if self._indexes is None:
+                self._indexes = self._load_indexes()
+                self._bm25 = {source: self._build_bm25(store) for source, store in self._indexes.items()}
+                self.query_cache.invalidate()
+            return self._indexes
+
+    def refresh(self):
+        """Forget loaded documents and indexes; the next use re-syncs them and invalidates cached queries."""
+        with self._lock:
+            self._documents = None
+            self._indexes = None
+            self._bm25 = None
+            self.query_cache.invalidate()
+
+    @property
+    def bm25(self):
+        """{source: BM25Index} keyword indexes over the same documents as `indexes`."""
+        self.indexes
+        return self._bm25 or {}
+
+    def _load_documents(self):
+        print("📦 Loading knowledge base documents...")
+        documents = list(self.iter_documents())
+        print(f"✅ Loaded {len(documents)} documents (chunks) total.")
+        return documents
+
+    def iter_documents(self):
+        """
+        Stream every knowledge base document (chunk) from the corpus files or their snapshots,
+        without keeping them in memory; already loaded `documents` are reused.
+        """
+        from itertools import chain
+        from utils.document_loaders import KNOWLEDGE_BASE_LOADERS
+
+        if self._documents is not None:
+            return iter(self._documents)
+        # Each loader serves its chunks from a per-corpus snapshot while its file is unchanged
+        return chain.from_iterable(loader(chunked=True) for loader in KNOWLEDGE_BASE_LOADERS)
+
+    def _load_indexes(self):
+        from utils.document_loaders import KNOWLEDGE_BASE_LOADERS, loader_code_version
+        from utils.source_manifest import (
+            changed_sources,
+            load_source_manifest,
+            save_source_manifest,
+            scan_sources,
+        )
+        from utils.vector_index import (
+            INDEX_DIM,
+            INDEX_MODE,
+            load_partitioned_vectorstores,
+            sync_partitioned_vectorstores,
+        )
+        from utils.embedding_pipeline import MAX_WORKERS
+
+        mode = self.index_mode or INDEX_MODE
+        dim = INDEX_DIM if self.index_dim is None else self.index_dim
+
+        # Only the corpora the index is built from are compared, and unchanged files are not re-read
+        manifest = load_source_manifest(self.embed_path) or {}
+        stored = manifest.get("sources")
+        code = loader_code_version(chunked=True)
+        current = scan_sources(self.data_folder, [loader.corpus for loader in KNOWLEDGE_BASE_LOADERS], stored)
+
+        if stored is None:
+            reason = "No source manifest"
+        else:
+            changed = changed_sources(stored, current) + (["loader code"] if manifest.get("code") != code else [])
+            reason = f"Changed: {', '.join(changed)}" if changed else None
+        if reason is None:
+            indexes = load_partitioned_vectorstores(self.embed_path, self.embedding, mode, dim)
+            if indexes:
+                print("📦 Loading existing FAISS indexes (documents unchanged)...")
+                if current != stored:
+                    # Same content under a new mtime/size: record it so the next start skips re-hashing
+                    save_source_manifest(self.embed_path, current, code)
+                return indexes
+            reason = "Indexes missing or built with another layout"
+
+        print(f"🔁 {reason}. Syncing FAISS indexes...")
+        indexes = sync_partitioned_vectorstores(self.iter_documents(), self.embedding, self.embed_path,
+                                                max_concurrency=self.max_workers or MAX_WORKERS,
+                                                mode=mode, dim=dim)
+        if hasattr(self.embedding, "stats"):
+            stats = self.embedding.stats()
+            print(f"🧮 Embedding cache: {stats['hits']} hits, {stats['misses']} misses.")
+        save_source_manifest(self.embed_path, current, code)
+        return indexes
+
+    def _build_bm25(self, vectorstore):
+        from utils.bm25 import BM25Index
+
+        # Index exactly what FAISS holds, so both retrievers rank the same documents
+        docstore = vectorstore.docstore
+        if hasattr(docstore, "iter_texts"):
+            # Keep only IDs in memory; hit documents are read back from the docstore
+            indexed = set(vectorstore.index_to_docstore_id.values())
+            texts = ((doc_id, f"{content}\n{title or ''}") for doc_id, content, title in docstore.iter_texts()
+                     if doc_id in indexed)
+            return BM25Index(texts, resolve=docstore.search)
+        docs = [docstore.search(doc_id) for doc_id in vectorstore.index_to_docstore_id.values()]
+        return BM25Index(docs)
+
+    def search_tier(self, source, query, query_vector, k=SEARCH_K, min_similarity=0.0):
+        """
+        Hybrid search inside one source's sub-index: fuse the dense and BM25 rankings
+        and keep hits that clear `min_similarity` (or MIN_KEYWORD_SCORE for keyword-only hits).
+        Returns ([(document, fused score)], best vector similarity).
+        """
+        from tools.kb_tools import fuse_results, FUSION_WEIGHTS
+        from utils.vector_index import document_id
+
+        store = self.indexes.get(source)
+        if store is None or store.index.ntotal == 0:
+            return [], 0.0
+        fetch_k = min(k * 3, store.index.ntotal)
+        vector_hits = store.similarity_search_with_score_by_vector(query_vector, k=fetch_k)
+        keyword_hits = self.bm25[source].search(query, k=fetch_k)
+
+        similarity = {document_id(doc): similarity_from_distance(d) for doc, d in vector_hits}
+        keyword = {document_id(doc): score for doc, score in keyword_hits}
+        fused = fuse_results({"vector": vector_hits, "bm25": keyword_hits}, FUSION_WEIGHTS)
+
+        kept = []
+        for doc, score in fused:
+            doc_id = document_id(doc)
+            if doc_id in similarity:
+                if similarity[doc_id] >= min_similarity:
+                    kept.append((doc, score))
+            elif source != "common_issue" and keyword.get(doc_id, 0.0) >= MIN_KEYWORD_SCORE:
+                # Strict responses are never triggered by keywords alone
+                kept.append((doc, score))
+        return kept[:k], max(similarity.values(), default=0.0)
+
+    def similarity_to(self, doc, query_vector):
+        """
+        Vector similarity between a query and an indexed document, read back from
+        its sub-index. None when the document is not indexed or its sub-index
+        only holds approximate vectors.
+        """
+        import numpy as np
+        from utils.vector_index import document_id, is_exact_index
+
+        store = self.indexes.get(doc.metadata.get("source"))
+        if store is None or not is_exact_index(store.index):
+            return None
+        doc_id = document_id(doc)
+        position = next((i for i, stored_id in store.index_to_docstore_id.items() if stored_id == doc_id), None)
+        if position is None:
+            return None
+        vector = store.index.reconstruct(int(position))
+        distance = float(((vector - np.asarray(query_vector, dtype="float32")) ** 2).sum())
+        return similarity_from_distance(distance)
+
+    def search(self, query, k=SEARCH_K, query_vector=None):
+        """
+        Tiered search over the per-source sub-indexes in hierarchy order. Stops at a
+        confident common issue match or once `k` hits are collected, so the frequent
+        strict-response path only searches the small common_issue index.
+        Results are memoized per normalized query in `query_cache`; pass `query_vector`
+        when the query is already embedded to skip the embedding call.
+        Returns up to `k` (document, score) pairs, or [] when retrieval is disabled.
+        """
+        indexes = self.indexes
+        if not indexes:
+            return []
+        cache_key = self.query_cache.key(query, k)
+        cached = self.query_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+        if query_vector is None:
+            query_vector = self.embedding.embed_query(query)
+
+        tiers = list(SEARCH_TIERS) + [(source, 0.0) for source in indexes if source not in dict(SEARCH_TIERS)]
+        results = []
+        for source, min_similarity in tiers:
+            hits, best = self.search_tier(source, query, query_vector, k, min_similarity)
+            results.extend(hits)
+            if source == "common_issue" and hits and best >= CONFIDENT_COMMON_ISSUE:
+                break
+            if len(results) >= k:
+                break
+
+        if not results:
+            # Nothing cleared its tier threshold: fall back to the closest non-strict hits
+            candidates = []
+            for source in indexes:
+                if source == "common_issue":
+                    continue
+                hits, _ = self.search_tier(source, query, query_vector, k)
+                candidates.extend(hits)
+            results = candidates
+        results = results[:k]
+        self.query_cache.put(cache_key, results)
+        return list(results)
+
+
+_default_kb = None
+_default_lock = threading.Lock()
+
+
+def get_knowledge_base():
+    """Return the process-wide shared KnowledgeBase, creating it on first call."""
+    global _default_kb
+    with _default_lock:
+        if _default_kb is None:
+            _default_kb = KnowledgeBase()
+        return _default_kb
+
+
+def set_knowledge_base(kb):
+    """Replace the shared KnowledgeBase, e.g. with a pre-warmed or test instance."""
+    global _default_kb
+    with _default_lock:
+        _default_kb = kb
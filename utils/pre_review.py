@@ -0,0 +1,166 @@
+import os
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+from utils.json_stream import find_corpus_file
+from utils.reply_format import GREETING_RE, SIGN_OFFS
+from utils.strict_reply import APPROVED, strict_response
+
+# Replies whose word trigrams overlap the retrieved sources less than this are escalated
+MIN_GROUNDING = float(os.getenv("PRE_REVIEW_MIN_GROUNDING", "0.3"))
+NGRAM = 3
+
+URL_RE = re.compile(r"https?://[^\s<>\"'()\[\]]+")
+TAG_RE = re.compile(r"<[^>]+>")
+WORD_RE = re.compile(r"\w+")
+
+DATA_FOLDER = "data"
+# Corpora whose links a reply may use, read in whatever format they are stored in
+URL_CORPORA = ("kb_articles", "theme_info", "theme_docs", "common_issues")
+GUIDELINES_PATH = os.path.join(DATA_FOLDER, "support_task_guidelines.md")
+
+
+@dataclass
+class PreReview:
+    """Outcome of the deterministic checks of one reply."""
+    issues: list = field(default_factory=list)
+    grounding: float = 0.0
+
+    @property
+    def passed(self):
+        return not self.issues
+
+    @property
+    def review(self):
+        """The review text: the approval, or the failed checks as bullet points."""
+        return APPROVED if self.passed else "\n".join(f"- {issue}" for issue in self.issues)
+
+
+def normalize_url(url):
+    """Compare URLs by host and path only: no scheme, "www.", query or trailing slash."""
+    parts = urlsplit(url.rstrip(".,;:!?"))
+    host = parts.netloc.lower().removeprefix("www.")
+    return f"{host}{parts.path.rstrip('/')}"
+
+
+def extract_urls(text):
+    return [url.rstrip(".,;:!?") for url in URL_RE.findall(text or "")]
+
+
+def _source_files():
+    """((path, mtime_ns, size), ...) of the files the allowlist is built from."""
+    paths = [find_corpus_file(DATA_FOLDER, name) for name in URL_CORPORA] + [GUIDELINES_PATH]
+    files = []
+    for path in paths:
+        if path and os.path.exists(path):
+            stat = os.stat(path)
+            files.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(files)
+
+
+def allowed_urls():
+    """
+    Normalized URLs a reply may link to: KB articles and the links inside them,
+    theme pages, demos and shortlinks, theme docs, common-issue responses and
+    the support guidelines. Rebuilt whenever one of their files changes.
+    """
+    return _allowed_urls(_source_files())
+
+
+@lru_cache(maxsize=1)
+def _allowed_urls(files):
+    from utils.document_loaders import corpus_records
+
+    def records(name):
+        return corpus_records(name) if find_corpus_file(DATA_FOLDER, name) else []
+
+    texts = []
+    for article in records("kb_articles"):
+        texts += [article.get("url", ""), article.get("content", "")]
+    # theme_info.json maps slug -> meta; JSONL variants carry the slug in each record
+    for record in records("theme_info"):
+        theme = record[1] if isinstance(record, tuple) else record
+        texts += [theme.get("url", ""), theme.get("demourl", ""), theme.get("shortlink", "")]
+    texts += [doc.get("url", "") for doc in records("theme_docs")]
+    texts += [issue.get("expected_response", "") for issue in records("common_issues")]
+    if any(path == GUIDELINES_PATH for path, _, _ in files):
+        with open(GUIDELINES_PATH, encoding="utf-8") as f:
+            texts.append(f.read())
+    return frozenset(normalize_url(url) for text in texts for url in extract_urls(text or ""))
+
+
+def _ngrams(text, n=NGRAM):
+    words = WORD_RE.findall(TAG_RE.sub(" ", text or "").lower())
+    return {tuple(words[i:i + n]) for i in range(len(words) - n + 1)}
+
+
+def _lines(reply):
+    return [line.strip() for line in str(reply).strip().splitlines() if line.strip()]
+
+
+def _sign_off_index(lines):
+    """Index of the sign-off line, which may be followed by a signature line, or None."""
+    for i in range(len(lines) - 1, max(len(lines) - 3, -1), -1):
+        if lines[i].lower().rstrip(".!,").startswith(tuple(s.lower() for s in SIGN_OFFS)):
+            return i
+    return None
+
+
+def _body(reply):
+    """The reply without its greeting and sign-off lines."""
+    lines = _lines(reply)
+    end = _sign_off_index(lines)
+    lines = lines[:end] if end is not None else lines
+    if lines and GREETING_RE.match(lines[0]):
+        lines = lines[1:]
+    return "\n".join(lines)
+
+
+def grounding_score(reply, sources, n=NGRAM):
+    """Share of the reply body's word n-grams that also occur in the retrieved sources (0..1)."""
+    reply_grams = _ngrams(_body(reply), n)
+    if not reply_grams:
+        return 0.0
+    source_grams = set().union(*(_ngrams(source, n) for source in sources)) if sources else set()
+    return len(reply_grams & source_grams) / len(reply_grams)
+
+
+def kb_sources(kb_result, hits=()):
+    """The texts retrieved for a ticket: the KB result, its extra snippets and the raw search hits."""
+    kb_result = kb_result or {}
+    sources = [kb_result.get("content", ""), kb_result.get("url", "")]
+    sources += [result.get("snippet", "") for result in kb_result.get("all_results", [])]
+    sources += [doc.page_content for doc, _ in hits]
+    return [source for source in sources if source]
+
+
+def pre_review(reply, kb_result=None, sources=None, min_grounding=MIN_GROUNDING):
+    """
+    Review a support reply locally, in milliseconds: greeting and sign-off
+    format, verbatim reuse of a strict common-issue response, links against the
+    allowlist plus the retrieved sources, and the n-gram grounding score against
+    those sources. A reply with any issue should be escalated to the LLM reviewer.
+    """
+    reply = str(reply or "")
+    sources = kb_sources(kb_result) if sources is None else sources
+    issues = []
+    if not GREETING_RE.match(reply):
+        issues.append("The reply must start with \"Hi there,\" or \"Hi [name],\".")
+    if _sign_off_index(_lines(reply)) is None:
+        issues.append(f"The reply must end with one of: {', '.join(SIGN_OFFS)}.")
+
+    expected_response = strict_response(kb_result)
+    if expected_response is not None and expected_response not in reply:
+        issues.append("The reply must reuse the common issue's expected_response verbatim.")
+
+    allowed = allowed_urls() | {normalize_url(url) for source in sources for url in extract_urls(source)}
+    unknown = [url for url in extract_urls(reply) if normalize_url(url) not in allowed]
+    if unknown:
+        issues.append(f"Links not found in the knowledge base: {', '.join(unknown)}")
+
+    grounding = grounding_score(reply, sources)
+    if expected_response is None and grounding < min_grounding:
+        issues.append(f"Low grounding in the retrieved sources ({grounding:.2f} < {min_grounding:.2f}).")
+    return PreReview(issues, grounding)
@@ -0,0 +1,74 @@
+import time
+import threading
+import unicodedata
+from collections import OrderedDict
+
+MAX_ENTRIES = 512
+TTL_SECONDS = 15 * 60
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query, used as the cache key."""
+    return " ".join(unicodedata.normalize("NFC", query).casefold().split())
+
+
+class QueryCache:
+    """
+    In-memory LRU cache with a time-to-live for retrieval results. Keys include the
+    index generation, so results computed against an older index are never served.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.generation = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, query, *params):
+        return (self.generation, normalize_query(query), *params)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if time.monotonic() - stored_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """Drop every entry and start a new generation (call when the index changes)."""
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._entries),
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "generation": self.generation,
+            }
@@ -0,0 +1,18 @@
+import re
+
+# The reply format the support agent is instructed to use, shared by the strict
+# template and the pre-review so every path greets and signs off the same way.
+GREETING = "Hi {name},"
+DEFAULT_NAME = "there"
+CLOSING = "I hope this helps!"
+SIGN_OFF = "Best regards,\nSupport Team"
+REPLY_TEMPLATE = f"{GREETING}\n\n{{body}}\n\n{CLOSING}\n\n{SIGN_OFF}"
+
+# Sign-off lines a reply may end with: the template's and those the support guidelines allow
+SIGN_OFFS = (SIGN_OFF.splitlines()[0].rstrip(","), "I hope it helps", "Kind Regards")
+GREETING_RE = re.compile(r"\s*Hi [^\n,]{1,40},")
+
+
+def render_reply(body, name=None):
+    """Wrap a reply body in the standard greeting, closing and sign-off."""
+    return REPLY_TEMPLATE.format(name=name or DEFAULT_NAME, body=body)
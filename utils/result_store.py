@@ -0,0 +1,94 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import Counter
+
+RESULTS_PATH = os.path.join("data", "results", "ticket_results.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    ticket_id TEXT NOT NULL,
+    thread_hash TEXT NOT NULL,
+    status TEXT NOT NULL,
+    category TEXT,
+    reply TEXT,
+    review TEXT,
+    details TEXT,
+    error TEXT,
+    duration REAL,
+    finished_at REAL NOT NULL,
+    PRIMARY KEY (ticket_id, thread_hash)
+);
+CREATE INDEX IF NOT EXISTS results_finished_at ON results (finished_at);
+"""
+
+DONE = "done"
+FAILED = "failed"
+
+
+class ResultStore:
+    """
+    SQLite store of generated replies and reviews, keyed by ticket_id and the hash
+    of the thread's last comment. A ticket whose thread has not changed since its
+    last successful run already has a result and is skipped on re-runs.
+    """
+
+    def __init__(self, path=RESULTS_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+    def is_done(self, ticket_id, thread_hash):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM results WHERE ticket_id = ? AND thread_hash = ? AND status = ?",
+                (str(ticket_id), thread_hash, DONE),
+            ).fetchone()
+        return row is not None
+
+    def save(self, ticket_id, thread_hash, status, category=None, reply=None, review=None, details=None,
+             error=None, duration=None):
+        """Record the outcome of one run; a later run on the same thread replaces it."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (ticket_id, thread_hash, status, category, reply, review, details, "
+                "error, duration, finished_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (str(ticket_id), thread_hash, status, category, reply, review,
+                 json.dumps(details, ensure_ascii=False, default=str) if details is not None else None,
+                 error, duration, time.time()),
+            )
+            self._conn.commit()
+
+    def latest(self, ticket_id):
+        """The newest result for a ticket as a dict, or None."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT * FROM results WHERE ticket_id = ? ORDER BY finished_at DESC LIMIT 1", (str(ticket_id),)
+            )
+            row = cursor.fetchone()
+            columns = [c[0] for c in cursor.description]
+        if row is None:
+            return None
+        result = dict(zip(columns, row))
+        result["details"] = json.loads(result["details"]) if result["details"] else None
+        return result
+
+    def path_counts(self):
+        """How many stored successful replies took each answer path ("strict" or "llm")."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT json_extract(details, '$.path'), COUNT(*) FROM results "
+                "WHERE status = ? AND json_extract(details, '$.path') IS NOT NULL GROUP BY 1", (DONE,)
+            ).fetchall()
+        return Counter(dict(rows))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,89 @@
+import os
+import pickle
+import hashlib
+from itertools import islice
+
+from langchain_core.documents import Document
+
+# Bump when the snapshot file layout changes
+SNAPSHOT_FORMAT = 1
+# Documents per pickle frame: a snapshot is written and read in frames, so
+# neither side holds a whole corpus in memory
+SNAPSHOT_BATCH = 500
+
+
+def code_version(*paths):
+    """Digest of the given source files; snapshots built by other code are never reused."""
+    digest = hashlib.blake2b()
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _read_frames(f):
+    while True:
+        try:
+            frame = pickle.load(f)
+        except EOFError:
+            return
+        for page_content, metadata in frame:
+            yield Document(page_content=page_content, metadata=metadata)
+
+
+def read_snapshot(path, key):
+    """Stream the Documents of the snapshot at `path`, or return None when it is missing or stale."""
+    try:
+        f = open(path, "rb")
+        header = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError, pickle.UnpicklingError) as e:
+        print(f"⚠️ Ignoring unreadable snapshot {path}: {e}")
+        f.close()
+        return None
+    if header != {"format": SNAPSHOT_FORMAT, **key}:
+        f.close()
+        return None
+
+    def documents():
+        with f:
+            yield from _read_frames(f)
+
+    return documents()
+
+
+def write_snapshot(path, key, documents):
+    """
+    Pass `documents` through while writing them to a snapshot at `path`. The
+    snapshot only replaces the previous one once the stream is fully consumed.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    complete = False
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"format": SNAPSHOT_FORMAT, **key}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            documents = iter(documents)
+            while batch := list(islice(documents, SNAPSHOT_BATCH)):
+                pickle.dump([(doc.page_content, doc.metadata) for doc in batch], f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+                yield from batch
+        os.replace(tmp_path, path)
+        complete = True
+    finally:
+        if not complete and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def cached_documents(path, key, build):
+    """
+    Stream the Documents `build()` yields, from the snapshot at `path` when it was
+    written under the same `key` (source file digest, code version, ...) and by
+    running `build()` and refreshing the snapshot otherwise.
+    """
+    snapshot = read_snapshot(path, key)
+    if snapshot is not None:
+        yield from snapshot
+        return
+    yield from write_snapshot(path, key, build())
@@ -0,0 +1,73 @@
+import os
+import json
+
+from utils.helpers import compute_file_hash
+from utils.json_stream import CORPUS_EXTENSIONS
+
+SOURCE_MANIFEST_FILENAME = "source_manifest.json"
+SOURCE_MANIFEST_VERSION = 1
+# Manifest written before source manifests existed: it hashed everything under data/
+LEGACY_HASH_FILENAME = "doc_hash.json"
+
+
+def scan_sources(data_folder, corpora, stored=None):
+    """
+    {relative POSIX path: {"mtime_ns", "size", "digest"}} for every file of the
+    given corpora in `data_folder` (all supported formats). A file whose mtime and
+    size match its `stored` entry keeps the stored digest without being read.
+    """
+    stored = stored or {}
+    sources = {}
+    for corpus in corpora:
+        for ext in CORPUS_EXTENSIONS:
+            path = os.path.join(data_folder, corpus + ext)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            name = os.path.relpath(path, data_folder).replace(os.sep, "/")
+            entry = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+            previous = stored.get(name) or {}
+            if all(previous.get(field) == value for field, value in entry.items()) and previous.get("digest"):
+                entry["digest"] = previous["digest"]
+            else:
+                entry["digest"] = compute_file_hash(path)
+            sources[name] = entry
+    return sources
+
+
+def changed_sources(stored, current):
+    """Sorted names of the sources added, removed or modified between two scans."""
+    names = set(stored) | set(current)
+    return sorted(
+        name for name in names
+        if (stored.get(name) or {}).get("digest") != (current.get(name) or {}).get("digest")
+    )
+
+
+def load_source_manifest(embed_path):
+    """The stored manifest ({"version", "code", "sources"}), or None when missing or unreadable."""
+    path = os.path.join(embed_path, SOURCE_MANIFEST_FILENAME)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️ Could not read source manifest {path}: {e}")
+        return None
+    if manifest.get("version") != SOURCE_MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def save_source_manifest(embed_path, sources, code):
+    os.makedirs(embed_path, exist_ok=True)
+    path = os.path.join(embed_path, SOURCE_MANIFEST_FILENAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": SOURCE_MANIFEST_VERSION, "code": code, "sources": sources}, f)
+    os.replace(tmp_path, path)
+    legacy = os.path.join(embed_path, LEGACY_HASH_FILENAME)
+    if os.path.exists(legacy):
+        os.remove(legacy)
@@ -0,0 +1,113 @@
+import os
+import re
+
+from utils.knowledge_base import CONFIDENT_COMMON_ISSUE
+from utils.reply_format import render_reply
+
+STRICT_PREFIX = "STRICT_RESPONSE:"
+THEME_AUTHOR = "Constantin"
+APPROVED = "Approved ✅"
+# Only a match at least this similar to the ticket is answered without the LLM.
+# Provisional (see CONFIDENT_COMMON_ISSUE): override it once a cutoff is validated.
+STRICT_MIN_SIMILARITY = float(os.getenv("STRICT_MIN_SIMILARITY", CONFIDENT_COMMON_ISSUE))
+
+# Strict-path results are tagged with this in the stored details, LLM replies with "llm"
+STRICT_PATH = "strict"
+LLM_PATH = "llm"
+
+
+def strict_response(kb_result):
+    """The common issue's expected_response when the KB result is a STRICT_RESPONSE match, else None."""
+    if not kb_result or not kb_result.get("is_strict"):
+        return None
+    content = kb_result.get("content", "")
+    if not content.startswith(STRICT_PREFIX):
+        return None
+    return content[len(STRICT_PREFIX):].strip() or None
+
+
+def greeting_name(commenter_name):
+    """
+    The customer's first name when it is clearly a name ("Maria Papandreou" ->
+    "Maria", "Willow"), or None for handles like "kenrom" or "MrImpossible".
+    """
+    first = (commenter_name or "").strip().split(" ")[0]
+    if re.fullmatch(r"[A-Z][a-z]{1,19}", first) and first != THEME_AUTHOR:
+        return first
+    return None
+
+
+def render_strict_reply(expected_response, name=None):
+    """The final reply for a strict common issue: the expected_response verbatim in the standard reply format."""
+    return render_reply(expected_response, name)
+
+
+def stored_common_issues():
+    """{title: expected_response} of the current common issues corpus."""
+    from utils.document_loaders import corpus_records
+
+    return {issue["title"]: issue["expected_response"] for issue in corpus_records("common_issues")}
+
+
+def _comparable(text):
+    return " ".join(text.lower().split())
+
+
+def template_already_sent(comments, kb_result):
+    """True when an employee reply in the thread already holds the common issue's response or title."""
+    from utils.helpers import clean_html_to_text
+
+    expected_response = strict_response(kb_result)
+    markers = [_comparable(marker) for marker in (expected_response, kb_result.get("title")) if marker]
+    for comment in comments or []:
+        if comment.get("user_type") != "employee":
+            continue
+        text = _comparable(clean_html_to_text(comment.get("comment", "")))
+        if any(marker in text for marker in markers):
+            return True
+    return False
+
+
+def review_strict_match(kb_result, comments=None, min_similarity=STRICT_MIN_SIMILARITY):
+    """
+    Check a strict KB result before its template is sent without any LLM: the
+    matched title must be a current common issue, the served response must be
+    its stored expected_response (not a stale index entry), the ticket must be
+    at least `min_similarity` similar to it, and the thread `comments` of a
+    follow-up must not have received it already. Returns the list of issues.
+    """
+    title = kb_result.get("title")
+    stored = stored_common_issues()
+    issues = []
+    if title not in stored:
+        issues.append(f"'{title}' is not a current common issue.")
+    elif stored[title].strip() != strict_response(kb_result):
+        issues.append(f"The indexed response of '{title}' differs from common_issues.json.")
+    similarity = kb_result.get("similarity")
+    if similarity is None:
+        issues.append("The match similarity is unknown.")
+    elif similarity < min_similarity:
+        issues.append(f"The match similarity {similarity:.2f} is below {min_similarity:.2f}.")
+    if template_already_sent(comments, kb_result):
+        issues.append(f"The thread already received the '{title}' response.")
+    return issues
+
+
+def answer_strict(kb_result, name=None, comments=None):
+    """
+    Reply to and review a ticket whose KB result is a confident, current strict
+    common issue without any agent: returns {"reply", "review"}, or None when
+    the ticket needs the LLM crew (which still gets the strict response). Pass
+    the thread's `comments` for a follow-up, so a customer who already got the
+    template is answered by the LLM with the thread history instead.
+    """
+    expected_response = strict_response(kb_result)
+    if expected_response is None:
+        return None
+    issues = review_strict_match(kb_result, comments)
+    if issues:
+        print(f"⚠️ Strict template not used: {' '.join(issues)}")
+        return None
+    review = (f"{APPROVED} Matched common issue '{kb_result['title']}' "
+              f"(similarity {kb_result['similarity']:.2f}); its expected_response is sent verbatim.")
+    return {"reply": render_strict_reply(expected_response, name), "review": review}
@@ -0,0 +1,67 @@
+from dataclasses import dataclass, field
+
+from utils.knowledge_base import get_knowledge_base
+
+
+@dataclass
+class TicketAnalysis:
+    """
+    Everything derived from one ticket text, computed once and shared by the
+    reply task, the review task and the agent's SearchKnowledgeBase tool.
+    """
+    text: str
+    parts: list[str]
+    text_vector: list[float]
+    part_vectors: list[list[float]]
+    category: str
+    classifications: list[str]
+    rules: list = field(default_factory=list)
+    hits: list = field(default_factory=list)
+    kb_result: dict = field(default_factory=dict)
+
+    @property
+    def classified_parts(self):
+        return list(zip(self.parts, self.classifications))
+
+    @property
+    def issue_summary(self):
+        return "\n".join([f"- {cat}: \"{part}\"" for part, cat in self.classified_parts])
+
+
+def analyze_ticket(ticket_text: str, kb=None) -> TicketAnalysis:
+    """
+    Split, embed, classify and search a ticket with a single batched embedding
+    call for the full text and all of its parts.
+    """
+    from tools.kb_tools import format_kb_result
+    from utils.ticket_classifier import classify_tickets_detailed, split_ticket_into_parts
+
+    kb = kb or get_knowledge_base()
+    parts = split_ticket_into_parts(ticket_text)
+    vectors = kb.embedding.embed_documents([ticket_text, *parts])
+    text_vector, part_vectors = vectors[0], vectors[1:]
+
+    hits = kb.search(ticket_text, query_vector=text_vector) if kb.use_vectorstore else []
+    results = classify_tickets_detailed([ticket_text, *parts], vectors, kb=kb)
+    labels = [result.label for result in results]
+    analysis = TicketAnalysis(
+        text=ticket_text,
+        parts=parts,
+        text_vector=text_vector,
+        part_vectors=part_vectors,
+        category=labels[0],
+        classifications=labels[1:],
+        rules=[result.rule for result in results],
+        hits=hits,
+        kb_result=format_kb_result(hits) if kb.use_vectorstore else {
+            "source": "error",
+            "title": "Retrieval Error",
+            "content": "Retrieval is disabled. Vectorstore not loaded."
+        },
+    )
+    if analysis.kb_result.get("is_strict"):
+        # Record how close the matched common issue is, for the strict template's review
+        doc = next((doc for doc, _ in hits if doc.metadata.get("issue_type") == "common_issue"
+                    and doc.metadata.get("title") == analysis.kb_result["title"]), None)
+        analysis.kb_result["similarity"] = kb.similarity_to(doc, text_vector) if doc else None
+    return analysis
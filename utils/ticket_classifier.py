@@ -1,9 +1,13 @@
 
+import os
 import re
+import json
+import threading
+from functools import lru_cache
+from typing import NamedTuple, Optional
+import numpy as np
 from dotenv import load_dotenv
-from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores import FAISS
-from utils.document_loaders import load_common_issues
+from utils.knowledge_base import get_knowledge_base
 
 # Load environment variables (API keys, etc.)
 load_dotenv()
@@ -18,52 +22,158 @@ LABELS = [
     "unclear"
 ]
 
-# Load vector store from common issues
-embedding = OpenAIEmbeddings()
-common_issues = load_common_issues()
-vectorstore = FAISS.from_documents(common_issues, embedding)
+# Cosine similarity a ticket part needs with a common issue to be labelled as one.
+# Provisional, not calibrated yet: check it with `python benchmarks/bench_classifier.py --calibrate`.
+COMMON_ISSUE_THRESHOLD = 0.80
+
+# Keyword rules at or above this confidence answer without any embedding call
+HIGH_CONFIDENCE = 0.9
+# Confidence of a rule built from a common issue's customer_message
+CUSTOMER_MESSAGE_CONFIDENCE = 0.95
+
+RULES_PATH = os.path.join("data", "classifier_rules.json")
+COMMON_ISSUES_PATH = os.path.join("data", "common_issues.json")
+
+class Classification(NamedTuple):
+    label: str
+    score: float
+    rule: Optional[str] = None
+
+def normalize_for_matching(text: str) -> str:
+    text = text.lower().replace("\u2019", "'").replace("\u2018", "'")
+    return " ".join(text.split())
+
+class KeywordMatcher:
+    """
+    Every rule phrase compiled into one regex, so a single scan finds all phrases
+    present in a ticket. Rules are then checked in priority order: a rule fires
+    when any of its `any` phrases and all of its `all` phrases were found.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        phrases = sorted({normalize_for_matching(p) for rule in rules for p in rule.get("any", []) + rule.get("all", [])},
+                         key=len, reverse=True)
+        alternation = "|".join(re.escape(p).replace("\\ ", r"\s+") for p in phrases)
+        self.pattern = re.compile(rf"(?<!\w)(?=({alternation})(?!\w))") if phrases else None
+
+    def found_phrases(self, text):
+        if self.pattern is None:
+            return set()
+        return {" ".join(m.group(1).split()) for m in self.pattern.finditer(normalize_for_matching(text))}
+
+    def match(self, text, min_confidence=0.0):
+        """Return the first Classification whose rule fires, or None."""
+        found = self.found_phrases(text)
+        if not found:
+            return None
+        for rule in self.rules:
+            if rule["confidence"] < min_confidence:
+                continue
+            any_phrases = [normalize_for_matching(p) for p in rule.get("any", [])]
+            all_phrases = [normalize_for_matching(p) for p in rule.get("all", [])]
+            if any_phrases and not any(p in found for p in any_phrases):
+                continue
+            if all_phrases and not all(p in found for p in all_phrases):
+                continue
+            return Classification(rule["label"], rule["confidence"], rule["name"])
+        return None
+
+def load_classifier_rules(rules_path=RULES_PATH, common_issues_path=COMMON_ISSUES_PATH):
+    """Rules from the rules file, preceded by one exact-phrase rule per common issue customer_message."""
+    rules = []
+    if os.path.exists(common_issues_path):
+        with open(common_issues_path, encoding="utf-8") as f:
+            for issue in json.load(f):
+                message = issue.get("customer_message", "").strip().rstrip("?!. ")
+                if len(message) >= 8:
+                    rules.append({
+                        "name": f"common_issue:{issue['title']}",
+                        "label": "common_issue",
+                        "confidence": CUSTOMER_MESSAGE_CONFIDENCE,
+                        "any": [message],
+                    })
+    if os.path.exists(rules_path):
+        with open(rules_path, encoding="utf-8") as f:
+            rules.extend(json.load(f))
+    return sorted(rules, key=lambda rule: -rule["confidence"])
+
+@lru_cache(maxsize=1)
+def get_keyword_matcher():
+    return KeywordMatcher(load_classifier_rules())
+
+_matrix_cache = {}
+_matrix_lock = threading.Lock()
+
+def common_issue_matrix(kb=None):
+    """
+    Row-normalized float32 matrix of the common-issue vectors stored in the main
+    index, with the matching documents. Reused until the index changes.
+    """
+    kb = kb or get_knowledge_base()
+    store = kb.indexes.get("common_issue")
+    key = (id(kb), kb.query_cache.generation)
+    with _matrix_lock:
+        if key not in _matrix_cache:
+            if store is None or store.index.ntotal == 0:
+                matrix, docs = np.zeros((0, 0), dtype=np.float32), []
+            else:
+                matrix = store.index.reconstruct_n(0, store.index.ntotal).astype(np.float32)
+                matrix /= np.linalg.norm(matrix, axis=1, keepdims=True).clip(min=1e-12)
+                docs = [store.docstore.search(store.index_to_docstore_id[i]) for i in range(store.index.ntotal)]
+            _matrix_cache.clear()
+            _matrix_cache[key] = (matrix, docs)
+        return _matrix_cache[key]
 
 def split_ticket_into_parts(text: str) -> list[str]:
     # Split by sentence or paragraph
     parts = re.split(r"(?<=[.?!])\\s+|\\n+", text.strip())
     return [p.strip() for p in parts if len(p.strip()) > 8]
 
-def classify_ticket(ticket_text: str) -> str:
-    results = vectorstore.similarity_search_with_score(ticket_text, k=1)
-
-    if results:
-        top_doc, score = results[0]
-        top_issue_type = top_doc.metadata.get("issue_type")
-
+def classify_tickets_detailed(texts, vectors=None, kb=None) -> list[Classification]:
+    """
+    Classify many ticket parts at once. High-confidence keyword rules answer first
+    with no network call; the remaining parts are embedded in one batch (skipped
+    when `vectors` are given) and scored with one matrix multiply against the
+    common-issue vectors, then fall back to the lower-confidence keyword rules.
+    """
+    texts = list(texts)
+    matcher = get_keyword_matcher()
+    results = [matcher.match(text, min_confidence=HIGH_CONFIDENCE) for text in texts]
+    pending = [i for i, result in enumerate(results) if result is None]
+    if not pending:
+        return results
+
+    kb = kb or get_knowledge_base()
+    matrix, docs = common_issue_matrix(kb)
+    best = np.zeros(len(pending), dtype=np.float32)
+    best_index = np.zeros(len(pending), dtype=np.int64)
+    if matrix.size:
+        if vectors is None:
+            pending_vectors = kb.embedding.embed_documents([texts[i] for i in pending])
+        else:
+            pending_vectors = [vectors[i] for i in pending]
+        queries = np.asarray(pending_vectors, dtype=np.float32)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True).clip(min=1e-12)
+        similarities = queries @ matrix.T
+        best_index = similarities.argmax(axis=1)
+        best = similarities[np.arange(len(pending)), best_index]
+
+    for i, score, j in zip(pending, best, best_index):
         print(f"    ⚙️ Score: {score:.2f}")
-        if top_issue_type == "common_issue" and score > 0.6:
-            return "common_issue"
-
-    # Fallback heuristics
-    ticket_lower = ticket_text.lower()
-
-    if "don't know" in ticket_lower or "no idea how" in ticket_lower:
-        return "info_gap"
-
-    if "missing" in ticket_lower and "template" in ticket_lower:
-        return "info_gap"
-
-    if "theme broken" in ticket_lower or "not loading" in ticket_lower:
-        return "bug"
-
-    if "how to customize" in ticket_lower or "can you add" in ticket_lower:
-        return "customization"
-    
-    if "elementor" in ticket_lower and "not loading" in ticket_lower:
-        return "common_issue"
-
-    if "demo import" in ticket_lower or "can't import demo" in ticket_lower:
-        return "common_issue"
-
-    if "update slider" in ticket_lower or "slider revolution" in ticket_lower:
-        return "common_issue"
-
-    return "unclear"
+        if score >= COMMON_ISSUE_THRESHOLD:
+            results[i] = Classification("common_issue", float(score), f"embedding:{docs[j].metadata.get('title')}")
+        else:
+            results[i] = matcher.match(texts[i]) or Classification("unclear", 0.0)
+    return results
+
+def classify_tickets(texts, vectors=None, kb=None) -> list[str]:
+    """Labels for many ticket parts; see classify_tickets_detailed."""
+    return [result.label for result in classify_tickets_detailed(texts, vectors, kb)]
+
+def classify_ticket(ticket_text: str, vector=None) -> str:
+    """Label a ticket (part). Pass its precomputed embedding as `vector` to skip the API call."""
+    return classify_tickets([ticket_text], None if vector is None else [vector])[0]
 
 if __name__ == "__main__":
     test_tickets = [
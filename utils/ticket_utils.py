@@ -1,8 +1,13 @@
 # utils/ticket_utils.py
 import json
+import hashlib
 from html import unescape
 
-import json
+def load_tickets(filepath="data/open_tickets.json"):
+    """Load every ticket from the JSON file."""
+    with open(filepath, encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("open-tickets", []) if isinstance(data, dict) else data
 
 def load_ticket(filepath="data/open_tickets.json", index=0):
     """
@@ -35,6 +40,16 @@ def should_process_ticket(ticket):
     """Only process ticket if it needs a response."""
     return ticket.get("needs_response") == "1"
 
+def last_comment_hash(ticket):
+    """
+    Hash of a ticket's newest comment and comment count: it changes exactly when
+    the thread gets a new or edited message, so a reply computed for it stays valid until then.
+    """
+    comments = ticket.get("ticket_comments") or []
+    newest = max(comments, key=lambda c: (str(c.get("time_stamp", "")), str(c.get("comment_id", ""))), default={})
+    payload = json.dumps([len(comments), newest.get("comment_id"), newest.get("comment")], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
 def format_ticket_history(comments, max_entries=50):
     visible = [c for c in comments if c['private'] == "0"]
     latest = visible[-max_entries:]
@@ -0,0 +1,527 @@
+import os
+import json
+import math
+import pickle
+import shutil
+import hashlib
+
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+
+from utils.docstore import DOCSTORE_FILENAME, SQLiteDocstore
+from utils.embedding_pipeline import MAX_WORKERS, embed_texts
+
+MANIFEST_FILENAME = "doc_manifest.json"
+MANIFEST_VERSION = 1
+
+# Index layout: "flat" (exact float32), "fp16" / "sq8" (scalar-quantized, 2 or 1
+# byte per dimension) or "ivfpq" (inverted lists + product quantization).
+# See benchmarks/bench_index_modes.py for recall, size and latency on our corpus.
+INDEX_MODES = ("flat", "fp16", "sq8", "ivfpq")
+INDEX_MODE = os.getenv("FAISS_INDEX_MODE", "flat")
+# Keep only the first N embedding dimensions, re-normalized (0 keeps them all).
+# Only worthwhile for models trained for truncation, such as text-embedding-3-*.
+INDEX_DIM = int(os.getenv("FAISS_INDEX_DIM") or 0)
+# Product quantization with 8-bit codes trains 256 centroids per sub-quantizer and
+# faiss wants ~39 training points per centroid; smaller partitions use sq8 instead
+PQ_CENTROIDS = 256
+MIN_IVFPQ_VECTORS = 39 * PQ_CENTROIDS
+# An IVF partition is retrained (rebuilt) once the vectors added or removed since
+# its training reach this share of the vectors it was trained on
+RETRAIN_CHURN = 0.5
+# Sources kept exact whatever the mode: they are tiny and the classifier reads their vectors back
+EXACT_SOURCES = ("common_issue",)
+FLAT_LAYOUT = {"mode": "flat", "dim": 0}
+
+# Metadata field that uniquely identifies a document within its source
+ID_KEYS = {
+    "common_issue": "title",
+    "kb_article": "url",
+    "theme_doc": "slug",
+    "theme_info": "slug",
+    "theme_note": "title",
+    "support_ticket": "ticket_id",
+}
+
+
+def document_id(doc):
+    """Return a stable ID for a document, derived from its source and natural key."""
+    if "parent_id" in doc.metadata:
+        return f"{doc.metadata['parent_id']}#{doc.metadata.get('chunk_index', 0)}"
+    source = doc.metadata.get("source", "unknown")
+    key = doc.metadata.get(ID_KEYS.get(source, "title")) or doc.metadata.get("title") or ""
+    return f"{source}:{key}"
+
+
+def document_hash(doc):
+    """Hash the content and metadata of a document so edits are detected."""
+    payload = json.dumps([doc.page_content, doc.metadata], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def assign_document_ids(docs):
+    """Map stable IDs to documents, suffixing duplicates so every ID is unique."""
+    keyed = {}
+    for doc in docs:
+        doc_id = base_id = document_id(doc)
+        n = 1
+        while doc_id in keyed:
+            n += 1
+            doc_id = f"{base_id}~{n}"
+        keyed[doc_id] = doc
+    return keyed
+
+
+def embedding_model_name(embedding):
+    return getattr(embedding, "model", None) or type(embedding).__name__
+
+
+def load_manifest(embed_path):
+    path = os.path.join(embed_path, MANIFEST_FILENAME)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️ Could not read index manifest {path}: {e}")
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def save_manifest(embed_path, model, doc_hashes, layout=FLAT_LAYOUT, training=None):
+    """`training` records what an IVF index was trained on: {"vectors": n, "churn": changes since}."""
+    os.makedirs(embed_path, exist_ok=True)
+    path = os.path.join(embed_path, MANIFEST_FILENAME)
+    tmp_path = f"{path}.tmp"
+    manifest = {"version": MANIFEST_VERSION, "model": model, "index": layout, "documents": doc_hashes}
+    if training:
+        manifest["training"] = training
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+
+
+def diff_manifest(stored_hashes, current_hashes):
+    """Return (ids to embed, ids to delete) between two {doc_id: hash} manifests."""
+    to_add = [doc_id for doc_id, h in current_hashes.items() if stored_hashes.get(doc_id) != h]
+    to_delete = [doc_id for doc_id, h in stored_hashes.items() if current_hashes.get(doc_id) != h]
+    return to_add, to_delete
+
+
+def index_layout(source, mode=INDEX_MODE, dim=INDEX_DIM):
+    """The requested {"mode", "dim"} layout for one source's sub-index."""
+    if source in EXACT_SOURCES:
+        return dict(FLAT_LAYOUT)
+    if mode not in INDEX_MODES:
+        raise ValueError(f"Unknown FAISS index mode '{mode}'. Expected one of {INDEX_MODES}.")
+    return {"mode": mode, "dim": dim or 0}
+
+
+def create_index(vectors, layout=FLAT_LAYOUT):
+    """
+    Build a trained, empty FAISS index for the n x d float32 `vectors` in the given layout.
+    With a reduced "dim", the index takes full-size vectors and truncates and
+    re-normalizes them itself, so callers and queries never see the difference.
+    """
+    n, d = vectors.shape
+    mode = layout["mode"]
+    dim = layout.get("dim") or 0
+    dim = dim if 0 < dim < d else d
+
+    if mode == "ivfpq" and n < MIN_IVFPQ_VECTORS:
+        mode = "sq8"
+    if mode == "flat":
+        index = faiss.IndexFlatL2(dim)
+    elif mode == "fp16":
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_fp16)
+    elif mode == "sq8":
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit)
+    elif mode == "ivfpq":
+        nlist = int(math.sqrt(n))
+        subquantizers = next(m for m in range(max(1, dim // 16), 0, -1) if dim % m == 0)
+        index = faiss.IndexIVFPQ(faiss.IndexFlatL2(dim), dim, nlist, subquantizers, 8)
+        index.nprobe = max(1, nlist // 4)
+    else:
+        raise ValueError(f"Unknown FAISS index mode '{mode}'. Expected one of {INDEX_MODES}.")
+
+    if dim < d:
+        index = faiss.IndexPreTransform(index)
+        index.prepend_transform(faiss.NormalizationTransform(dim))
+        index.prepend_transform(faiss.RemapDimensionsTransform(d, dim, False))
+    if not index.is_trained:
+        index.train(vectors)
+    return index
+
+
+def is_exact_index(index):
+    """True for a plain float32 flat index, whose vectors can be read back unchanged."""
+    return isinstance(faiss.downcast_index(index), faiss.IndexFlat)
+
+
+def is_ivf_index(index):
+    """True for an IVF index (possibly behind a dimension-reducing transform)."""
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexPreTransform):
+        index = faiss.downcast_index(index.index)
+    return isinstance(index, faiss.IndexIVF)
+
+
+def delete_ivf_vectors(vectorstore, doc_ids):
+    """
+    Remove documents from an IVF store in place. IVF indexes keep the IDs of the
+    remaining vectors on removal, unlike the flat-code ones LangChain's delete()
+    renumbers, so the position map keeps its gaps.
+    """
+    positions = {doc_id: position for position, doc_id in vectorstore.index_to_docstore_id.items()}
+    removed = [positions[doc_id] for doc_id in doc_ids]
+    vectorstore.index.remove_ids(np.asarray(removed, dtype=np.int64))
+    for position in removed:
+        del vectorstore.index_to_docstore_id[position]
+    vectorstore.docstore.delete(doc_ids)
+
+
+def add_ivf_vectors(vectorstore, embedded, metadatas, ids):
+    """Add documents to an IVF store under fresh IDs past the highest one in use, without retraining."""
+    from langchain_core.documents import Document
+
+    start = max(vectorstore.index_to_docstore_id, default=-1) + 1
+    positions = np.arange(start, start + len(ids), dtype=np.int64)
+    vectors = np.asarray([vector for _, vector in embedded], dtype=np.float32)
+    vectorstore.index.add_with_ids(vectors, positions)
+    vectorstore.docstore.add({doc_id: Document(page_content=text, metadata=metadata)
+                              for doc_id, (text, _), metadata in zip(ids, embedded, metadatas)})
+    vectorstore.index_to_docstore_id.update(zip(positions.tolist(), ids))
+
+
+def save_vectorstore(vectorstore, path):
+    """
+    Write the vectors to index.faiss and the documents to an SQLite docstore in `path`.
+    A store still holding a pickled in-memory docstore is converted on its first save.
+    """
+    os.makedirs(path, exist_ok=True)
+    docstore_path = os.path.join(path, DOCSTORE_FILENAME)
+    docstore = vectorstore.docstore
+    if not isinstance(docstore, SQLiteDocstore) or os.path.abspath(docstore.path) != os.path.abspath(docstore_path):
+        vectorstore.docstore = SQLiteDocstore(docstore_path, reset=True)
+        vectorstore.docstore.add({doc_id: docstore.search(doc_id) for doc_id in vectorstore.index_to_docstore_id.values()})
+
+    index_path = os.path.join(path, "index.faiss")
+    faiss.write_index(vectorstore.index, f"{index_path}.tmp")
+    os.replace(f"{index_path}.tmp", index_path)
+    vectorstore.docstore.save(vectorstore.index_to_docstore_id)
+
+    pickle_path = os.path.join(path, "index.pkl")
+    if os.path.exists(pickle_path):
+        os.remove(pickle_path)
+
+
+def load_vectorstore(path, embedding):
+    """
+    Load an index saved by `save_vectorstore`. The vectors are read into memory;
+    documents stay in SQLite until a search returns them. Stores saved by
+    FAISS.save_local (index.pkl) are still read, and converted on their next save.
+    """
+    index = faiss.read_index(os.path.join(path, "index.faiss"))
+    pickle_path = os.path.join(path, "index.pkl")
+    if os.path.exists(pickle_path):
+        with open(pickle_path, "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+    else:
+        docstore = SQLiteDocstore(os.path.join(path, DOCSTORE_FILENAME))
+        index_to_docstore_id = docstore.load_positions()
+    return FAISS(embedding, index, docstore, index_to_docstore_id)
+
+
+def _adopt_legacy_index(vectorstore):
+    """
+    Re-key an index saved with random UUIDs to stable document IDs,
+    so existing vectors are reused instead of re-embedded.
+    """
+    docs = [vectorstore.docstore.search(vectorstore.index_to_docstore_id[i])
+            for i in range(len(vectorstore.index_to_docstore_id))]
+    keyed = assign_document_ids(docs)
+    ids = list(keyed)
+    vectorstore.docstore = InMemoryDocstore(keyed)
+    vectorstore.index_to_docstore_id = dict(enumerate(ids))
+    return {doc_id: document_hash(doc) for doc_id, doc in keyed.items()}
+
+
+def _embed_documents(docs, embedding, max_concurrency):
+    texts = [doc.page_content for doc in docs]
+    return list(zip(texts, embed_texts(texts, embedding, max_concurrency=max_concurrency)))
+
+
+def _build_index(keyed_docs, embedding, embed_path, model, max_concurrency=MAX_WORKERS,
+                 layout=FLAT_LAYOUT, known_vectors=None):
+    """Build and save an index over `keyed_docs`, embedding only those missing from `known_vectors`."""
+    known_vectors = known_vectors or {}
+    missing = [doc_id for doc_id in keyed_docs if doc_id not in known_vectors]
+    embedded = _embed_documents([keyed_docs[doc_id] for doc_id in missing], embedding, max_concurrency)
+    vectors = dict(known_vectors)
+    vectors.update((doc_id, vector) for doc_id, (_, vector) in zip(missing, embedded))
+
+    ids = list(keyed_docs)
+    matrix = np.asarray([vectors[doc_id] for doc_id in ids], dtype=np.float32)
+    docstore = SQLiteDocstore(os.path.join(embed_path, DOCSTORE_FILENAME), reset=True)
+    vectorstore = FAISS(embedding, create_index(matrix, layout), docstore, {})
+    vectorstore.add_embeddings(
+        [(keyed_docs[doc_id].page_content, vectors[doc_id]) for doc_id in ids],
+        metadatas=[keyed_docs[doc_id].metadata for doc_id in ids],
+        ids=ids,
+    )
+    save_vectorstore(vectorstore, embed_path)
+    training = {"vectors": len(ids), "churn": 0} if is_ivf_index(vectorstore.index) else None
+    save_manifest(embed_path, model, {doc_id: document_hash(doc) for doc_id, doc in keyed_docs.items()}, layout,
+                  training)
+    return vectorstore
+
+
+def _reusable_vectors(vectorstore, stored_hashes, current_hashes):
+    """Vectors of unchanged documents that can be read back exactly from a flat index."""
+    if not is_exact_index(vectorstore.index) or not vectorstore.index.ntotal:
+        return {}
+    matrix = vectorstore.index.reconstruct_n(0, vectorstore.index.ntotal)
+    return {
+        doc_id: matrix[position].tolist()
+        for position, doc_id in vectorstore.index_to_docstore_id.items()
+        if current_hashes.get(doc_id) is not None and stored_hashes.get(doc_id) == current_hashes[doc_id]
+    }
+
+
+class IndexSync:
+    """
+    One incremental sync of the FAISS index at `embed_path`, fed one document at a
+    time with `add()` and applied by `finish()`. Unchanged documents are kept only
+    as hashes, so memory grows with what has to be embedded, not with the corpus.
+    Removed documents are deleted from both the vector index and the docstore.
+    """
+
+    def __init__(self, embedding, embed_path, layout=FLAT_LAYOUT):
+        self.embedding = embedding
+        self.embed_path = embed_path
+        self.layout = layout
+        self.model = embedding_model_name(embedding)
+        self.current_hashes = {}
+        self.pending = {}
+        self.vectorstore = None
+        self.manifest = None
+        self.stored_hashes = {}
+        self.rebuild = None
+
+        if not os.path.exists(os.path.join(embed_path, "index.faiss")):
+            self.rebuild = "⚠️ No existing FAISS index found."
+            return
+        self.vectorstore = load_vectorstore(embed_path, embedding)
+        self.manifest = load_manifest(embed_path)
+        if self.manifest is None:
+            print("🔁 Migrating existing FAISS index to stable document IDs...")
+            self.stored_hashes = _adopt_legacy_index(self.vectorstore)
+        elif self.manifest.get("model") != self.model:
+            self.rebuild = f"🗑️ Embedding model changed ({self.manifest.get('model')} → {self.model})."
+        else:
+            self.stored_hashes = self.manifest["documents"]
+
+    def add(self, doc):
+        """Register one current document; keep it only if it has to be embedded."""
+        doc_id = base_id = document_id(doc)
+        n = 1
+        while doc_id in self.current_hashes:
+            n += 1
+            doc_id = f"{base_id}~{n}"
+        doc_hash = self.current_hashes[doc_id] = document_hash(doc)
+        if self.rebuild or self.stored_hashes.get(doc_id) != doc_hash:
+            self.pending[doc_id] = doc
+
+    def _all_documents(self):
+        """Every current document, reading unchanged ones back from the existing docstore."""
+        docstore = self.vectorstore.docstore
+        return {doc_id: self.pending[doc_id] if doc_id in self.pending else docstore.search(doc_id)
+                for doc_id in self.current_hashes}
+
+    def finish(self, max_concurrency=MAX_WORKERS):
+        """Apply the sync and save the index. Returns the FAISS vector store."""
+        layout, model = self.layout, self.model
+        if self.rebuild:
+            print(f"{self.rebuild} Embedding {len(self.pending)} documents...")
+            return _build_index(self.pending, self.embedding, self.embed_path, model, max_concurrency, layout)
+
+        vectorstore = self.vectorstore
+        stored_layout = (self.manifest or {}).get("index", FLAT_LAYOUT)
+        if stored_layout != layout:
+            print(f"🔁 Index layout changed ({stored_layout['mode']} → {layout['mode']}"
+                  f"{', dim ' + str(layout['dim']) if layout.get('dim') else ''}). Rebuilding FAISS index...")
+            known_vectors = _reusable_vectors(vectorstore, self.stored_hashes, self.current_hashes)
+            return _build_index(self._all_documents(), self.embedding, self.embed_path, model, max_concurrency,
+                                layout, known_vectors)
+
+        to_add, to_delete = diff_manifest(self.stored_hashes, self.current_hashes)
+        if not to_add and not to_delete:
+            if self.manifest is None:
+                save_vectorstore(vectorstore, self.embed_path)
+                save_manifest(self.embed_path, model, self.current_hashes, layout)
+            print("📦 FAISS index is up to date.")
+            return vectorstore
+
+        print(f"🔁 Updating FAISS index: {len(to_add)} new/changed, "
+              f"{len(set(to_delete) - set(to_add))} removed documents.")
+
+        indexed_ids = set(vectorstore.index_to_docstore_id.values())
+        stale_ids = [doc_id for doc_id in to_delete if doc_id in indexed_ids]
+        if stale_ids and len(stale_ids) == len(indexed_ids) and to_add:
+            return _build_index(self._all_documents(), self.embedding, self.embed_path, model, max_concurrency, layout)
+
+        # IVF partitions are updated in place with the centroids they were trained on. A
+        # retrain rebuilds the whole partition: its quantized vectors cannot be read back,
+        # so every document is re-embedded (mostly embedding-cache hits) and the index is
+        # trained and filled again. It only happens once the churn since training reaches
+        # RETRAIN_CHURN of the trained size, or when an ivfpq partition built as sq8 has
+        # grown past MIN_IVFPQ_VECTORS.
+        ivf = is_ivf_index(vectorstore.index)
+        training = (self.manifest or {}).get("training") if ivf else None
+        if ivf:
+            training = dict(training or {"vectors": len(indexed_ids), "churn": 0})
+            training["churn"] += len(stale_ids) + len(to_add)
+            if training["churn"] >= RETRAIN_CHURN * training["vectors"]:
+                print(f"🔁 Retraining IVF index: {training['churn']} vectors changed since it was trained "
+                      f"on {training['vectors']}.")
+                return self._retrain(max_concurrency)
+        elif layout["mode"] == "ivfpq" and len(self.current_hashes) >= MIN_IVFPQ_VECTORS:
+            print(f"🔁 Partition reached {MIN_IVFPQ_VECTORS} vectors: building the IVFPQ index...")
+            return self._retrain(max_concurrency)
+
+        if stale_ids:
+            if ivf:
+                delete_ivf_vectors(vectorstore, stale_ids)
+            else:
+                vectorstore.delete(stale_ids)
+        if to_add:
+            new_docs = [self.pending[doc_id] for doc_id in to_add]
+            embedded = _embed_documents(new_docs, self.embedding, max_concurrency)
+            metadatas = [doc.metadata for doc in new_docs]
+            if ivf:
+                add_ivf_vectors(vectorstore, embedded, metadatas, to_add)
+            else:
+                vectorstore.add_embeddings(embedded, metadatas=metadatas, ids=to_add)
+
+        save_vectorstore(vectorstore, self.embed_path)
+        save_manifest(self.embed_path, model, self.current_hashes, layout, training)
+        return vectorstore
+
+    def _retrain(self, max_concurrency):
+        """Rebuild the partition, reusing the stored vectors of unchanged documents when they are exact."""
+        known_vectors = _reusable_vectors(self.vectorstore, self.stored_hashes, self.current_hashes)
+        return _build_index(self._all_documents(), self.embedding, self.embed_path, self.model, max_concurrency,
+                            self.layout, known_vectors)
+
+
+def sync_vectorstore(docs, embedding, embed_path, max_concurrency=MAX_WORKERS, layout=FLAT_LAYOUT):
+    """
+    Load the FAISS index at `embed_path` and bring it in line with the `docs` iterable.
+    Only new or changed documents are embedded, through the concurrent batched
+    pipeline. A change of `layout` rebuilds the index, reusing stored vectors when it was flat.
+    """
+    sync = IndexSync(embedding, embed_path, layout)
+    for doc in docs:
+        sync.add(doc)
+    return sync.finish(max_concurrency)
+
+
+def partition_path(embed_path, source):
+    return os.path.join(embed_path, source)
+
+
+def _split_legacy_index(embed_path, embedding):
+    """
+    Split a single all-sources index at `embed_path` into one sub-index per source,
+    reusing the stored vectors so nothing is re-embedded.
+    """
+    if not os.path.exists(os.path.join(embed_path, "index.faiss")):
+        return
+
+    print("🔁 Splitting FAISS index into per-source partitions...")
+    vectorstore = load_vectorstore(embed_path, embedding)
+    manifest = load_manifest(embed_path)
+    if manifest is None:
+        stored_hashes = _adopt_legacy_index(vectorstore)
+        model = embedding_model_name(embedding)
+    else:
+        stored_hashes = manifest["documents"]
+        model = manifest.get("model")
+
+    groups = {}
+    for position, doc_id in vectorstore.index_to_docstore_id.items():
+        doc = vectorstore.docstore.search(doc_id)
+        vector = vectorstore.index.reconstruct(position).tolist()
+        groups.setdefault(doc.metadata.get("source", "unknown"), []).append((doc_id, doc, vector))
+
+    for source, entries in groups.items():
+        partition = FAISS.from_embeddings(
+            [(doc.page_content, vector) for _, doc, vector in entries],
+            embedding,
+            metadatas=[doc.metadata for _, doc, _ in entries],
+            ids=[doc_id for doc_id, _, _ in entries],
+        )
+        path = partition_path(embed_path, source)
+        save_vectorstore(partition, path)
+        save_manifest(path, model, {doc_id: stored_hashes.get(doc_id, "") for doc_id, _, _ in entries})
+
+    for filename in ("index.faiss", "index.pkl", DOCSTORE_FILENAME, MANIFEST_FILENAME):
+        path = os.path.join(embed_path, filename)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def load_partitioned_vectorstores(embed_path, embedding, mode=INDEX_MODE, dim=INDEX_DIM):
+    """
+    Load every per-source sub-index under `embed_path` as {source: FAISS}.
+    Returns {} when any of them was built with another layout, so the caller
+    falls back to a sync that rebuilds it.
+    """
+    stores = {}
+    if not os.path.isdir(embed_path):
+        return stores
+    for source in sorted(os.listdir(embed_path)):
+        path = partition_path(embed_path, source)
+        if os.path.exists(os.path.join(path, "index.faiss")):
+            manifest = load_manifest(path) or {}
+            if manifest.get("index", FLAT_LAYOUT) != index_layout(source, mode, dim):
+                return {}
+            stores[source] = load_vectorstore(path, embedding)
+    return stores
+
+
+def sync_partitioned_vectorstores(docs, embedding, embed_path, max_concurrency=MAX_WORKERS,
+                                  mode=INDEX_MODE, dim=INDEX_DIM):
+    """
+    Keep one sub-index per document `source` under `embed_path`, each synced
+    incrementally by an IndexSync in the requested index `mode` and `dim`.
+    `docs` may be a generator: it is consumed once. Returns {source: FAISS}.
+    """
+    _split_legacy_index(embed_path, embedding)
+
+    # One pass over the stream routes each document to its partition's sync
+    syncs, counts = {}, {}
+    for doc in docs:
+        source = doc.metadata.get("source", "unknown")
+        if source not in syncs:
+            syncs[source] = IndexSync(embedding, partition_path(embed_path, source), index_layout(source, mode, dim))
+            counts[source] = 0
+        syncs[source].add(doc)
+        counts[source] += 1
+
+    stores = {}
+    for source, sync in syncs.items():
+        print(f"📚 Partition '{source}' ({counts[source]} documents)")
+        stores[source] = sync.finish(max_concurrency)
+
+    # Drop partitions whose source no longer has any documents
+    for source in os.listdir(embed_path):
+        path = partition_path(embed_path, source)
+        if source not in syncs and os.path.exists(os.path.join(path, MANIFEST_FILENAME)):
+            shutil.rmtree(path)
+    return stores